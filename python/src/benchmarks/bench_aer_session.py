@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', '..', '..', 'quantum'))
+from aer_session import AerSession  # noqa: E402
+from true_random_generator import transpile_target, hadamard_circuit  # noqa: E402
+
+# Small-circuit calls per second under concurrent load: one simulator job per
+# call versus the batching AerSession.
+
+
+def calls_per_second(call, calls, threads):
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, range(min(calls, 50))))  # Warm up the threads
+        start = time.perf_counter()
+        list(pool.map(call, range(calls)))
+        return calls / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark per-call simulator jobs against the batching AerSession.')
+    parser.add_argument('--calls', type=int, default=2000,
+                        help='Calls timed per configuration (default: 2000)')
+    parser.add_argument('--qubits', type=int, default=8,
+                        help='Width of the Hadamard circuit (default: 8)')
+    parser.add_argument('--shots', type=int, default=1,
+                        help='Shots per call (default: 1)')
+    args = parser.parse_args()
+
+    circuit = hadamard_circuit(args.qubits)
+    session = AerSession()
+
+    def direct(_):
+        return transpile_target().run(circuit, shots=args.shots).result().get_counts()
+
+    def batched(_):
+        return session.run(circuit, shots=args.shots)
+
+    print(f"{'threads':>8} {'direct calls/s':>15} {'session calls/s':>16}")
+    for threads in (1, 4, 16, 64):
+        print(f"{threads:>8} {calls_per_second(direct, args.calls, threads):>15.0f} "
+              f"{calls_per_second(batched, args.calls, threads):>16.0f}")
+    session.close()
+    print(f"Session served {session.requests} calls with {session.circuits} experiments "
+          f"in {session.jobs} jobs")
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'real-time-stock-server'))
+from stream_aggregator import StreamAggregator  # noqa: E402
+
+# Refresh cost of the full-history statistics versus the streaming aggregator
+# as the number of ticks in the window grows.
+
+
+def make_ticks(count, start_us=0, step_us=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = (start_us + np.arange(count) * step_us).astype('datetime64[us]')
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, count))
+    volumes = rng.integers(1000, 10000, count).astype(float)
+    return times, prices, volumes
+
+
+def full_history_refresh(prices, volumes):
+    """What the live views did before: recompute everything on each refresh"""
+    return {
+        'max': prices.max(),
+        'min': prices.min(),
+        'range': prices.max() - prices.min(),
+        'count': len(prices),
+        'vwap': (prices * volumes).sum() / volumes.sum(),
+        'std': prices.std(ddof=1)
+    }
+
+
+def bench(window_ticks, refreshes=200, ticks_per_refresh=5):
+    times, prices, volumes = make_ticks(window_ticks + refreshes * ticks_per_refresh)
+    window_seconds = window_ticks / 1000
+
+    aggregator = StreamAggregator(window_seconds=window_seconds)
+    aggregator.update_many(times[:window_ticks], prices[:window_ticks], volumes[:window_ticks])
+
+    start = time.perf_counter()
+    for i in range(refreshes):
+        lo = window_ticks + i * ticks_per_refresh
+        hi = lo + ticks_per_refresh
+        aggregator.update_many(times[lo:hi], prices[lo:hi], volumes[lo:hi])
+        aggregator.snapshot()
+    streaming = (time.perf_counter() - start) / refreshes
+
+    start = time.perf_counter()
+    for i in range(refreshes):
+        hi = window_ticks + (i + 1) * ticks_per_refresh
+        full_history_refresh(prices[hi - window_ticks:hi], volumes[hi - window_ticks:hi])
+    full = (time.perf_counter() - start) / refreshes
+
+    return streaming, full
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark streaming statistics against full-history recomputation.')
+    parser.add_argument('--refreshes', type=int, default=200,
+                        help='Refreshes timed per window length (default: 200)')
+    args = parser.parse_args()
+
+    print(f"{'window ticks':>12} {'streaming us':>14} {'full history us':>16}")
+    for window_ticks in (1_000, 10_000, 100_000, 1_000_000):
+        streaming, full = bench(window_ticks, refreshes=args.refreshes)
+        print(f"{window_ticks:>12} {streaming * 1e6:>14.1f} {full * 1e6:>16.1f}")
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'pricing'))
+sys.path.insert(0, os.path.join(HERE, '..', '..', '..', 'quantum'))
+from options import EuropeanOption, black_scholes  # noqa: E402
+from monte_carlo import GBMModel, MonteCarloPricer  # noqa: E402
+from amplitude_estimation import AmplitudeEstimationPricer, estimation_circuit  # noqa: E402
+
+# Error versus wall clock of the amplitude-estimation pricer and the classical
+# Monte Carlo pricer on the same European call, to see where either is worth using.
+
+SPOT, STRIKE, RATE, VOLATILITY, MATURITY = 150.0, 150.0, 0.05, 0.2, 1.0
+SCHEDULES = ((0,), (0, 1), (0, 1, 2), (0, 1, 2, 4), (0, 1, 2, 4, 8), (0, 1, 2, 4, 8, 16))
+PATH_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def run_quantum(qubits, schedule, shots, repeats):
+    pricer = AmplitudeEstimationPricer(qubits, schedule, shots)
+    prices, seconds = [], []
+    for _ in range(repeats):
+        estimate = pricer.price(SPOT, STRIKE, RATE, VOLATILITY, MATURITY)
+        prices.append(estimate['price'])
+        seconds.append(estimate['elapsed'])
+    return np.array(prices), np.mean(seconds), estimate
+
+
+def run_classical(paths, repeats):
+    model = GBMModel(SPOT, RATE, VOLATILITY, MATURITY, n_steps=1)
+    prices, seconds = [], []
+    for seed in range(repeats):
+        pricer = MonteCarloPricer(model, EuropeanOption(STRIKE), chunk_paths=min(paths, 100_000),
+                                  seed=seed)
+        result = pricer.price(paths)
+        prices.append(result['price'])
+        seconds.append(result['elapsed'])
+    return np.array(prices), np.mean(seconds)
+
+
+def rmse(prices, reference):
+    return float(np.sqrt(np.mean((prices - reference) ** 2)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Benchmark amplitude-estimation pricing against classical Monte Carlo.')
+    parser.add_argument('--qubits', type=int, default=5,
+                        help='Price qubits of the amplitude-estimation grid (default: 5)')
+    parser.add_argument('--shots', type=int, default=100,
+                        help='Shots per amplitude-estimation circuit (default: 100)')
+    parser.add_argument('--repeats', type=int, default=10,
+                        help='Runs averaged per configuration (default: 10)')
+    args = parser.parse_args()
+
+    reference = black_scholes(SPOT, STRIKE, RATE, VOLATILITY, MATURITY)
+
+    # Building and transpiling the circuits is a one-off cost, timed separately
+    start = time.perf_counter()
+    for power in SCHEDULES[-1]:
+        estimation_circuit(args.qubits, power)
+    print(f"Black-Scholes {reference:.4f}; circuit build and transpile "
+          f"{time.perf_counter() - start:.2f}s (once per process)")
+
+    print(f"{'method':>10} {'samples':>14} {'seconds':>9} {'rmse vs BS':>11} {'rmse vs grid':>13}")
+    for schedule in SCHEDULES:
+        prices, seconds, estimate = run_quantum(args.qubits, schedule, args.shots, args.repeats)
+        print(f"{'qae':>10} {estimate['oracle_calls']:>14} {seconds:>9.4f} "
+              f"{rmse(prices, reference):>11.4f} {rmse(prices, estimate['discretized']):>13.4f}")
+    for paths in PATH_COUNTS:
+        prices, seconds = run_classical(paths, args.repeats)
+        print(f"{'mc':>10} {paths:>14} {seconds:>9.4f} {rmse(prices, reference):>11.4f} {'':>13}")
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli.py')
+sys.path.insert(0, os.path.dirname(CLI))
+from cli import COMMANDS  # noqa: E402
+
+# Start-up cost of every CLI entry point: wall time of `cli.py <command> --help`
+# against a budget, and which heavy packages merely importing the command loads.
+# Exits with status 1 when a budget is exceeded, so batch jobs can gate on it.
+
+# Wall-time budget (ms) per command; numpy alone costs ~250ms here
+BUDGETS_MS = {
+    'serve': 700,
+    'generate': 700,
+    'view': 700,
+    'dashboard': 800,
+    'qrng': 700,
+}
+
+# Packages a command may only import once it actually does its work
+HEAVY_MODULES = ('pandas', 'matplotlib', 'qiskit', 'qiskit_aer', 'dash', 'plotly', 'scipy')
+
+IMPORT_PROBE = '''
+import json, sys
+sys.argv = ["cli.py"]
+sys.path.insert(0, {src!r})
+from cli import load_command
+load_command({command!r})
+print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))))
+'''
+
+
+def startup_ms(command, runs):
+    """Median wall time (ms) of `cli.py <command> --help` in a fresh interpreter"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, CLI, command, '--help'], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(1000 * (time.perf_counter() - start))
+    return sorted(times)[len(times) // 2]
+
+
+def heavy_imports(command):
+    """Heavy packages loaded by importing the command's module"""
+    code = IMPORT_PROBE.format(src=os.path.dirname(CLI), command=command, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check CLI start-up time against a budget.')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='Start-ups timed per command; the median is reported (default: 5)')
+    parser.add_argument('--commands', type=str, default=','.join(COMMANDS),
+                        help='Comma-separated commands to check (default: all)')
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'command':>10} {'ms':>8} {'budget':>8}  heavy imports")
+    for command in args.commands.split(','):
+        elapsed = startup_ms(command, args.runs)
+        heavy = heavy_imports(command)
+        over = elapsed > BUDGETS_MS[command]
+        if over or heavy:
+            failures.append(command)
+        print(f"{command:>10} {elapsed:>8.0f} {BUDGETS_MS[command]:>8}  {', '.join(heavy) or '-'}"
+              f"{'  OVER BUDGET' if over else ''}")
+
+    if failures:
+        print(f"Start-up budget exceeded by: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
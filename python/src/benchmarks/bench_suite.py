@@ -0,0 +1,368 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timedelta
+from functools import partial
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SRC_DIR, 'real-time-stock-server'))
+sys.path.insert(0, os.path.join(SRC_DIR, 'historical_stock'))
+sys.path.insert(0, os.path.join(SRC_DIR, '..', '..', 'quantum'))
+
+# Hot-path benchmarks with machine-readable output: every result is
+# {"name", "params", "value", "unit", "higher_is_better"}, written as JSON
+# together with the machine and commit, and optionally compared against a
+# stored baseline run. Groups import their modules only when they run.
+
+# Default allowed slowdown against the baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.10
+
+# Registered benchmark groups: name -> function(quick) returning a list of results
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def result(name, value, unit, higher_is_better=True, **params):
+    return {'name': name, 'params': params, 'value': float(value), 'unit': unit,
+            'higher_is_better': higher_is_better}
+
+
+def median_seconds(func, repeat):
+    """Median wall time of `repeat` calls after one warm-up call"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+@benchmark('simulator')
+def bench_simulator(quick):
+    from hft_behaviour import HFTSimulator
+
+    ticks = 5000 if quick else 50000
+    simulator = HFTSimulator(100.0, random_enabled=True, seed=1)
+
+    def step():
+        for _ in range(ticks):
+            simulator.step()
+
+    results = [result('simulator.step', ticks / median_seconds(step, 3), 'ticks/s', ticks=ticks)]
+    for n_paths in (1, 64):
+        n_ticks = (20000 if quick else 200000) // n_paths
+        seconds = median_seconds(lambda: simulator.generate_paths(n_ticks, n_paths), 3)
+        results.append(result('simulator.generate_paths', n_ticks * n_paths / seconds, 'ticks/s',
+                              n_ticks=n_ticks, n_paths=n_paths))
+    return results
+
+
+@benchmark('dashboard')
+def bench_dashboard(quick):
+    import hft_behaviour
+    from hft_behaviour import HFTSimulator, configure_chart, update_graph
+    from tick_store import TickRingBuffer
+
+    simulator = HFTSimulator(100.0, random_enabled=True, seed=2)
+    results = []
+    for history in ((1000, 10000) if quick else (1000, 10000, 60000)):
+        # `history` ticks at 50 ticks/s ending now, all inside the chart window
+        span = history / 50
+        configure_chart(window_minutes=span / 60 * 1.1)
+        hft_behaviour.tick_store = TickRingBuffer(capacity=max(65536, 2 * history))
+        prices = simulator.generate_paths(history)['price'][:, 0]
+        now = datetime.now()
+        timestamps = np.datetime64(now - timedelta(seconds=span), 'us') + (
+            np.arange(history) * (span * 1e6 / history)).astype('timedelta64[us]')
+        shocks = np.zeros(history, dtype=bool)
+        shocks[::50] = True
+        hft_behaviour.tick_store.extend(timestamps, prices, shocks)
+        hft_behaviour.aggregator.update_many(timestamps, prices, had_shock=shocks)
+
+        full = median_seconds(lambda: update_graph(0, None, None), 5)
+        _, _, state, _ = update_graph(0, None, None)
+
+        def incremental():
+            # Five new ticks per refresh, as at 50 ticks/s and a 100ms interval
+            for _ in range(5):
+                hft_behaviour.price_queue.put(simulator.step())
+            update_graph(0, state, None)
+
+        results.append(result('dashboard.update_graph.full', 1000 * full, 'ms', False,
+                              history_ticks=history))
+        results.append(result('dashboard.update_graph.incremental',
+                              1000 * median_seconds(incremental, 20), 'ms', False,
+                              history_ticks=history))
+    return results
+
+
+async def server_fanout(clients, rate, duration):
+    """Publish `rate` messages/s to `clients` local WebSocket clients; returns (delivered, latencies)"""
+    import websockets
+    from broadcaster import BroadcastHub
+    from server import handle_client
+
+    async def feed(symbol, hub):
+        # Bursts every 10ms, each message stamped with its publish time
+        burst = max(1, int(rate / 100))
+        next_due = time.perf_counter()
+        while True:
+            for _ in range(burst):
+                hub.publish(symbol, {"stock_symbol": symbol, "real_time_price": 100.0,
+                                     "volume": 1000, "price_change": 0.0,
+                                     "published_at": time.perf_counter()})
+            next_due += 0.01
+            await asyncio.sleep(max(0.0, next_due - time.perf_counter()))
+
+    hub = BroadcastHub(feed_factory=feed)
+    args = argparse.Namespace(slow_client_policy='drop-oldest', client_queue=100000)
+    server = await websockets.serve(
+        partial(handle_client, hub=hub, args=args, default_symbols=['AAPL']), 'localhost', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    delivered = 0
+    measuring = asyncio.Event()
+
+    async def client():
+        nonlocal delivered
+        async with websockets.connect(f'ws://localhost:{port}', max_queue=None) as websocket:
+            async for message in websocket:
+                if measuring.is_set():
+                    latencies.append(time.perf_counter() - json.loads(message)['published_at'])
+                    delivered += 1
+
+    tasks = [asyncio.create_task(client()) for _ in range(clients)]
+    await asyncio.sleep(0.5)  # Connect and warm up
+    measuring.set()
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+    measuring.clear()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await hub.stop()
+    server.close()
+    await server.wait_closed()
+    return delivered / elapsed, np.array(latencies)
+
+
+@benchmark('server')
+def bench_server(quick):
+    results = []
+    for clients in ((10,) if quick else (10, 100)):
+        rate = 1000
+        per_second, latencies = asyncio.run(server_fanout(clients, rate, 2 if quick else 5))
+        params = dict(clients=clients, publish_rate=rate)
+        results.append(result('server.delivered', per_second, 'msgs/s', **params))
+        if len(latencies):
+            results.append(result('server.fanout_latency.p50', 1000 * np.percentile(latencies, 50),
+                                  'ms', False, **params))
+            results.append(result('server.fanout_latency.p99', 1000 * np.percentile(latencies, 99),
+                                  'ms', False, **params))
+    return results
+
+
+@benchmark('generator')
+def bench_generator(quick):
+    from historical_data_generator import get_date_range, generate_columns, generate_historical_data
+    from intraday_generator import session_days, iter_intraday
+
+    dates = get_date_range('alltime', daily=True)
+    symbols = [f'S{i:03d}' for i in range(20 if quick else 200)]
+    rows = len(dates) * len(symbols)
+
+    def columns():
+        for symbol in symbols:
+            generate_columns(symbol, dates, seed=1)
+
+    def records():
+        for symbol in symbols:
+            generate_historical_data(symbol, dates, seed=1)
+
+    days = session_days(1, previous_day_only=True)
+    tick_rate = 5.0 if quick else 50.0
+
+    def ticks():
+        return sum(len(chunk['price']) for chunk in iter_intraday(days, tick_rate=tick_rate, seed=1))
+
+    tick_count = ticks()
+    return [
+        result('generator.columns', rows / median_seconds(columns, 3), 'rows/s', rows=rows),
+        result('generator.records', rows / median_seconds(records, 3), 'rows/s', rows=rows),
+        result('generator.intraday_ticks', tick_count / median_seconds(ticks, 3), 'rows/s',
+               rows=tick_count)
+    ]
+
+
+@benchmark('recorder')
+def bench_recorder(quick):
+    import tempfile
+    from tick_log import TickLog, measure
+
+    ticks = 100000 if quick else 1000000
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for batch in (1, 1024):
+            cost_ns, rate = measure(os.path.join(directory, f'batch{batch}'), ticks, batch)
+            results.append(result('recorder.append', cost_ns, 'ns/tick', higher_is_better=False, batch=batch))
+            results.append(result('recorder.write', rate, 'ticks/s', ticks=ticks, batch=batch))
+
+        # Range reads through the sparse index: a narrow window, then the whole log
+        log = TickLog(os.path.join(directory, 'batch1'))
+        timestamps = log.range()['timestamp']
+        middle = float(timestamps[len(timestamps) // 2])
+        for fraction in (0.001, 1.0):
+            half = fraction * float(timestamps[-1] - timestamps[0]) / 2
+            rows = len(log.range(middle - half, middle + half))
+            seconds = median_seconds(lambda: log.range(middle - half, middle + half)['price'].sum(), 5)
+            results.append(result('recorder.range', rows / seconds, 'rows/s', rows=rows))
+    return results
+
+
+@benchmark('qrng')
+def bench_qrng(quick):
+    from true_random_generator import QuantumRandomGenerator, EntropyPool, sample_bits
+
+    results = []
+    # Draw cost from a filled pool; the pool is topped up with stand-in bytes so
+    # every configuration measures the same thing whatever was drawn before it
+    pool = EntropyPool(background=False)
+    for bits in (8, 16, 32, 64):
+        qrng = QuantumRandomGenerator(bits=bits, pool=pool)
+        for shots in ((1, 10000) if quick else (1, 100, 10000, 1000000)):
+            calls = max(1, 10000 // shots)
+
+            def draw():
+                pool.buffer += os.urandom(calls * shots * 8)
+                for _ in range(calls):
+                    qrng.generate_array(shots)
+
+            results.append(result('qrng.pool', calls * shots / median_seconds(draw, 3),
+                                  'numbers/s', bits=bits, shots=shots))
+
+    # Simulator refill rate, which bounds sustained pool throughput
+    batch_shots = 8192 if quick else 65536
+    seconds = median_seconds(lambda: sample_bits(pool.qubits, batch_shots), 3)
+    results.append(result('qrng.entropy', pool.qubits * batch_shots / 8 / seconds, 'bytes/s',
+                          qubits=pool.qubits, batch_shots=batch_shots))
+
+    # Direct circuit runs, one simulator job per call
+    for bits in (8, 16):
+        qrng = QuantumRandomGenerator(bits=bits, pool=pool)
+        for shots in ((100,) if quick else (1, 100, 10000)):
+            results.append(result('qrng.circuit', shots / median_seconds(lambda: qrng.run_circuit(shots), 3),
+                                  'numbers/s', bits=bits, shots=shots))
+    return results
+
+
+def metadata(quick):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SRC_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'quick': quick
+    }
+
+
+def result_key(entry):
+    return entry['name'], json.dumps(entry['params'], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Results paired with the baseline run
+
+    Returns (rows, regressions): change is positive when the result improved,
+    and a regression is a result worse than the baseline by more than `tolerance`.
+    """
+    previous = {result_key(entry): entry for entry in baseline['results']}
+    rows, regressions = [], []
+    for entry in results:
+        base = previous.get(result_key(entry))
+        if base is None or base['value'] == 0 or entry['value'] == 0:
+            rows.append((entry, None))
+            continue
+        ratio = entry['value'] / base['value']
+        change = ratio - 1 if entry['higher_is_better'] else 1 / ratio - 1
+        rows.append((entry, change))
+        if change < -tolerance:
+            regressions.append(entry)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run the hot-path benchmarks and compare them against a baseline.')
+    parser.add_argument('--only', type=str, default=','.join(BENCHMARKS),
+                        help=f"Comma-separated groups to run (default: {','.join(BENCHMARKS)})")
+    parser.add_argument('--quick', action='store_true',
+                        help='Smaller sizes for a fast smoke run')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the results to this JSON file')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='JSON file from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown before a result is a regression (default: 0.10)')
+    args = parser.parse_args(argv)
+
+    groups = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = [name for name in groups if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark groups: {', '.join(unknown)}")
+
+    results = []
+    for name in groups:
+        start = time.perf_counter()
+        results.extend(BENCHMARKS[name](args.quick))
+        print(f"{name} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    run = {'meta': metadata(args.quick), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows, regressions = compare(results, json.load(f), args.tolerance)
+    else:
+        rows = [(entry, None) for entry in results]
+
+    for entry, change in rows:
+        params = ' '.join(f'{key}={value}' for key, value in entry['params'].items())
+        line = f"{entry['name']:<36} {params:<32} {entry['value']:>14.2f} {entry['unit']:<10}"
+        if change is not None:
+            line += f" {100 * change:+7.1f}%"
+        print(line)
+
+    if regressions:
+        print(f"{len(regressions)} result(s) regressed by more than {100 * args.tolerance:.0f}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import argparse
+import importlib
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+QUANTUM_DIR = os.path.join(SRC_DIR, '..', '..', 'quantum')
+
+# Subcommand -> (directory, module, help); a module is only imported when its
+# command runs, and every module keeps its heavy imports inside the functions
+# that need them, so `cli.py <command> --help` stays cheap
+COMMANDS = {
+    'serve': (os.path.join(SRC_DIR, 'real-time-stock-server'), 'server',
+              'Run the WebSocket price streams and HTTP status endpoints'),
+    'generate': (os.path.join(SRC_DIR, 'historical_stock'), 'historical_data_generator',
+                 'Generate historical bars, minute bars or ticks'),
+    'view': (os.path.join(SRC_DIR, 'view_graph'), 'updated_realtime_stock_plot',
+             'Plot historical and live prices with matplotlib'),
+    'dashboard': (os.path.join(SRC_DIR, 'real-time-stock-server'), 'hft_behaviour',
+                  'Run the Dash HFT candlestick dashboard'),
+    'qrng': (QUANTUM_DIR, 'true_random_generator',
+             'Draw random numbers from the quantum simulator'),
+}
+
+
+def load_command(name):
+    """Import the module behind a subcommand"""
+    directory, module, _ = COMMANDS[name]
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(module)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Stock simulation tools; run `<command> --help` for a command\'s options.')
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, _, help_text) in COMMANDS.items():
+        # Options (including --help) are parsed by the command's own main()
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    sys.argv[0] = f"{os.path.basename(sys.argv[0])} {args.command}"
+    load_command(args.command).main(rest)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import os
+import json
+import numpy as np
+
+# Columnar layout: <root>/<SYMBOL>/<column>.npy, one array per column, sorted
+# by date. Arrays are opened memory-mapped, so only the pages of the requested
+# date range are ever read.
+DATE_COLUMN = 'date'
+VALUE_COLUMNS = {
+    'open_price': np.float64,
+    'high_price': np.float64,
+    'low_price': np.float64,
+    'close_price': np.float64,
+    'volume': np.int64
+}
+COLUMNS = (DATE_COLUMN,) + tuple(VALUE_COLUMNS)
+
+
+def symbol_dir(root, symbol):
+    return os.path.join(root, symbol.upper())
+
+
+def write_symbol(root, symbol, columns):
+    """
+    Write one symbol's bars to the store, sorted by date
+
+    columns: dict with a 'date' column (anything np.datetime64 accepts) and the
+    VALUE_COLUMNS as equal-length sequences
+    """
+    dates = np.asarray(columns[DATE_COLUMN], dtype='datetime64[D]')
+    order = np.argsort(dates, kind='stable')
+    directory = symbol_dir(root, symbol)
+    os.makedirs(directory, exist_ok=True)
+
+    np.save(os.path.join(directory, DATE_COLUMN + '.npy'), dates[order])
+    for name, dtype in VALUE_COLUMNS.items():
+        values = np.asarray(columns[name], dtype=dtype)
+        np.save(os.path.join(directory, name + '.npy'), values[order])
+
+
+def records_to_columns(records):
+    """Turn the generator's list of dicts into a dict of columns"""
+    return {name: [record[name] for record in records] for name in COLUMNS}
+
+
+def convert_json(json_file, root):
+    """Convert a historical_data_generator.py JSON file into the columnar store"""
+    with open(json_file, 'r') as f:
+        records = json.load(f)
+
+    symbols = sorted({record['symbol'] for record in records})
+    for symbol in symbols:
+        write_symbol(root, symbol, records_to_columns(
+            [record for record in records if record['symbol'] == symbol]))
+    return symbols
+
+
+def list_symbols(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if os.path.isfile(os.path.join(root, name, DATE_COLUMN + '.npy')))
+
+
+class SymbolHistory:
+    def __init__(self, root, symbol):
+        """
+        Memory-mapped view of one symbol's columns
+
+        root: store directory
+        symbol: stock symbol
+        """
+        self.symbol = symbol.upper()
+        directory = symbol_dir(root, symbol)
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"No columnar history for {self.symbol} in {root}")
+        # Daily stores hold COLUMNS; intraday stores may hold other columns
+        self.columns = {name[:-len('.npy')]: np.load(os.path.join(directory, name), mmap_mode='r')
+                        for name in sorted(os.listdir(directory)) if name.endswith('.npy')}
+
+    def __len__(self):
+        return len(self.columns[DATE_COLUMN])
+
+    @property
+    def dates(self):
+        return self.columns[DATE_COLUMN]
+
+    def range(self, start=None, end=None):
+        """
+        Return the bars with start <= date <= end as zero-copy slices
+
+        Both bounds are optional, truncated to the date index's resolution and
+        located by binary search on the date index.
+        """
+        dates = self.dates
+        unit = np.datetime_data(dates.dtype)[0]
+        lo = 0 if start is None else np.searchsorted(
+            dates, np.datetime64(start, unit), side='left')
+        hi = len(dates) if end is None else np.searchsorted(
+            dates, np.datetime64(end, unit), side='right')
+        return {name: values[lo:hi] for name, values in self.columns.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Convert historical JSON data into the columnar store.')
+    parser.add_argument('--json_file', type=str, required=True,
+                        help='JSON file written by historical_data_generator.py')
+    parser.add_argument('--store', type=str, default='historical_store',
+                        help='Columnar store directory (default: historical_store)')
+    args = parser.parse_args()
+
+    converted = convert_json(args.json_file, args.store)
+    print(f"Converted {', '.join(converted)} into {args.store}")
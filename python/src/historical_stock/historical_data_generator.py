@@ -1,77 +1,230 @@
-import random
+import os
+import sys
 import json
-from datetime import datetime, timedelta
 import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(
-    description='Generate historical stock data and store it in a JSON file.')
-parser.add_argument('--symbol', type=str, default='AAPL',
-                    help='Stock symbol (default: AAPL)')
-parser.add_argument('--timeframe', type=str, default='1year', choices=[
-                    '1day', '1week', '1month', '6months', '1year', '5years', 'alltime'], help='Timeframe for historical data (default: 1year)')
-parser.add_argument('--output', type=str, default='historical_data.json',
-                    help='Output JSON file (default: historical_data.json)')
-args = parser.parse_args()
+from columnar_store import write_symbol
+from intraday_generator import (
+    session_days, iter_intraday, intraday_rows, JSONStreamWriter, ColumnStreamWriter, write_intraday)
+
+# Random streams come from the real-time server's RNG provider
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'real-time-stock-server'))
+from rng_provider import RNG_BACKENDS, QUANTUM_RNG_NOTE, as_provider  # noqa: E402
+
+# Number of bars and days between bars for each timeframe, newest first
+TIMEFRAMES = {
+    '1day': (1, 1),
+    '1week': (7, 1),
+    '1month': (30, 1),
+    '6months': (26, 7),
+    '1year': (52, 7),
+    '5years': (52 * 5, 7),
+    'alltime': (52 * 10, 7)  # Example for a decade
+}
+START_PRICE = 150.00
 
 # Generate the date range based on the selected timeframe
 
 
-def get_date_range(timeframe):
-    today = datetime.now()
-    if timeframe == '1day':
-        return [today - timedelta(days=1)]
-    elif timeframe == '1week':
-        return [today - timedelta(days=i) for i in range(7)]
-    elif timeframe == '1month':
-        return [today - timedelta(days=i) for i in range(30)]
-    elif timeframe == '6months':
-        return [today - timedelta(weeks=i) for i in range(26)]
-    elif timeframe == '1year':
-        return [today - timedelta(weeks=i) for i in range(52)]
-    elif timeframe == '5years':
-        return [today - timedelta(weeks=i) for i in range(52 * 5)]
-    elif timeframe == 'alltime':
-        # Example for a decade
-        return [today - timedelta(weeks=i) for i in range(52 * 10)]
-    else:
-        return []
+def get_date_range(timeframe, daily=False):
+    """
+    Dates for the timeframe as a datetime64[D] array, newest first
+
+    daily: use one bar per day instead of the timeframe's default spacing
+    """
+    if timeframe not in TIMEFRAMES:
+        return np.array([], dtype='datetime64[D]')
+    count, step = TIMEFRAMES[timeframe]
+    if daily:
+        count, step = count * step, 1
+    # '1day' is the single previous day; every other timeframe starts today
+    offset = 1 if timeframe == '1day' else 0
+    today = np.datetime64(datetime.now().date(), 'D')
+    return today - (offset + np.arange(count) * step).astype('timedelta64[D]')
+
 
 # Generate stock price data for each date
 
 
-def generate_historical_data(symbol, dates):
-    data = []
-    current_price = 150.00  # Starting price
-    for date in dates:
-        open_price = round(current_price + random.uniform(-5, 5), 2)
-        high_price = round(open_price + random.uniform(0, 10), 2)
-        low_price = round(open_price - random.uniform(0, 10), 2)
-        close_price = round(low_price + random.uniform(0, 5), 2)
-        volume = random.randint(1000, 10000)
+def generate_columns(symbol, dates, seed=None, rng=None):
+    """
+    Vectorized OHLCV bars for `dates` as a dict of columns
 
-        data_point = {
-            'date': date.strftime('%Y-%m-%d'),
-            'symbol': symbol,
-            'open_price': open_price,
-            'high_price': high_price,
-            'low_price': low_price,
-            'close_price': close_price,
-            'volume': volume
-        }
-        data.append(data_point)
-        current_price = close_price  # Next day's price starts from previous close
+    Prices follow the original per-row rules in whole cents: each open is the
+    previous close +/- up to $5, high/low are up to $10 away from the open and
+    the close is up to $5 above the low.
 
-    return data
+    rng: RNGProvider or backend name; each symbol draws from its own stream,
+    so the output does not depend on how symbols are sharded
+    """
+    rng = as_provider(rng, seed).generator(symbol)
+    count = len(dates)
+    open_move, high_move, low_move, close_move = (
+        np.rint(rng.uniform(low, high, count) * 100).astype(np.int64)
+        for low, high in ((-5, 5), (0, 10), (0, 10), (0, 5)))
 
+    # close[t] = close[t-1] + open_move - low_move + close_move
+    close_cents = int(round(START_PRICE * 100)) + np.cumsum(open_move - low_move + close_move)
+    open_cents = close_cents + low_move - close_move
+    low_cents = open_cents - low_move
+    high_cents = open_cents + high_move
 
-# Main function
-if __name__ == "__main__":
-    dates = get_date_range(args.timeframe)
-    historical_data = generate_historical_data(args.symbol, dates)
+    return {
+        'date': np.asarray(dates, dtype='datetime64[D]'),
+        'open_price': open_cents / 100,
+        'high_price': high_cents / 100,
+        'low_price': low_cents / 100,
+        'close_price': close_cents / 100,
+        'volume': rng.integers(1000, 10000, count, endpoint=True)
+    }
+
+
+def generate_historical_data(symbol, dates, seed=None, rng=None):
+    """Bars for `dates` as the list of dicts written to the JSON file"""
+    return columns_to_records(symbol, generate_columns(symbol, dates, seed, rng))
+
+
+def columns_to_records(symbol, columns):
+    rows = zip(np.datetime_as_string(columns['date']).tolist(),
+               columns['open_price'].tolist(), columns['high_price'].tolist(),
+               columns['low_price'].tolist(), columns['close_price'].tolist(),
+               columns['volume'].tolist())
+    return [{
+        'date': date,
+        'symbol': symbol,
+        'open_price': open_price,
+        'high_price': high_price,
+        'low_price': low_price,
+        'close_price': close_price,
+        'volume': volume
+    } for date, open_price, high_price, low_price, close_price, volume in rows]
+
+
+def load_symbols(symbols=None, symbols_file=None):
+    """Symbol universe from a comma-separated list and/or a file with one symbol per line"""
+    universe = []
+    if symbols:
+        universe += symbols.split(',')
+    if symbols_file:
+        with open(symbols_file, 'r') as f:
+            universe += f.read().split()
+    seen = {}
+    for symbol in universe:
+        symbol = symbol.strip().upper()
+        if symbol:
+            seen.setdefault(symbol, None)
+    return list(seen)
+
+
+def _generate_shard(symbols, dates, store, provider):
+    for symbol in symbols:
+        write_symbol(store, symbol, generate_columns(symbol, dates, rng=provider))
+    return len(symbols)
+
+
+def generate_universe(symbols, dates, store, seed=None, workers=None, shard_size=64, rng=None):
+    """
+    Generate every symbol and write it straight to the columnar store
+
+    Symbols are sharded across a process pool; each symbol draws from its own
+    stream of one provider, so the output does not depend on `workers`.
+    """
+    provider = as_provider(rng, seed)
+    shards = [symbols[i:i + shard_size] for i in range(0, len(symbols), shard_size)]
+    if workers == 1 or len(shards) <= 1:
+        return sum(_generate_shard(shard, dates, store, provider) for shard in shards)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_generate_shard, shards,
+                            [dates] * len(shards), [store] * len(shards), [provider] * len(shards)))
+
+
+def generate_intraday(parser, args):
+    """Stream intraday minute bars or ticks to the JSON file and/or columnar store"""
+    if args.no_json and not args.store:
+        parser.error('--no_json needs --store')
+    count, step = TIMEFRAMES[args.timeframe]
+    days = session_days(count * step, previous_day_only=args.timeframe == '1day')
+    rows = intraday_rows(days, args.interval, args.tick_rate, args.ticks_per_bar)
+
+    writers = []
+    if not args.no_json:
+        writers.append(JSONStreamWriter(args.output, args.symbol))
+    if args.store:
+        writers.append(ColumnStreamWriter(args.store, args.symbol, rows))
+    chunks = iter_intraday(days, args.interval, args.tick_rate, args.ticks_per_bar,
+                           seed=args.seed, rng=args.rng)
+    written = write_intraday(writers, chunks)
+
+    destinations = ([] if args.no_json else [args.output]) + ([args.store] if args.store else [])
+    print(f"{written} {args.interval} records for {args.symbol} saved to {' and '.join(destinations)}")
+
+
+def main(argv=None):
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description='Generate historical stock data and store it in a JSON file or columnar store.')
+    parser.add_argument('--symbol', type=str, default='AAPL',
+                        help='Stock symbol (default: AAPL)')
+    parser.add_argument('--symbols', type=str, default=None,
+                        help='Comma-separated symbol universe (requires --store)')
+    parser.add_argument('--symbols_file', type=str, default=None,
+                        help='File with one symbol per line (requires --store)')
+    parser.add_argument('--timeframe', type=str, default='1year', choices=list(TIMEFRAMES),
+                        help='Timeframe for historical data (default: 1year)')
+    parser.add_argument('--daily', action='store_true',
+                        help='One bar per day for every timeframe')
+    parser.add_argument('--interval', type=str, default='bar', choices=['bar', '1min', 'tick'],
+                        help='Daily/weekly bars, intraday minute bars or ticks (default: bar)')
+    parser.add_argument('--tick_rate', type=float, default=50.0,
+                        help='Ticks per session second for --interval tick (default: 50)')
+    parser.add_argument('--ticks_per_bar', type=int, default=60,
+                        help='Simulated ticks per minute bar for --interval 1min (default: 60)')
+    parser.add_argument('--no_json', action='store_true',
+                        help='Skip the JSON output of --interval 1min/tick (requires --store)')
+    parser.add_argument('--output', type=str, default='historical_data.json',
+                        help='Output JSON file (default: historical_data.json)')
+    parser.add_argument('--store', type=str, default=None,
+                        help='Also write the data to this columnar store directory')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed for reproducible output')
+    parser.add_argument('--rng', type=str, default='pcg64', choices=RNG_BACKENDS,
+                        help=f'Random number backend (default: pcg64); {QUANTUM_RNG_NOTE}')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes for a symbol universe (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    if args.interval != 'bar':
+        generate_intraday(parser, args)
+        return
+
+    dates = get_date_range(args.timeframe, daily=args.daily)
+
+    if args.symbols or args.symbols_file:
+        if not args.store:
+            parser.error('--symbols/--symbols_file write to a columnar store; pass --store')
+        universe = load_symbols(args.symbols, args.symbols_file)
+        count = generate_universe(universe, dates, args.store, args.seed, args.workers, rng=args.rng)
+        print(f"Historical data for {count} symbols saved to {args.store}")
+        return
+
+    columns = generate_columns(args.symbol, dates, args.seed, args.rng)
+    historical_data = columns_to_records(args.symbol, columns)
 
     # Save the generated data to a JSON file
     with open(args.output, 'w') as f:
         json.dump(historical_data, f, indent=4)
 
     print(f"Historical data for {args.symbol} saved to {args.output}")
+
+    if args.store:
+        write_symbol(args.store, args.symbol, columns)
+        print(f"Columnar data for {args.symbol} saved to {args.store}")
+
+
+# Main function
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+from datetime import datetime
+import numpy as np
+
+from columnar_store import symbol_dir
+
+# Reuse the HFTSimulator price dynamics from the real-time server
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'real-time-stock-server'))
+from price_dynamics import iter_paths  # noqa: E402
+
+# Regular trading session, 09:30-16:00 on business days
+SESSION_OPEN = np.timedelta64(9 * 60 + 30, 'm')
+SESSION_SECONDS = int(6.5 * 3600)
+
+# Ticks are generated and written this many at a time
+CHUNK_TICKS = 1 << 18
+
+
+def session_days(timeframe_days, previous_day_only=False):
+    """
+    Business days covering the last `timeframe_days` calendar days, oldest first
+
+    previous_day_only: only the last business day before today ('1day')
+    """
+    today = np.datetime64(datetime.now().date(), 'D')
+    if previous_day_only:
+        return np.array([np.busday_offset(today - 1, 0, roll='backward')])
+    days = np.arange(today - timeframe_days + 1, today + 1, dtype='datetime64[D]')
+    return days[np.is_busday(days)]
+
+
+def tick_timestamps(days, first_tick, count, ticks_per_day):
+    """
+    Vectorized timestamps for ticks first_tick .. first_tick + count - 1
+
+    Ticks are spread evenly across each day's session.
+    """
+    index = first_tick + np.arange(count)
+    day = days[index // ticks_per_day].astype('datetime64[us]')
+    offset_us = (index % ticks_per_day) * (SESSION_SECONDS * 1_000_000 // ticks_per_day)
+    return day + SESSION_OPEN + offset_us.astype('timedelta64[us]')
+
+
+def iter_intraday(days, interval='tick', tick_rate=50.0, ticks_per_bar=60, base_price=150.0,
+                  random_enabled=True, seed=None, rng=None):
+    """
+    Generate intraday data chunk by chunk with the HFTSimulator dynamics
+
+    interval='tick' yields {'date', 'price', 'had_shock'} chunks with tick_rate
+    ticks per session second; interval='1min' simulates ticks_per_bar ticks per
+    minute and yields OHLCV minute bars, where volume is the tick count.
+    Each chunk is at most CHUNK_TICKS ticks, so memory does not grow with the
+    total number of ticks.
+
+    rng: RNGProvider or backend name (see rng_provider)
+    """
+    if interval == 'tick':
+        ticks_per_day = int(SESSION_SECONDS * tick_rate)
+        block = CHUNK_TICKS
+    else:
+        bars_per_day = SESSION_SECONDS // 60
+        ticks_per_day = bars_per_day * ticks_per_bar
+        block = max(1, CHUNK_TICKS // ticks_per_bar) * ticks_per_bar
+
+    total = len(days) * ticks_per_day
+    first_tick = 0
+    for chunk in iter_paths(total, 1, base_price=base_price, random_enabled=random_enabled,
+                            seed=seed, block_size=block, rng=rng):
+        prices = chunk['price'][:, 0]
+        count = len(prices)
+        if interval == 'tick':
+            yield {
+                'date': tick_timestamps(days, first_tick, count, ticks_per_day),
+                'price': prices,
+                'had_shock': chunk['had_shock'][:, 0]
+            }
+        else:
+            bars = prices.reshape(-1, ticks_per_bar)
+            first_bar = first_tick // ticks_per_bar
+            yield {
+                'date': tick_timestamps(days, first_bar, len(bars), bars_per_day).astype('datetime64[s]'),
+                'open_price': bars[:, 0],
+                'high_price': bars.max(axis=1),
+                'low_price': bars.min(axis=1),
+                'close_price': bars[:, -1],
+                'volume': np.full(len(bars), ticks_per_bar, dtype=np.int64)
+            }
+        first_tick += count
+
+
+def intraday_rows(days, interval='tick', tick_rate=50.0, ticks_per_bar=60):
+    """Number of records iter_intraday will produce"""
+    if interval == 'tick':
+        return len(days) * int(SESSION_SECONDS * tick_rate)
+    return len(days) * (SESSION_SECONDS // 60)
+
+
+class JSONStreamWriter:
+    def __init__(self, path, symbol):
+        """
+        Write chunks of columns as one JSON list of dicts, one chunk at a time
+
+        The file has the same shape as the daily generator's output, with
+        'date' holding the full timestamp.
+        """
+        self.symbol = symbol
+        self.file = open(path, 'w')
+        self.file.write('[')
+        self.empty = True
+
+    def write(self, columns):
+        dates = columns['date']
+        unit = 'ms' if dates.dtype == np.dtype('datetime64[us]') else 's'
+        names = [name for name in columns if name != 'date']
+        values = zip(np.datetime_as_string(dates, unit=unit).tolist(),
+                     *(columns[name].tolist() for name in names))
+        records = [json.dumps(dict(date=row[0], symbol=self.symbol, **dict(zip(names, row[1:]))))
+                   for row in values]
+        if records:
+            self.file.write(('\n' if self.empty else ',\n') + ',\n'.join(records))
+            self.empty = False
+
+    def close(self):
+        self.file.write('\n]\n')
+        self.file.close()
+
+
+class ColumnStreamWriter:
+    def __init__(self, root, symbol, rows):
+        """
+        Append chunks of columns to the columnar store's .npy files
+
+        Each file gets a header sized for `rows` records up front and the data
+        is appended chunk by chunk, so nothing is held in memory.
+
+        root: columnar store directory
+        rows: total number of records that will be written
+        """
+        self.directory = symbol_dir(root, symbol)
+        os.makedirs(self.directory, exist_ok=True)
+        self.rows = rows
+        self.files = {}
+
+    def write(self, columns):
+        for name, values in columns.items():
+            if name not in self.files:
+                self.files[name] = open(os.path.join(self.directory, name + '.npy'), 'wb')
+                np.lib.format.write_array_header_1_0(self.files[name], {
+                    'descr': np.lib.format.dtype_to_descr(values.dtype),
+                    'fortran_order': False,
+                    'shape': (self.rows,)
+                })
+            self.files[name].write(np.ascontiguousarray(values).tobytes())
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        self.files.clear()
+
+
+def write_intraday(writers, chunks):
+    """Stream every chunk to every writer, then close them; returns the row count"""
+    rows = 0
+    try:
+        for chunk in chunks:
+            for writer in writers:
+                writer.write(chunk)
+            rows += len(chunk['date'])
+    finally:
+        for writer in writers:
+            writer.close()
+    return rows
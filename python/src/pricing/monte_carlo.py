@@ -0,0 +1,330 @@
+import os
+import sys
+import math
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from options import EuropeanOption, AsianOption, BarrierOption, BARRIER_TYPES, black_scholes
+
+# Simulate the same dynamics as the live HFTSimulator
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'real-time-stock-server'))
+from price_dynamics import (  # noqa: E402
+    RandomShockGenerator, draw_innovations, clustered_volatility, mean_reverting_scan)
+from rng_provider import RNG_BACKENDS, QUANTUM_RNG_NOTE, as_provider  # noqa: E402
+
+# Paths simulated per chunk; each chunk is one vectorized batch with its own
+# random stream, so results do not depend on how chunks are spread over workers
+DEFAULT_CHUNK_PATHS = 10_000
+
+# Per-chunk sufficient statistics: n, sum y, sum y^2, sum x, sum x^2, sum xy
+# where y is the discounted payoff and x the discounted terminal price
+STATS_SIZE = 6
+
+
+class GBMModel:
+    def __init__(self, spot, rate=0.0, volatility=0.2, maturity=1.0, n_steps=252):
+        """
+        Geometric Brownian motion under the risk-neutral measure
+
+        spot: initial price
+        rate: continuously compounded risk-free rate
+        volatility: annualized volatility
+        maturity: time to expiry in years
+        n_steps: simulated steps between now and expiry
+        """
+        self.spot = spot
+        self.rate = rate
+        self.volatility = volatility
+        self.maturity = maturity
+        self.n_steps = n_steps
+
+    @property
+    def discount(self):
+        return math.exp(-self.rate * self.maturity)
+
+    @property
+    def expected_terminal(self):
+        return self.spot * math.exp(self.rate * self.maturity)
+
+    def simulate(self, rng, n_paths, antithetic=False):
+        """
+        Price paths of shape (n_steps, n_paths)
+
+        antithetic: the second half of the paths uses the negated draws of the
+        first half (n_paths must be even)
+        """
+        dt = self.maturity / self.n_steps
+        z = rng.standard_normal((self.n_steps, n_paths // 2 if antithetic else n_paths))
+        if antithetic:
+            z = np.concatenate([z, -z], axis=1)
+        drift = (self.rate - 0.5 * self.volatility ** 2) * dt
+        return self.spot * np.exp(np.cumsum(drift + self.volatility * math.sqrt(dt) * z, axis=0))
+
+
+class HFTModel:
+    def __init__(self, base_price, volatility_factor=0.0001, mean_reversion=0.1,
+                 random_enabled=True, n_steps=252, rate=0.0, maturity=1.0):
+        """
+        The HFTSimulator process: mean reversion, clustered volatility and shocks
+
+        Each step is one simulated tick. The process is not risk-neutral; rate
+        and maturity are only used to discount the payoff.
+
+        random_enabled: include RandomShockGenerator jumps
+        """
+        self.base_price = base_price
+        self.volatility_factor = volatility_factor
+        self.mean_reversion = mean_reversion
+        self.random_enabled = random_enabled
+        self.n_steps = n_steps
+        self.rate = rate
+        self.maturity = maturity
+
+    @property
+    def discount(self):
+        return math.exp(-self.rate * self.maturity)
+
+    @property
+    def expected_terminal(self):
+        # Noise and shocks are symmetric, so the deviation from base has mean zero
+        return self.base_price
+
+    def simulate(self, rng, n_paths, antithetic=False):
+        """
+        Price paths of shape (n_steps, n_paths)
+
+        antithetic: the second half of the paths mirrors the first half around
+        the base price (negated noise and shocks, same volatility)
+        """
+        shock_generator = RandomShockGenerator(self.base_price, rng=rng)
+        vol_multipliers, noise, shocks = draw_innovations(
+            rng, shock_generator, self.n_steps, n_paths // 2 if antithetic else n_paths)
+        if not self.random_enabled:
+            shocks = np.zeros_like(shocks)
+        volatility, _ = clustered_volatility(
+            vol_multipliers, self.base_price * self.volatility_factor, np.zeros(noise.shape[1]))
+        innovations = noise * volatility + shocks
+        if antithetic:
+            innovations = np.concatenate([innovations, -innovations], axis=1)
+        deviation = mean_reverting_scan(
+            innovations, 1 - self.mean_reversion, np.zeros(innovations.shape[1]))
+        return self.base_price + deviation
+
+
+def chunk_statistics(model, option, provider, chunk, chunk_paths, antithetic=True):
+    """
+    Simulate one chunk of paths and return its STATS_SIZE sufficient statistics
+
+    The chunk draws from stream `chunk` of the provider. With antithetic
+    variates each sample is the average of a path and its mirror, so samples
+    stay independent and the standard error is still valid.
+    """
+    rng = provider.generator(chunk)
+    paths = model.simulate(rng, chunk_paths, antithetic)
+    y = model.discount * option.payoff(paths)
+    x = model.discount * paths[-1]
+    if antithetic:
+        half = paths.shape[1] // 2
+        y = 0.5 * (y[:half] + y[half:])
+        x = 0.5 * (x[:half] + x[half:])
+    return np.array([len(y), y.sum(), (y * y).sum(), x.sum(), (x * x).sum(), (x * y).sum()])
+
+
+def estimate(stats, control_mean=None):
+    """
+    Price and standard error from summed chunk statistics
+
+    control_mean: known mean of the discounted terminal price; when given it
+    is used as a control variate with the variance-minimizing coefficient
+    """
+    n, sum_y, sum_yy, sum_x, sum_xx, sum_xy = stats
+    mean_y = sum_y / n
+    var_y = max(sum_yy / n - mean_y ** 2, 0.0)
+    if control_mean is None:
+        price, variance = mean_y, var_y
+    else:
+        mean_x = sum_x / n
+        var_x = sum_xx / n - mean_x ** 2
+        cov = sum_xy / n - mean_x * mean_y
+        beta = cov / var_x if var_x > 0 else 0.0
+        price = mean_y - beta * (mean_x - control_mean)
+        variance = max(var_y - beta * cov, 0.0)
+    stderr = math.sqrt(variance / (n - 1)) if n > 1 else math.inf
+    return price, stderr
+
+
+class MonteCarloPricer:
+    def __init__(self, model, option, chunk_paths=DEFAULT_CHUNK_PATHS, antithetic=True,
+                 control_variate=True, rng=None, seed=None, workers=1):
+        """
+        Chunked Monte Carlo pricer with variance reduction
+
+        model: GBMModel or HFTModel
+        option: EuropeanOption, AsianOption or BarrierOption
+        chunk_paths: paths per vectorized chunk
+        rng: RNGProvider or backend name; chunk i always uses stream i
+        workers: processes simulating chunks in parallel (1 runs in-process)
+        """
+        self.model = model
+        self.option = option
+        self.chunk_paths = chunk_paths + (chunk_paths % 2 if antithetic else 0)
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.provider = as_provider(rng, seed)
+        self.workers = workers
+
+    def _run_chunks(self, pool, chunks):
+        args = (self.model, self.option, self.provider)
+        if pool is None:
+            return [chunk_statistics(*args, chunk, self.chunk_paths, self.antithetic)
+                    for chunk in chunks]
+        count = len(chunks)
+        return list(pool.map(chunk_statistics, [self.model] * count, [self.option] * count,
+                             [self.provider] * count, chunks, [self.chunk_paths] * count,
+                             [self.antithetic] * count))
+
+    def price(self, n_paths=100_000, time_budget=None, target_stderr=None):
+        """
+        Price the option, stopping early once a budget is met
+
+        n_paths: maximum number of paths (rounded up to whole chunks)
+        time_budget: stop after this many seconds
+        target_stderr: stop once the standard error is at or below this
+
+        Returns a dict with price, stderr, ci95, paths, chunks, elapsed, the
+        reason it stopped and the convergence history (one entry per wave of
+        chunks).
+        """
+        control_mean = (self.model.discount * self.model.expected_terminal
+                        if self.control_variate else None)
+        max_chunks = max(1, math.ceil(n_paths / self.chunk_paths))
+        wave = max(1, self.workers)
+        stats = np.zeros(STATS_SIZE)
+        convergence = []
+        done = 0
+        stopped = 'paths'
+        start = time.perf_counter()
+
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while done < max_chunks:
+                chunks = list(range(done, min(done + wave, max_chunks)))
+                for chunk_stats in self._run_chunks(pool, chunks):
+                    stats += chunk_stats
+                done += len(chunks)
+
+                price, stderr = estimate(stats, control_mean)
+                elapsed = time.perf_counter() - start
+                convergence.append({'paths': done * self.chunk_paths, 'price': price,
+                                    'stderr': stderr, 'elapsed': elapsed})
+                if target_stderr is not None and stderr <= target_stderr:
+                    stopped = 'target_stderr'
+                    break
+                if time_budget is not None and elapsed >= time_budget:
+                    stopped = 'time_budget'
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        last = convergence[-1]
+        return {
+            'price': last['price'],
+            'stderr': last['stderr'],
+            'ci95': (last['price'] - 1.96 * last['stderr'], last['price'] + 1.96 * last['stderr']),
+            'paths': last['paths'],
+            'chunks': done,
+            'elapsed': last['elapsed'],
+            'stopped': stopped,
+            'convergence': convergence
+        }
+
+
+def build_option(args):
+    if args.option == 'asian':
+        return AsianOption(args.strike, args.kind)
+    if args.option == 'barrier':
+        return BarrierOption(args.strike, args.barrier, args.kind, args.barrier_type)
+    return EuropeanOption(args.strike, args.kind)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Price European, Asian and barrier options by Monte Carlo simulation.')
+    parser.add_argument('--model', type=str, default='gbm', choices=['gbm', 'hft'],
+                        help='Price process: GBM or the HFTSimulator dynamics (default: gbm)')
+    parser.add_argument('--option', type=str, default='european',
+                        choices=['european', 'asian', 'barrier'],
+                        help='Option type (default: european)')
+    parser.add_argument('--kind', type=str, default='call', choices=['call', 'put'],
+                        help='Call or put (default: call)')
+    parser.add_argument('--spot', type=float, default=150.0,
+                        help='Initial / base price (default: 150)')
+    parser.add_argument('--strike', type=float, default=150.0,
+                        help='Strike price (default: 150)')
+    parser.add_argument('--barrier', type=float, default=180.0,
+                        help='Barrier level for --option barrier (default: 180)')
+    parser.add_argument('--barrier_type', type=str, default='up-and-out', choices=BARRIER_TYPES,
+                        help='Barrier type (default: up-and-out)')
+    parser.add_argument('--rate', type=float, default=0.05,
+                        help='Risk-free rate (default: 0.05)')
+    parser.add_argument('--volatility', type=float, default=0.2,
+                        help='GBM annualized volatility (default: 0.2)')
+    parser.add_argument('--volatility_factor', type=float, default=0.0001,
+                        help='HFT volatility as a fraction of the base price (default: 0.0001)')
+    parser.add_argument('--mean_reversion', type=float, default=0.1,
+                        help='HFT mean reversion strength (default: 0.1)')
+    parser.add_argument('--no_shocks', action='store_true',
+                        help='Disable HFT random shocks')
+    parser.add_argument('--maturity', type=float, default=1.0,
+                        help='Time to expiry in years (default: 1)')
+    parser.add_argument('--steps', type=int, default=252,
+                        help='Simulated steps (HFT ticks) to expiry (default: 252)')
+    parser.add_argument('--paths', type=int, default=100_000,
+                        help='Maximum number of paths (default: 100000)')
+    parser.add_argument('--chunk_paths', type=int, default=DEFAULT_CHUNK_PATHS,
+                        help=f'Paths per chunk (default: {DEFAULT_CHUNK_PATHS})')
+    parser.add_argument('--time_budget', type=float, default=None,
+                        help='Stop after this many seconds')
+    parser.add_argument('--target_stderr', type=float, default=None,
+                        help='Stop once the standard error reaches this')
+    parser.add_argument('--no_antithetic', action='store_true',
+                        help='Disable antithetic variates')
+    parser.add_argument('--no_control_variate', action='store_true',
+                        help='Disable the terminal-price control variate')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes (default: 1)')
+    parser.add_argument('--rng', type=str, default='pcg64', choices=RNG_BACKENDS,
+                        help=f'Random number backend (default: pcg64); {QUANTUM_RNG_NOTE}')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed; chunk i uses stream i')
+    args = parser.parse_args(argv)
+
+    if args.model == 'gbm':
+        model = GBMModel(args.spot, args.rate, args.volatility, args.maturity, args.steps)
+    else:
+        model = HFTModel(args.spot, args.volatility_factor, args.mean_reversion,
+                         not args.no_shocks, args.steps, args.rate, args.maturity)
+    pricer = MonteCarloPricer(model, build_option(args), args.chunk_paths,
+                              antithetic=not args.no_antithetic,
+                              control_variate=not args.no_control_variate,
+                              rng=args.rng, seed=args.seed, workers=args.workers)
+    result = pricer.price(args.paths, args.time_budget, args.target_stderr)
+
+    print(f"{'paths':>10} {'price':>12} {'stderr':>10} {'seconds':>9}")
+    for row in result['convergence']:
+        print(f"{row['paths']:>10} {row['price']:>12.5f} {row['stderr']:>10.5f} {row['elapsed']:>9.3f}")
+    low, high = result['ci95']
+    print(f"Price {result['price']:.5f} +/- {result['stderr']:.5f} (95% CI {low:.5f} - {high:.5f}), "
+          f"{result['paths']} paths in {result['elapsed']:.3f}s, stopped on {result['stopped']}")
+    if args.model == 'gbm' and args.option == 'european':
+        reference = black_scholes(args.spot, args.strike, args.rate, args.volatility,
+                                  args.maturity, args.kind)
+        print(f"Black-Scholes {reference:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import math
+import numpy as np
+
+OPTION_KINDS = ('call', 'put')
+BARRIER_TYPES = ('up-and-out', 'up-and-in', 'down-and-out', 'down-and-in')
+
+
+def intrinsic(prices, strike, kind):
+    """Call or put payoff of `prices` against `strike`"""
+    if kind == 'call':
+        return np.maximum(prices - strike, 0.0)
+    return np.maximum(strike - prices, 0.0)
+
+
+class EuropeanOption:
+    def __init__(self, strike, kind='call'):
+        """
+        strike: strike price
+        kind: 'call' or 'put'
+        """
+        if kind not in OPTION_KINDS:
+            raise ValueError(f"Unknown option kind: {kind}")
+        self.strike = strike
+        self.kind = kind
+
+    def payoff(self, paths):
+        """Payoff per path; paths has shape (n_steps, n_paths), last row is expiry"""
+        return intrinsic(paths[-1], self.strike, self.kind)
+
+
+class AsianOption(EuropeanOption):
+    """Arithmetic-average-price option, averaged over every simulated step"""
+
+    def payoff(self, paths):
+        return intrinsic(paths.mean(axis=0), self.strike, self.kind)
+
+
+class BarrierOption(EuropeanOption):
+    def __init__(self, strike, barrier, kind='call', barrier_type='up-and-out'):
+        """
+        European option that is knocked in or out when the barrier is touched
+
+        The barrier is monitored discretely, at every simulated step.
+
+        barrier: barrier price level
+        barrier_type: 'up-and-out', 'up-and-in', 'down-and-out' or 'down-and-in'
+        """
+        super().__init__(strike, kind)
+        if barrier_type not in BARRIER_TYPES:
+            raise ValueError(f"Unknown barrier type: {barrier_type}")
+        self.barrier = barrier
+        self.barrier_type = barrier_type
+
+    def payoff(self, paths):
+        if self.barrier_type.startswith('up'):
+            touched = paths.max(axis=0) >= self.barrier
+        else:
+            touched = paths.min(axis=0) <= self.barrier
+        alive = touched if self.barrier_type.endswith('in') else ~touched
+        return np.where(alive, intrinsic(paths[-1], self.strike, self.kind), 0.0)
+
+
+def black_scholes(spot, strike, rate, volatility, maturity, kind='call'):
+    """Closed-form European option price under GBM, for checking the GBM engine"""
+    sqrt_t = volatility * math.sqrt(maturity)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * volatility ** 2) * maturity) / sqrt_t
+    d2 = d1 - sqrt_t
+
+    def cdf(x):
+        return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+    discount = math.exp(-rate * maturity)
+    if kind == 'call':
+        return spot * cdf(d1) - strike * discount * cdf(d2)
+    return strike * discount * cdf(-d2) - spot * cdf(-d1)
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import time
+import logging
+from collections import defaultdict, deque, OrderedDict
+import websockets
+
+from wire_format import WIRE_FORMATS, encode_batch, pack_ticks, valid_symbol
+from metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+# What to do when a client's outbound queue is full
+SLOW_CLIENT_POLICIES = ('drop-oldest', 'conflate', 'disconnect')
+
+# Most feed tasks a hub runs at once (pinned feeds included)
+DEFAULT_MAX_FEEDS = 64
+
+# Time each frame spends in websocket.send, including waits on a full socket buffer
+SEND_SECONDS = histogram('client_send_seconds', 'Time to write one frame to a client socket')
+
+
+class ClientSession:
+    def __init__(self, websocket, policy='drop-oldest', max_queue=256):
+        """
+        Bounded outbound queue and writer task for one WebSocket client
+
+        Publishing only enqueues, so a slow client never delays the feeds or
+        other clients. drop-oldest discards the oldest frame when the queue is
+        full, and disconnect closes the connection instead. conflate always
+        keeps only the latest JSON frame per symbol: a new price replaces the
+        one still queued at any queue depth, and a full queue drops its oldest
+        frame. Binary batch frames carry every tick of their interval, so they
+        are never conflated.
+
+        policy: one of SLOW_CLIENT_POLICIES
+        max_queue: maximum number of frames waiting to be sent
+        """
+        if policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Unknown slow client policy: {policy}")
+        self.websocket = websocket
+        self.format = 'json'  # or 'binary' once the client negotiates it
+        self.policy = policy
+        self.max_queue = max_queue
+        # conflate keys frames by symbol so a newer price replaces the queued one
+        self.queue = OrderedDict() if policy == 'conflate' else deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._batches = 0  # distinct queue keys for binary frames under conflate
+        self.closing = None  # task closing the connection once close() is called
+        self.writer = asyncio.create_task(self._write())
+
+    @property
+    def depth(self):
+        return len(self.queue)
+
+    def enqueue(self, symbol, payload):
+        """Queue a serialized frame without blocking"""
+        if self.closed:
+            return
+        if self.policy == 'conflate':
+            if isinstance(payload, bytes):
+                self._batches += 1
+                symbol = (symbol, self._batches)
+            if symbol in self.queue:
+                self.dropped += 1
+                self.queue.move_to_end(symbol)
+            elif len(self.queue) >= self.max_queue:
+                self.queue.popitem(last=False)
+                self.dropped += 1
+            self.queue[symbol] = payload
+        elif len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            if self.policy == 'disconnect':
+                self.close()
+                return
+            self.queue.popleft()
+            self.queue.append(payload)
+        else:
+            self.queue.append(payload)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self.ready.set()
+
+    def _next_payload(self):
+        if self.policy == 'conflate':
+            return self.queue.popitem(last=False)[1]
+        return self.queue.popleft()
+
+    async def _write(self):
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.queue and not self.closed:
+                    start = time.perf_counter()
+                    await self.websocket.send(self._next_payload())
+                    SEND_SECONDS.observe(time.perf_counter() - start)
+                    self.sent += 1
+        except websockets.ConnectionClosed:
+            self.closed = True
+
+    def close(self):
+        """Stop sending and close the connection (lagging clients are closed with 1008)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.ready.set()
+        self.closing = asyncio.create_task(self._close_connection())
+
+    async def _close_connection(self):
+        try:
+            await self.websocket.close(code=1008, reason='client too slow')
+        except (websockets.ConnectionClosed, OSError):
+            pass
+
+    def metrics(self):
+        return {
+            'remote': str(getattr(self.websocket, 'remote_address', '')),
+            'format': self.format,
+            'policy': self.policy,
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'closed': self.closed
+        }
+
+
+class BroadcastHub:
+    def __init__(self, feed_factory=None, batch_size=256, recorder=None,
+                 allowed_symbols=None, max_feeds=DEFAULT_MAX_FEEDS):
+        """
+        Fan-out hub between per-symbol price feeds and WebSocket clients
+
+        Each published message is serialized once and written to every client
+        subscribed to its symbol. JSON clients get one frame per tick; binary
+        clients get batches of ticks packed into a single frame by flush().
+
+        feed_factory: coroutine function feed_factory(symbol, hub) started as a
+        task the first time a symbol is subscribed to, and cancelled when its
+        last subscriber leaves unless the feed is pinned
+        batch_size: pending binary ticks per symbol that trigger an early flush
+        recorder: optional tick_log.TickRecorder that every published tick is
+        queued to, whether or not anyone is subscribed
+        allowed_symbols: symbols clients may subscribe to (None allows any)
+        max_feeds: most feed tasks running at once; further symbols are refused
+        """
+        self.feed_factory = feed_factory
+        self.batch_size = batch_size
+        self.recorder = recorder
+        self.allowed_symbols = None if allowed_symbols is None else set(allowed_symbols)
+        self.max_feeds = max_feeds
+        self.subscribers = defaultdict(set)  # symbol -> set of ClientSessions
+        self.feeds = {}  # symbol -> running feed task
+        self.pinned = set()  # symbols whose feeds run without subscribers
+        self.pending = defaultdict(list)  # symbol -> [(timestamp, message)] for binary clients
+        self.published = 0
+
+    def ensure_feed(self, symbol, pinned=False):
+        """
+        Start the simulation task for `symbol` if it is not running yet
+
+        pinned: keep the feed running when it has no subscribers
+        Returns False when the symbol is not allowed or max_feeds are running.
+        """
+        if self.allowed_symbols is not None and symbol not in self.allowed_symbols:
+            return False
+        if pinned:
+            self.pinned.add(symbol)
+        if symbol not in self.feeds and self.feed_factory is not None:
+            if len(self.feeds) >= self.max_feeds:
+                return False
+            self.feeds[symbol] = asyncio.create_task(self.feed_factory(symbol, self))
+        return True
+
+    def release_feed(self, symbol):
+        """Cancel `symbol`'s feed and forget the symbol unless it is pinned or still subscribed"""
+        if symbol in self.pinned or self.subscribers.get(symbol):
+            return
+        self.subscribers.pop(symbol, None)
+        self.pending.pop(symbol, None)
+        task = self.feeds.pop(symbol, None)
+        if task is not None:
+            task.cancel()
+
+    def subscribe(self, session, symbols):
+        """Subscribe `session` to `symbols`; returns the symbols that were refused"""
+        refused = []
+        for symbol in symbols:
+            if self.ensure_feed(symbol):
+                self.subscribers[symbol].add(session)
+            else:
+                refused.append(symbol)
+        return refused
+
+    def unsubscribe(self, session, symbols=None):
+        """Remove `session` from `symbols` (all symbols when None)"""
+        for symbol in list(self.subscribers) if symbols is None else symbols:
+            sessions = self.subscribers.get(symbol)
+            if sessions is None:
+                continue
+            sessions.discard(session)
+            if not sessions:
+                self.release_feed(symbol)
+
+    def symbols_for(self, session):
+        return [symbol for symbol, sessions in list(self.subscribers.items())
+                if session in sessions]
+
+    def sessions(self):
+        return set().union(*list(self.subscribers.values()))
+
+    def publish(self, symbol, message):
+        """Serialize `message` once and queue it for every subscriber of `symbol`"""
+        if self.recorder is not None:
+            self.recorder.append_message(symbol, message)
+        sessions = self.subscribers.get(symbol)
+        if not sessions:
+            return
+        payload = None
+        has_binary = False
+        for session in list(sessions):
+            if session.closed:
+                sessions.discard(session)
+            elif session.format == 'binary':
+                has_binary = True
+            else:
+                if payload is None:
+                    payload = json.dumps(message)
+                session.enqueue(symbol, payload)
+
+        if has_binary:
+            pending = self.pending[symbol]
+            pending.append((time.time(), message))
+            if len(pending) >= self.batch_size:
+                self.flush(symbol)
+        self.published += 1
+
+    def flush(self, symbol=None):
+        """Pack pending ticks into one binary frame per symbol and queue it"""
+        for symbol in list(self.pending) if symbol is None else [symbol]:
+            pending = self.pending.pop(symbol, None)
+            if not pending:
+                continue
+            try:
+                frame = encode_batch(pack_ticks([message for _, message in pending],
+                                                [timestamp for timestamp, _ in pending]))
+            except (ValueError, TypeError, KeyError):
+                # One malformed batch must not stop the batcher for every symbol
+                logger.exception("Dropped %d binary ticks for %r that could not be packed",
+                                 len(pending), symbol)
+                continue
+            for session in list(self.subscribers.get(symbol, ())):
+                if session.format == 'binary' and not session.closed:
+                    session.enqueue(symbol, frame)
+
+    async def run_batcher(self, interval=0.1):
+        """Flush binary batches every `interval` seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            self.flush()
+
+    def client_metrics(self):
+        """Per-connection queue depth and drop counters"""
+        return [dict(session.metrics(), symbols=self.symbols_for(session))
+                for session in self.sessions()]
+
+    async def stop(self):
+        """Cancel every feed task"""
+        for task in self.feeds.values():
+            task.cancel()
+        await asyncio.gather(*self.feeds.values(), return_exceptions=True)
+        self.feeds.clear()
+
+
+def parse_control_message(message):
+    """
+    Parse a client control message such as
+    {"action": "subscribe", "symbols": ["AAPL", "MSFT"]} or
+    {"action": "format", "format": "binary"}
+
+    Returns (action, symbols) or ("format", format) or None when the message
+    is not a valid command. Symbols that are not ASCII or are longer than a
+    tick record's symbol field are left out.
+    """
+    try:
+        request = json.loads(message)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(request, dict):
+        return None
+    action = request.get('action')
+    if action == 'format':
+        wire_format = request.get('format')
+        return (action, wire_format) if wire_format in WIRE_FORMATS else None
+    symbols = request.get('symbols', [])
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    if action not in ('subscribe', 'unsubscribe') or not isinstance(symbols, list):
+        return None
+    return action, [symbol.upper() for symbol in symbols if valid_symbol(symbol)]
@@ -0,0 +1,49 @@
+import math
+import numpy as np
+
+# Bar widths (seconds) a chart may switch to when its window outgrows the bar budget
+BAR_RESOLUTIONS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600)
+
+
+def bar_resolution(window_seconds, max_bars):
+    """Smallest standard bar width that fits `window_seconds` into `max_bars` candles"""
+    needed = window_seconds / max_bars
+    for resolution in BAR_RESOLUTIONS:
+        if resolution >= needed:
+            return resolution
+    return int(math.ceil(needed / 3600)) * 3600
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of `threshold - 2` equal
+    buckets in between, the point forming the largest triangle with the point
+    kept before it and the average of the next bucket, so peaks and troughs
+    survive. Returns the indices of the kept points.
+
+    x: increasing numbers (convert datetimes to integers first)
+    y: values, same length as x
+    threshold: number of points to keep
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = kept[bucket + 1] = start + int(areas.argmax())
+    return kept
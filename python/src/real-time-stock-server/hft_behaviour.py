@@ -1,80 +1,123 @@
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
 import threading
+import argparse
 import queue
 import time
-import random
+
+from price_dynamics import (  # noqa: F401
+    DEFAULT_BLOCK_SIZE, RandomShockGenerator, draw_innovations, iter_paths, generate_paths)
+from rng_provider import as_provider
+from tick_store import TickRingBuffer
+from stream_aggregator import StreamAggregator, DEFAULT_RESOLUTIONS
+from decimate import bar_resolution, lttb
+from price_bus import PriceBus, BusReader, local_datetimes
+from tick_log import TickRecorder
+from metrics import REGISTRY, PROFILER, counter, gauge, histogram
 
 # Global queue for price updates
 price_queue = queue.Queue()
 
-
-class RandomShockGenerator:
-    def __init__(self, base_price, frequency=0.1, magnitude_range=(0.001, 0.01)):
-        """
-        frequency: probability of shock occurring (0-1)
-        magnitude_range: (min_percent, max_percent) of base price for shock size
-        """
-        self.base_price = base_price
-        self.frequency = frequency
-        self.magnitude_range = magnitude_range
-
-    def generate_shock(self):
-        if random.random() < self.frequency:
-            magnitude = random.uniform(*self.magnitude_range) * self.base_price
-            return random.choice([-1, 1]) * magnitude
-        return 0
+# Hot-path metrics, scraped from /metrics on the Dash server
+ticks_generated = counter('ticks_generated_total', 'Simulated ticks published', symbol='HFT')
+gauge('price_queue_depth', 'Ticks waiting in price_queue for the next chart update',
+      function=price_queue.qsize)
+update_seconds = histogram('update_graph_seconds', 'Server-side time of one chart update callback')
 
 
 class HFTSimulator(threading.Thread):
-    def __init__(self, base_price, volatility_factor=0.0001, mean_reversion=0.1, random_enabled=False):
+    def __init__(self, base_price, volatility_factor=0.0001, mean_reversion=0.1, random_enabled=False,
+                 seed=None, block_size=DEFAULT_BLOCK_SIZE, rng=None, stream=None, recorder=None):
         super().__init__()
         self.base_price = base_price
         self.current_price = base_price
+        self.volatility_factor = volatility_factor
         self.volatility = base_price * volatility_factor
         self.mean_reversion = mean_reversion
         self.current_volatility = self.volatility
         self.running = True
         self.random_enabled = random_enabled
-        self.shock_generator = RandomShockGenerator(base_price)
+        # rng: RNGProvider or backend name; stream picks this simulator's stream
+        self.rng_provider = as_provider(rng, seed)
+        self.stream = stream
+        self.rng = self.rng_provider.generator(stream)
+        self.shock_generator = RandomShockGenerator(base_price, rng=self.rng)
+        self.seed = seed
+        self.block_size = block_size
+        self._block = None
+        self._block_pos = block_size
+        # Optional tick_log.TickRecorder capturing every tick off the tick loop
+        self.recorder = recorder
 
     def toggle_random(self):
         self.random_enabled = not self.random_enabled
         return self.random_enabled
 
+    def generate_paths(self, n_ticks, n_paths=1):
+        """
+        Offline mode: simulate n_ticks x n_paths ticks in one vectorized pass
+
+        Uses this simulator's parameters and random stream without touching its
+        live state.
+        """
+        return generate_paths(
+            n_ticks, n_paths,
+            base_price=self.base_price,
+            volatility_factor=self.volatility_factor,
+            mean_reversion=self.mean_reversion,
+            random_enabled=self.random_enabled,
+            block_size=self.block_size,
+            rng=self.rng_provider,
+            stream=self.stream
+        )
+
+    def step(self):
+        """Advance the simulation by one tick and return the tick"""
+        # Random inputs are drawn a block at a time, in the same order as iter_paths
+        if self._block_pos >= self.block_size:
+            self._block = draw_innovations(
+                self.rng, self.shock_generator, self.block_size, 1)
+            self._block_pos = 0
+        vol_multiplier, noise, shock = (
+            float(values[self._block_pos, 0]) for values in self._block)
+        self._block_pos += 1
+
+        # Update volatility (volatility clustering)
+        self.current_volatility = max(
+            self.volatility,
+            self.current_volatility * vol_multiplier
+        )
+
+        # Generate price change with mean reversion
+        deviation = self.current_price - self.base_price
+        mean_reversion_effect = -self.mean_reversion * deviation
+        random_change = noise * self.current_volatility
+        price_change = mean_reversion_effect + random_change
+
+        # Add random shock if enabled
+        if not self.random_enabled:
+            shock = 0.0
+        price_change += shock
+
+        # Update current price
+        self.current_price += price_change
+
+        return {
+            'timestamp': datetime.now(),
+            'price': self.current_price,
+            'had_shock': bool(shock)
+        }
+
     def run(self):
         while self.running:
-            # Update volatility (volatility clustering)
-            self.current_volatility = max(
-                self.volatility,
-                self.current_volatility * np.random.normal(1, 0.1)
-            )
-
-            # Generate price change with mean reversion
-            deviation = self.current_price - self.base_price
-            mean_reversion_effect = -self.mean_reversion * deviation
-            random_change = np.random.normal(0, self.current_volatility)
-            price_change = mean_reversion_effect + random_change
-
-            # Add random shock if enabled
-            if self.random_enabled:
-                shock = self.shock_generator.generate_shock()
-                price_change += shock
-
-            # Update current price
-            self.current_price += price_change
-
             # Put the new price and timestamp in the queue
-            price_queue.put({
-                'timestamp': datetime.now(),
-                'price': self.current_price,
-                'had_shock': bool(shock) if self.random_enabled else False
-            })
+            previous = self.current_price
+            tick = self.step()
+            price_queue.put(tick)
+            ticks_generated.inc()
+            if self.recorder is not None:
+                self.recorder.append(tick['timestamp'].timestamp(), 'HFT', tick['price'],
+                                     tick['price'] - previous, had_shock=tick['had_shock'])
 
             # Simulate HFT speed
             time.sleep(0.02)  # 50 trades per second
@@ -83,34 +126,52 @@ class HFTSimulator(threading.Thread):
         self.running = False
 
 
-# Initialize Dash app
-app = dash.Dash(__name__)
+# Most candles and shock markers sent to the browser (about one per pixel pair)
+MAX_BARS = 600
+MAX_MARKERS = 600
+
+# Refresh interval bounds (ms); in between it follows the callback's own cost
+MIN_REFRESH_MS = 100
+MAX_REFRESH_MS = 2000
+REFRESH_COST_FACTOR = 10
+
+# Identifies this server run, so browser state from an earlier run is discarded
+SERVER_RUN = time.time()
+
+# Store for historical data: a fixed-size tick buffer plus streaming statistics
+# and incrementally built bars
+tick_store = TickRingBuffer(capacity=65536)
 
-# Store for historical data
-historical_data = pd.DataFrame(columns=['timestamp', 'price', 'had_shock'])
+
+def configure_chart(window_minutes=5, max_bars=MAX_BARS):
+    """
+    Set the chart window; the candle width grows with it so the figure
+    never holds more than `max_bars` candles
+    """
+    global HISTORY_WINDOW, BAR_SECONDS, CHART_BARS, aggregator, ohlc_bars
+    HISTORY_WINDOW = timedelta(minutes=window_minutes)
+    CHART_BARS = max_bars
+    BAR_SECONDS = bar_resolution(HISTORY_WINDOW.total_seconds(), max_bars)
+    aggregator = StreamAggregator(
+        window_seconds=HISTORY_WINDOW.total_seconds(),
+        resolutions=tuple(sorted(set(DEFAULT_RESOLUTIONS) | {BAR_SECONDS})),
+        bar_history=max_bars + 1)
+    ohlc_bars = aggregator.bars[BAR_SECONDS]
+
+
+configure_chart()
+
+# Smoothed callback cost (ms) driving the refresh interval
+callback_cost_ms = 0.0
 
 # Global simulator reference
 simulator = None
 
-# Layout
-app.layout = html.Div([
-    html.H1('Live HFT Price Simulation with Random Shocks'),
-    html.Button('Toggle Random Mode', id='toggle-random', n_clicks=0),
-    html.Div(id='random-status'),
-    dcc.Graph(id='live-candlestick'),
-    dcc.Interval(
-        id='interval-component',
-        interval=100,  # Update every 100ms
-        n_intervals=0
-    ),
-    html.Div(id='stats-display')
-])
-
-
-@app.callback(
-    Output('random-status', 'children'),
-    Input('toggle-random', 'n_clicks')
-)
+# Set when ticks come from a shared-memory price bus instead of the simulator thread
+bus_reader = None
+bus_symbol = None
+
+
 def toggle_random_mode(n_clicks):
     if n_clicks == 0 or simulator is None:
         return "Random Mode: OFF"
@@ -119,104 +180,297 @@ def toggle_random_mode(n_clicks):
     return f"Random Mode: {'ON' if is_enabled else 'OFF'}"
 
 
-@app.callback(
-    [Output('live-candlestick', 'figure'),
-     Output('stats-display', 'children')],
-    Input('interval-component', 'n_intervals')
-)
-def update_graph(n):
-    global historical_data
-
-    # Collect all available updates from the queue
-    while not price_queue.empty():
-        try:
-            data = price_queue.get_nowait()
-            historical_data = pd.concat([
-                historical_data,
-                pd.DataFrame([data])
-            ], ignore_index=True)
-        except queue.Empty:
-            break
-
-    if len(historical_data) == 0:
-        return go.Figure(), "Waiting for data..."
-
-    # Keep only last 5 minutes of data
-    cutoff_time = datetime.now() - timedelta(minutes=5)
-    historical_data = historical_data[historical_data['timestamp'] > cutoff_time]
-
-    # Create OHLC data
-    df_resampled = historical_data.set_index('timestamp')
-    ohlc = df_resampled['price'].resample('1s').ohlc().dropna()
-
-    # Create candlestick chart
+def to_iso(values):
+    return np.datetime_as_string(values, unit='ms').tolist()
+
+
+def window_shocks(cutoff_time, after=None):
+    """Shocked ticks newer than `cutoff_time` (and `after`, if given), LTTB-thinned to MAX_MARKERS"""
+    window_times, window_prices, shocked = tick_store.since(
+        cutoff_time if after is None else max(np.datetime64(cutoff_time, 'us'), after))
+    times, prices = window_times[shocked], window_prices[shocked]
+    if len(times) > MAX_MARKERS:
+        kept = lttb(times.astype(np.int64), prices, MAX_MARKERS)
+        times, prices = times[kept], prices[kept]
+    return times, prices
+
+
+def full_figure(cutoff_time, now):
+    """The whole window as a new figure, with the state describing what it holds"""
+    import plotly.graph_objects as go
+
+    bar_starts, bar_open, bar_high, bar_low, bar_close = ohlc_bars.since(cutoff_time)
+    shock_times, shock_prices = window_shocks(cutoff_time)
+
+    # Create candlestick chart; the shock trace always exists so patches can extend it
     fig = go.Figure(data=[
         go.Candlestick(
-            x=ohlc.index,
-            open=ohlc['open'],
-            high=ohlc['high'],
-            low=ohlc['low'],
-            close=ohlc['close'],
+            x=bar_starts,
+            open=bar_open,
+            high=bar_high,
+            low=bar_low,
+            close=bar_close,
             name='Price'
-        )
-    ])
-
-    # Add markers for random shocks if they exist
-    shock_points = historical_data[historical_data['had_shock']]
-    if not shock_points.empty:
-        fig.add_trace(go.Scatter(
-            x=shock_points['timestamp'],
-            y=shock_points['price'],
+        ),
+        go.Scatter(
+            x=shock_times,
+            y=shock_prices,
             mode='markers',
             marker=dict(
                 symbol='star',
                 size=12,
                 color='red'
             ),
-            name='Random Shock'
-        ))
+            name='Random Shock',
+            visible=bool(len(shock_times))
+        )
+    ])
 
     fig.update_layout(
         title='Live HFT Price Movement',
         yaxis_title='Price ($)',
         xaxis_title='Time',
+        xaxis_range=[cutoff_time, now],
+        xaxis_rangeslider_visible=False,
         template='plotly_dark',
-        height=600
+        height=600,
+        uirevision=SERVER_RUN
     )
-
-    # Calculate statistics
+    state = {
+        'run': SERVER_RUN,
+        'bars': len(bar_starts),
+        'markers': len(shock_times),
+        'last_bar': int(bar_starts[-1].astype(np.int64)) if len(bar_starts) else None,
+        'last_shock': to_iso(shock_times[-1:])[0] if len(shock_times) else None
+    }
+    return fig, state
+
+
+def patch_figure(state, cutoff_time, now):
+    """
+    Changes since `state`: the open bar's new values and any new bars and
+    shocks; None when the browser's figure has to be rebuilt instead
+    """
+    if (state is None or state['run'] != SERVER_RUN or state['last_bar'] is None
+            or state['bars'] >= 2 * CHART_BARS or state['markers'] >= 2 * MAX_MARKERS):
+        return None
+    bar_starts = ohlc_bars.starts
+    last = int(np.searchsorted(bar_starts, state['last_bar']))
+    if last == len(bar_starts) or bar_starts[last] != state['last_bar']:
+        return None
+
+    from dash import Patch
+
+    patched = Patch()
+    candles = patched['data'][0]
+    index = state['bars'] - 1
+    candles['high'][index] = float(ohlc_bars.high[last])
+    candles['low'][index] = float(ohlc_bars.low[last])
+    candles['close'][index] = float(ohlc_bars.close[last])
+
+    new = slice(last + 1, None)
+    if len(bar_starts[new]):
+        candles['x'].extend(to_iso(bar_starts[new].astype('datetime64[us]')))
+        for key, values in (('open', ohlc_bars.open), ('high', ohlc_bars.high),
+                            ('low', ohlc_bars.low), ('close', ohlc_bars.close)):
+            candles[key].extend(values[new].tolist())
+        state = dict(state, bars=state['bars'] + len(bar_starts[new]),
+                     last_bar=int(bar_starts[-1]))
+
+    after = np.datetime64(state['last_shock'], 'us') if state['last_shock'] else None
+    shock_times, shock_prices = window_shocks(cutoff_time, after)
+    if len(shock_times):
+        patched['data'][1]['x'].extend(to_iso(shock_times))
+        patched['data'][1]['y'].extend(shock_prices.tolist())
+        patched['data'][1]['visible'] = True
+        state = dict(state, markers=state['markers'] + len(shock_times),
+                     last_shock=to_iso(shock_times[-1:])[0])
+
+    # Scroll the window; candles that leave it drop out of view until the next rebuild
+    patched['layout']['xaxis']['range'] = [cutoff_time, now]
+    return patched, state
+
+
+def refresh_interval(started):
+    """Next refresh interval (ms) from the smoothed cost of the callback"""
+    global callback_cost_ms
+    cost_ms = 1000 * (time.perf_counter() - started)
+    callback_cost_ms = 0.8 * callback_cost_ms + 0.2 * cost_ms
+    interval = int(min(max(REFRESH_COST_FACTOR * callback_cost_ms, MIN_REFRESH_MS), MAX_REFRESH_MS))
+    return interval
+
+
+def format_stat(key, value):
+    """One statistics line; values are None while the window holds no ticks"""
+    if value is None:
+        return f'{key}: -'
+    return f'{key}: ${value:.2f}' if 'Price' in key else f'{key}: {int(value)}'
+
+
+def update_graph(n, state=None, current_interval=None):
+    import plotly.graph_objects as go
+    from dash import html, no_update
+
+    started = time.perf_counter()
+    # Collect all available updates from the queue (or the bus) in one batch
+    if bus_reader is not None:
+        records = bus_reader.poll()
+        records = records[records['symbol'] == bus_symbol]
+        timestamps, prices, had_shock = (
+            local_datetimes(records['timestamp']), records['price'], records['had_shock'])
+        tick_store.extend(timestamps, prices, had_shock)
+    else:
+        timestamps, prices, had_shock = tick_store.drain_queue(price_queue)
+    aggregator.update_many(timestamps, prices, had_shock=had_shock)
+
+    if len(tick_store) == 0 or len(ohlc_bars) == 0:
+        return go.Figure(), "Waiting for data...", None, no_update
+
+    # Keep only the chart window (last 5 minutes by default)
+    now = datetime.now()
+    aggregator.expire(now)
+    cutoff_time = now - HISTORY_WINDOW
+
+    # Send only what changed since this browser's last update when possible
+    update = patch_figure(state, cutoff_time, now)
+    counter('chart_updates_total', 'Chart updates sent to browsers',
+            kind='patch' if update is not None else 'full').inc()
+    fig, state = update if update is not None else full_figure(cutoff_time, now)
+
+    # Statistics are maintained incrementally by the aggregator
+    snapshot = aggregator.snapshot()
     stats = {
-        'Current Price': historical_data['price'].iloc[-1],
-        'Max Price': historical_data['price'].max(),
-        'Min Price': historical_data['price'].min(),
-        'Price Range': historical_data['price'].max() - historical_data['price'].min(),
-        'Total Trades': len(historical_data),
-        'Random Shocks': len(shock_points) if 'had_shock' in historical_data.columns else 0
+        'Current Price': snapshot['last'],
+        'Max Price': snapshot['max'],
+        'Min Price': snapshot['min'],
+        'Price Range': snapshot['range'],
+        'Total Trades': snapshot['count'],
+        'Random Shocks': snapshot['shocks']
     }
 
     stats_display = html.Div([
         html.H3('Live Statistics'),
-        *[html.P(f'{key}: ${value:.2f}' if 'Price' in key else f'{key}: {int(value)}')
-          for key, value in stats.items()]
+        *[html.P(format_stat(key, value)) for key, value in stats.items()]
     ])
 
-    return fig, stats_display
-
+    # Resetting the interval restarts the browser's timer, so only send real changes
+    update_seconds.observe(time.perf_counter() - started)
+    interval = refresh_interval(started)
+    if current_interval is not None and abs(interval - current_interval) < 0.2 * current_interval:
+        interval = no_update
+    return fig, stats_display, state, interval
+
+
+def create_app():
+    """Build the Dash app and register its callbacks; dash and plotly load here, not at import"""
+    import dash
+    from dash import dcc, html
+    from dash.dependencies import Input, Output, State
+
+    # Initialize Dash app
+    app = dash.Dash(__name__)
+
+    # Layout
+    app.layout = html.Div([
+        html.H1('Live HFT Price Simulation with Random Shocks'),
+        html.Button('Toggle Random Mode', id='toggle-random', n_clicks=0),
+        html.Div(id='random-status'),
+        dcc.Graph(id='live-candlestick'),
+        dcc.Interval(
+            id='interval-component',
+            interval=MIN_REFRESH_MS,  # Update every 100ms, slower if updates get expensive
+            n_intervals=0
+        ),
+        # What this browser's figure already holds, so only changes are sent
+        dcc.Store(id='chart-state'),
+        html.Div(id='stats-display')
+    ])
 
-def run_simulation(base_price):
+    app.callback(
+        Output('random-status', 'children'),
+        Input('toggle-random', 'n_clicks')
+    )(toggle_random_mode)
+    app.callback(
+        [Output('live-candlestick', 'figure'),
+         Output('stats-display', 'children'),
+         Output('chart-state', 'data'),
+         Output('interval-component', 'interval')],
+        Input('interval-component', 'n_intervals'),
+        [State('chart-state', 'data'),
+         State('interval-component', 'interval')]
+    )(update_graph)
+
+    # Prometheus metrics and the runtime profiler next to the dashboard; the
+    # routes that switch the profiler only answer POST
+    for path, handler in {'/metrics': REGISTRY.render, **PROFILER.routes()}.items():
+        app.server.add_url_rule(path, path, plain_text(handler))
+    for path, handler in PROFILER.control_routes().items():
+        app.server.add_url_rule(path, path, plain_text(handler), methods=['POST'])
+    return app
+
+
+def plain_text(handler):
+    """Wrap a route handler so Flask sends text results as text/plain (dicts stay JSON)"""
+    def view():
+        body = handler()
+        if isinstance(body, str):
+            return body, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+        return body
+    return view
+
+
+def run_simulation(base_price, rng=None, seed=None, record=None):
     global simulator
-    # Start the HFT simulator in a separate thread
-    simulator = HFTSimulator(base_price)
+    # Start the HFT simulator in a separate thread, optionally recording every tick
+    recorder = TickRecorder(record) if record else None
+    simulator = HFTSimulator(base_price, rng=rng, seed=seed, recorder=recorder)
     simulator.start()
 
     # Run the Dash app
-    app.run_server(debug=False)
+    create_app().run(debug=False)
 
     # Cleanup when the app is closed
     simulator.stop()
     simulator.join()
+    if recorder is not None:
+        recorder.close()
+
+
+def run_bus_view(bus_name, symbol):
+    """Chart `symbol` from a price_bus.py bus instead of simulating in-process"""
+    global bus_reader, bus_symbol
+    bus = PriceBus.attach(bus_name)
+    bus_symbol = bus.symbol_index(symbol)
+    bus_reader = BusReader(bus)
+    try:
+        create_app().run(debug=False)
+    finally:
+        bus.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Live HFT price chart, simulated in-process or read from a price bus.')
+    parser.add_argument('--base_price', type=float, default=100.0,
+                        help='Starting price in dollars (default: 100)')
+    parser.add_argument('--window', type=float, default=5,
+                        help='Minutes of history charted (default: 5)')
+    parser.add_argument('--max_bars', type=int, default=MAX_BARS,
+                        help=f'Most candles drawn; longer windows use wider bars (default: {MAX_BARS})')
+    parser.add_argument('--bus', type=str, default=None,
+                        help='Read ticks from the price_bus.py bus with this name')
+    parser.add_argument('--symbol', type=str, default='AAPL',
+                        help='Symbol to chart from the bus (default: AAPL)')
+    parser.add_argument('--record', type=str, default=None,
+                        help='Append every simulated tick to a segmented tick log in this directory')
+    args = parser.parse_args(argv)
+    configure_chart(args.window, args.max_bars)
+
+    if args.bus:
+        run_bus_view(args.bus, args.symbol.upper())
+    else:
+        run_simulation(args.base_price, record=args.record)
 
 
 if __name__ == '__main__':
-    BASE_PRICE = 100.0  # Starting price in dollars
-    run_simulation(BASE_PRICE)
+    main()
@@ -0,0 +1,76 @@
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Longest request head (request line and headers) accepted
+MAX_HEAD_BYTES = 16384
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+def render(status, body):
+    """HTTP/1.1 response bytes; dicts and lists are sent as JSON, anything else as text"""
+    if isinstance(body, (dict, list)):
+        payload, content_type = json.dumps(body).encode(), 'application/json'
+    else:
+        payload, content_type = str(body).encode(), 'text/plain; charset=utf-8'
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n")
+    return head.encode() + payload
+
+
+def respond(method, path, routes, post_routes):
+    """Response bytes for one parsed request; a route that raises is answered with a 500"""
+    try:
+        if path in post_routes:
+            # State-changing routes: POST only, and the request body is ignored
+            if method != 'POST':
+                return render(405, {'error': f'Use POST for {path}'})
+            return render(200, post_routes[path]())
+        if path not in routes:
+            return render(404, {'error': f'No route for {path}'})
+        if method not in ('GET', 'HEAD'):
+            return render(405, {'error': 'Only GET is supported'})
+        response = render(200, routes[path]())
+        if method == 'HEAD':
+            response = response.split(b'\r\n\r\n', 1)[0] + b'\r\n\r\n'
+        return response
+    except Exception as error:
+        logger.exception("Status route %s failed", path)
+        return render(500, {'error': f'{type(error).__name__}: {error}'})
+
+
+async def handle_request(reader, writer, routes, post_routes):
+    try:
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            method, target, _ = head.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            response = render(400, {'error': 'Malformed request'})
+        else:
+            response = respond(method, target.split('?', 1)[0], routes, post_routes)
+        writer.write(response)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_http(routes, host, port, post_routes=None):
+    """
+    Serve GET requests for the status endpoints on the running event loop
+
+    routes: path -> callable returning a dict/list (sent as JSON) or text
+    post_routes: like routes, for callables that change state; answered for POST only
+    Returns the asyncio.Server; close it to stop serving.
+    """
+    post_routes = post_routes or {}
+    return await asyncio.start_server(
+        lambda reader, writer: handle_request(reader, writer, routes, post_routes),
+        host, port, limit=MAX_HEAD_BYTES)
@@ -0,0 +1,215 @@
+import numpy as np
+import matplotlib.dates as mdates
+
+from stream_aggregator import format_stats_title
+
+# Fraction of the current span added ahead of the data when the axes grow
+HEADROOM = 0.25
+
+# Smallest x span (in days) the axes are scaled to: one minute
+MIN_X_SPAN = 1 / 1440
+
+# Envelope buckets per horizontal pixel of the axes
+BUCKETS_PER_PIXEL = 2
+
+# Pixels from a point within which hovering shows its details
+HOVER_RADIUS = 5
+
+
+class LivePlot:
+    def __init__(self, ax, times, prices, volumes, price_changes, title,
+                 stats=None, time_format='%H:%M:%S'):
+        """
+        Incrementally rendered, blitted real-time price line
+
+        The line, title, crosshair and hover annotation are created once.
+        Each update converts only the ticks appended since the last one,
+        calls set_data on the grown arrays and blits the changed artists
+        over a cached background. The axes (and everything drawn with them)
+        are redrawn in full only when the data leaves the current limits,
+        which grow with headroom so that happens geometrically less often.
+        Long series are drawn as a per-pixel min/max envelope that is
+        extended with the new ticks only, so a frame costs the same at any
+        length.
+
+        ax: matplotlib Axes to draw on
+        times, prices, volumes, price_changes: lists the data thread appends to
+        title: plot title; the stats snapshot is appended below it
+        stats: dict kept up to date by a StreamAggregator subscription
+        time_format: strftime format for the x axis and the hover text
+        """
+        self.ax = ax
+        self.fig = ax.figure
+        self.canvas = self.fig.canvas
+        self.times = times
+        self.prices = prices
+        self.volumes = volumes
+        self.price_changes = price_changes
+        self.title = title
+        self.stats = stats if stats is not None else {}
+        self.time_format = time_format
+
+        # Date numbers and prices of the ticks converted so far (capacity doubles)
+        self.x = np.empty(1024)
+        self.y = np.empty(1024)
+        self.count = 0
+        self.background = None
+        # Min/max envelope over fixed x buckets, rebuilt when the limits change
+        self.bucket_edges = None
+        self.lows = self.highs = None
+
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Price ($)")
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(time_format))
+        ax.xaxis_date()
+        self.line, = ax.plot([], [], label="Real-Time Price", color='b', animated=True)
+        ax.legend(loc='upper left')
+        # Prices carry '$' signs, so the text is not parsed as mathtext
+        ax.set_title(format_stats_title(title, self.stats), animated=True, parse_math=False)
+
+        # Crosshair and hover annotation, drawn only over the blitted background
+        self.hline = ax.axhline(color='red', linewidth=1, visible=False, animated=True)
+        self.vline = ax.axvline(color='red', linewidth=1, visible=False, animated=True)
+        self.annot = ax.annotate("", xy=(0, 0), xytext=(20, 20), textcoords="offset points",
+                                 bbox=dict(boxstyle="round", fc="w", alpha=0.4),
+                                 arrowprops=dict(arrowstyle="->"), animated=True,
+                                 parse_math=False)
+        self.annot.set_visible(False)
+        self.artists = (self.line, ax.title, self.hline, self.vline, self.annot)
+
+        # One handler each for the whole session
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('motion_notify_event', self.on_hover)
+
+    def sync(self):
+        """Convert the ticks appended since the last call"""
+        n = min(len(self.times), len(self.prices))
+        if n <= self.count:
+            return False
+        if n > len(self.x):
+            capacity = max(n, 2 * len(self.x))
+            self.x = np.resize(self.x, capacity)
+            self.y = np.resize(self.y, capacity)
+        self.x[self.count:n] = mdates.date2num(self.times[self.count:n])
+        self.y[self.count:n] = self.prices[self.count:n]
+        self.count = n
+        return True
+
+    def grow_limits(self):
+        """Widen the axes limits if the data left them; returns True when they changed"""
+        x, y = self.x[:self.count], self.y[:self.count]
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        x_min, x_max, y_min, y_max = x[0], x[-1], y.min(), y.max()
+        changed = False
+        if x_min < x0 or x_max > x1:
+            span = max(x_max - x_min, MIN_X_SPAN)
+            self.ax.set_xlim(x_min, x_max + HEADROOM * span)
+            changed = True
+        if y_min < y0 or y_max > y1:
+            pad = max(HEADROOM * (y_max - y_min), 0.01 * abs(y_max), 1e-6)
+            self.ax.set_ylim(y_min - pad, y_max + pad)
+            changed = True
+        return changed
+
+    def bucket_index(self, x):
+        x0, width = self.bucket_edges
+        return np.clip(((x - x0) / width).astype(np.int64), 0, len(self.lows) - 1)
+
+    def rebuild_envelope(self):
+        x0, x1 = self.ax.get_xlim()
+        buckets = max(1, int(BUCKETS_PER_PIXEL * self.ax.bbox.width))
+        self.bucket_edges = (x0, (x1 - x0) / buckets)
+        self.lows = np.full(buckets, np.inf)
+        self.highs = np.full(buckets, -np.inf)
+        self.extend_envelope(0)
+
+    def extend_envelope(self, start):
+        index = self.bucket_index(self.x[start:self.count])
+        np.minimum.at(self.lows, index, self.y[start:self.count])
+        np.maximum.at(self.highs, index, self.y[start:self.count])
+
+    def line_data(self):
+        """The raw series while it is short, else the envelope (two points per bucket)"""
+        if self.count <= len(self.lows):
+            return self.x[:self.count], self.y[:self.count]
+        filled = np.flatnonzero(self.lows <= self.highs)
+        x0, width = self.bucket_edges
+        centres = x0 + (filled + 0.5) * width
+        return np.repeat(centres, 2), np.column_stack((self.lows[filled], self.highs[filled])).ravel()
+
+    def update(self, frame=None):
+        """Timer callback: append new ticks, then blit (or redraw when the limits grow)"""
+        title = format_stats_title(self.title, self.stats)
+        lines_changed = title.count('\n') != self.ax.get_title().count('\n')
+        self.ax.set_title(title)
+        start = self.count
+        if self.sync():
+            limits_changed = self.grow_limits()
+            if limits_changed or self.lows is None:
+                self.rebuild_envelope()
+            else:
+                self.extend_envelope(start)
+            self.line.set_data(*self.line_data())
+        else:
+            limits_changed = False
+        if limits_changed or lines_changed or self.background is None:
+            self.redraw()
+        else:
+            self.blit()
+
+    def redraw(self):
+        """Full draw: ticks, labels and layout; the background is re-cached in on_draw"""
+        for label in self.ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def on_draw(self, event):
+        # Cache everything but the animated artists, then put those back on top
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def blit(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.fig.bbox)
+
+    def nearest(self, event):
+        """Index of the tick under the mouse, or None"""
+        if not self.count:
+            return None
+        x = self.x[:self.count]
+        xdata = self.ax.transData.inverted().transform((event.x, event.y))[0]
+        i = int(np.clip(np.searchsorted(x, xdata), 1, self.count - 1)) if self.count > 1 else 0
+        if i and abs(x[i - 1] - xdata) < abs(x[i] - xdata):
+            i -= 1
+        px, py = self.ax.transData.transform((x[i], self.y[i]))
+        return i if abs(px - event.x) <= HOVER_RADIUS and abs(py - event.y) <= HOVER_RADIUS else None
+
+    def on_hover(self, event):
+        if event.inaxes != self.ax:
+            if self.vline.get_visible():
+                for artist in (self.hline, self.vline, self.annot):
+                    artist.set_visible(False)
+                self.blit()
+            return
+        self.vline.set_xdata([event.xdata])
+        self.hline.set_ydata([event.ydata])
+        self.vline.set_visible(True)
+        self.hline.set_visible(True)
+        i = self.nearest(event)
+        if i is not None:
+            x = self.times[i]
+            self.annot.xy = (self.x[i], self.y[i])
+            self.annot.set_text(f"Time: {x.strftime(self.time_format)}\nPrice: ${self.prices[i]}\n"
+                                f"Volume: {self.volumes[i]}\nPrice Change: {self.price_changes[i]}")
+        self.annot.set_visible(i is not None)
+        self.blit()
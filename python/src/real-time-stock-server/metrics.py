@@ -0,0 +1,322 @@
+import os
+import sys
+import math
+import time
+import threading
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+
+# Latency histograms: values from LOWEST_SECONDS to HIGHEST_SECONDS in
+# log-linear buckets, SUBDIVISIONS per doubling (about 4% relative error)
+LOWEST_SECONDS = 1e-6
+HIGHEST_SECONDS = 60.0
+SUBDIVISIONS = 16
+
+# Seconds between stack samples of the sampling profiler
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Counter:
+    def __init__(self):
+        """Monotonic count of events"""
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        return [f'{name}{format_labels(labels)} {self.value}']
+
+
+class Gauge:
+    def __init__(self, function=None):
+        """
+        Current value that goes up and down
+
+        function: called at scrape time for the value instead of set()/inc()
+        """
+        self.value = 0.0
+        self.function = function
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+    def samples(self, name, labels):
+        return [f'{name}{format_labels(labels)} {self.get()}']
+
+
+class Histogram:
+    def __init__(self, lowest=LOWEST_SECONDS, highest=HIGHEST_SECONDS, subdivisions=SUBDIVISIONS):
+        """
+        HDR-style latency histogram with bounded relative error
+
+        Bucket i holds values up to lowest * 2**(i / subdivisions), so any
+        quantile is accurate to one bucket (about 4% with 16 subdivisions)
+        over the whole range, and recording is O(1) with no allocation.
+        Values above `highest` land in an overflow bucket.
+        """
+        self.lowest = lowest
+        self.subdivisions = subdivisions
+        self.buckets = int(math.ceil(math.log2(highest / lowest) * subdivisions)) + 1
+        self.counts = [0] * (self.buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def bucket(self, value):
+        if value <= self.lowest:
+            return 0
+        return min(int(math.log2(value / self.lowest) * self.subdivisions) + 1, self.buckets)
+
+    def upper_bound(self, index):
+        return self.lowest * 2 ** (index / self.subdivisions)
+
+    def observe(self, value):
+        index = self.bucket(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the `with` block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None before any value)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max if self.count else None
+        }
+
+    def samples(self, name, labels):
+        # Prometheus buckets at every doubling; the fine buckets serve quantile()
+        lines = []
+        cumulative = 0
+        for index, count in enumerate(self.counts[:self.buckets]):
+            cumulative += count
+            if index % self.subdivisions == 0:
+                bound = format_labels(labels + (('le', f'{self.upper_bound(index):.9g}'),))
+                lines.append(f'{name}_bucket{bound} {cumulative}')
+        lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {self.count}')
+        lines.append(f'{name}_sum{format_labels(labels)} {self.sum}')
+        lines.append(f'{name}_count{format_labels(labels)} {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Named metrics, each optionally split by labels, rendered as Prometheus text"""
+        self.families = {}  # name -> (type, help, {labels: metric})
+        self._lock = threading.Lock()
+
+    def _get(self, kind, factory, name, help_text, labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self.families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family[0]}")
+            children = family[2]
+            if key not in children:
+                children[key] = factory()
+            return children[key]
+
+    def counter(self, name, help_text, **labels):
+        return self._get('counter', Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, function=None, **labels):
+        gauge = self._get('gauge', Gauge, name, help_text, labels)
+        if function is not None:
+            # Re-registering rebinds the callback, e.g. to a restarted server's hub
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name, help_text, **labels):
+        return self._get('histogram', Histogram, name, help_text, labels)
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            families = [(name, kind, help_text, list(children.items()))
+                        for name, (kind, help_text, children) in self.families.items()]
+        for name, kind, help_text, children in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in children:
+                lines.extend(metric.samples(name, labels))
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Plain dict of every metric (histograms as quantile snapshots) for JSON endpoints"""
+        summary = {}
+        with self._lock:
+            families = [(name, list(children.items())) for name, (_, _, children) in self.families.items()]
+        for name, children in families:
+            for labels, metric in children:
+                key = name + format_labels(labels)
+                if isinstance(metric, Histogram):
+                    summary[key] = metric.snapshot()
+                elif isinstance(metric, Gauge):
+                    summary[key] = metric.get()
+                else:
+                    summary[key] = metric.value
+        return summary
+
+
+# Process-wide registry the instrumented modules record into
+REGISTRY = MetricsRegistry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+def record_aer_job(seconds, circuits, requests):
+    """aer_session job observer: latency, circuits and calls of one simulator job"""
+    histogram('aer_job_seconds', 'Wall time of one batched Aer simulator job').observe(seconds)
+    counter('aer_circuits_total', 'Experiments run by Aer jobs').inc(circuits)
+    counter('aer_requests_total', 'Caller requests served by Aer jobs').inc(requests)
+
+
+def watch_aer():
+    """Record every AerSession job into the registry; calling it again changes nothing"""
+    quantum_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'quantum')
+    if quantum_dir not in sys.path:
+        sys.path.insert(0, quantum_dir)
+    import aer_session
+
+    if record_aer_job not in aer_session.JOB_OBSERVERS:
+        aer_session.JOB_OBSERVERS.append(record_aer_job)
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        """
+        Low-overhead statistical profiler that can be switched on at runtime
+
+        A daemon thread samples every other thread's Python stack each
+        `interval` seconds and counts the collapsed stacks, so the report
+        shows where time goes without instrumenting anything. The output of
+        collapsed() is the input format of flamegraph.pl and speedscope.
+        """
+        self.interval = interval
+        self.stacks = StackCounter()
+        self.samples = 0
+        self._thread = None
+        self._running = threading.Event()
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._sample_loop, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def toggle(self):
+        """Start if stopped, stop if running; returns the new state"""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def reset(self):
+        self.stacks.clear()
+        self.samples = 0
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        while self._running.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def collapsed(self, top=None):
+        """'thread;outer;...;inner count' lines, most frequent first"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common(top)) + '\n'
+
+    def routes(self):
+        """GET route with the profiler's report"""
+        return {'/profile': lambda: self.collapsed(top=200)}
+
+    def control_routes(self):
+        """Routes that switch the profiler; serve them for POST only, as they change state"""
+        def start():
+            self.start()
+            return {'profiling': True, 'samples': self.samples}
+
+        def stop():
+            self.stop()
+            return {'profiling': False, 'samples': self.samples}
+
+        def reset():
+            self.reset()
+            return {'profiling': self.running, 'samples': 0}
+
+        return {'/profile/start': start, '/profile/stop': stop, '/profile/reset': reset}
+
+
+# Process-wide profiler, off until started
+PROFILER = SamplingProfiler()
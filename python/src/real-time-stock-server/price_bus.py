@@ -0,0 +1,383 @@
+import os
+import time
+import signal
+import asyncio
+import argparse
+import multiprocessing
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+from price_dynamics import iter_paths
+from rng_provider import RNG_BACKENDS, QUANTUM_RNG_NOTE, as_provider
+from scheduler import TickScheduler
+
+# Shared-memory price bus: one single-producer ring per worker process in one
+# SharedMemory block, read by any number of processes without pickling.
+#
+# Layout: header (int64 x 4: magic, rings, capacity, symbols), symbol table
+# (S8 per symbol), one pair of write counters per ring (each pair on its own
+# 64-byte line), then `rings` rings of `capacity` BUS_DTYPE records.
+#
+# The counters form a seqlock: the writer raises the claimed count before it
+# copies records into the ring and the committed count after. A reader copies
+# up to the committed count, then re-reads the claimed count and discards
+# every record the writer may have been overwriting while it copied.
+BUS_MAGIC = 0x51425553  # 'QBUS'
+BUS_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # Seconds since the epoch
+    ('price', '<f8'),
+    ('volume', '<u4'),
+    ('symbol', '<u2'),  # Index into the bus symbol table
+    ('had_shock', '?')
+])
+HEADER_SIZE = 4 * 8
+COUNTER_STRIDE = 64
+DEFAULT_CAPACITY = 1 << 18
+
+# Ticks per symbol simulated per block by a worker
+WORKER_BLOCK = 1024
+
+
+class PriceBus:
+    def __init__(self, shm, owner=False):
+        """Use PriceBus.create or PriceBus.attach"""
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray(4, dtype=np.int64, buffer=shm.buf)
+        if header[0] != BUS_MAGIC:
+            raise ValueError(f"Shared memory {shm.name} is not a price bus")
+        self.rings, self.capacity, n_symbols = (int(value) for value in header[1:])
+        offset = HEADER_SIZE
+        self.symbols = [symbol.decode() for symbol in
+                        np.ndarray(n_symbols, dtype='S8', buffer=shm.buf, offset=offset)]
+        offset += 8 * n_symbols
+        offset += -offset % COUNTER_STRIDE
+        # counters[ring * 8] is the number of records ever committed to the ring,
+        # counters[ring * 8 + 1] the number the writer has started writing
+        self.counters = np.ndarray(self.rings * COUNTER_STRIDE // 8, dtype=np.int64,
+                                   buffer=shm.buf, offset=offset)
+        offset += self.rings * COUNTER_STRIDE
+        self.data = np.ndarray((self.rings, self.capacity), dtype=BUS_DTYPE,
+                               buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def size(rings, capacity, n_symbols):
+        offset = HEADER_SIZE + 8 * n_symbols
+        offset += -offset % COUNTER_STRIDE
+        return offset + rings * COUNTER_STRIDE + rings * capacity * BUS_DTYPE.itemsize
+
+    @classmethod
+    def create(cls, symbols, rings, capacity=DEFAULT_CAPACITY, name=None):
+        """
+        Allocate a bus for `symbols` with one ring per producer
+
+        capacity: records per ring; readers that fall further behind lose
+        the oldest records (counted in BusReader.dropped)
+        """
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=cls.size(rings, capacity, len(symbols)))
+        header = np.ndarray(4, dtype=np.int64, buffer=shm.buf)
+        header[:] = (BUS_MAGIC, rings, capacity, len(symbols))
+        np.ndarray(len(symbols), dtype='S8', buffer=shm.buf, offset=HEADER_SIZE)[:] = symbols
+        bus = cls(shm, owner=True)
+        bus.counters[:] = 0
+        return bus
+
+    @classmethod
+    def attach(cls, name, untrack=True):
+        """
+        Open an existing bus; closing it never frees the block
+
+        untrack: stop this process's resource tracker from freeing the block
+        at exit; worker processes share the creator's tracker and pass False
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 every attach is tracked
+            shm = shared_memory.SharedMemory(name=name)
+            if untrack:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def symbol_index(self, symbol):
+        return self.symbols.index(symbol)
+
+    def close(self):
+        """Detach; the creating process also frees the block"""
+        self.counters = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class BusWriter:
+    def __init__(self, bus, ring):
+        """Single producer for one ring of the bus"""
+        self.bus = bus
+        self.ring = ring
+        self.records = bus.data[ring]
+
+    def publish(self, records):
+        """Append a BUS_DTYPE array; readers see it once the committed count moves"""
+        capacity = self.bus.capacity
+        if len(records) > capacity:
+            records = records[-capacity:]
+        counter = self.ring * 8
+        written = int(self.bus.counters[counter])
+        # Claim the slots first, so readers copying them can tell they are being overwritten
+        self.bus.counters[counter + 1] = written + len(records)
+        start = written % capacity
+        first = min(len(records), capacity - start)
+        self.records[start:start + first] = records[:first]
+        self.records[:len(records) - first] = records[first:]
+        # Commit after the data is in place
+        self.bus.counters[counter] = written + len(records)
+
+
+class BusReader:
+    def __init__(self, bus, from_start=False):
+        """
+        Independent cursor over every ring of the bus
+
+        from_start: begin with the records still in the rings instead of
+        only new ones
+        """
+        self.bus = bus
+        self.cursors = [0 if from_start else int(bus.counters[ring * 8])
+                        for ring in range(bus.rings)]
+        self.dropped = 0
+
+    def poll(self):
+        """Copy out every record published since the last poll, ring by ring"""
+        capacity = self.bus.capacity
+        batches = []
+        for ring in range(self.bus.rings):
+            written = int(self.bus.counters[ring * 8])
+            start = max(self.cursors[ring], written - capacity)
+            self.dropped += start - self.cursors[ring]
+            if written > start:
+                records = self.bus.data[ring]
+                lo, hi = start % capacity, written % capacity
+                batch = (records[lo:hi].copy() if lo < hi
+                         else np.concatenate([records[lo:], records[:hi]]))
+                # Records the producer claimed (and may have overwritten) while we
+                # copied are discarded
+                overwritten = min(int(self.bus.counters[ring * 8 + 1]) - capacity - start, len(batch))
+                if overwritten > 0:
+                    self.dropped += overwritten
+                    batch = batch[overwritten:]
+                batches.append(batch)
+            self.cursors[ring] = written
+        if not batches:
+            return np.empty(0, dtype=BUS_DTYPE)
+        return batches[0] if len(batches) == 1 else np.concatenate(batches)
+
+
+def local_datetimes(seconds):
+    """Epoch seconds as naive local datetime64[us], like datetime.now()"""
+    offset = datetime.now().astimezone().utcoffset().total_seconds()
+    return ((np.asarray(seconds) + offset) * 1e6).astype(np.int64).astype('datetime64[us]')
+
+
+class BusFeed:
+    def __init__(self, name, interval=0.01):
+        """
+        BroadcastHub feed factory that streams an attached PriceBus
+
+        The first feed started polls the bus every `interval` seconds and
+        publishes every symbol's ticks; later feeds only keep their symbol
+        registered with the hub, and one of them takes over the polling if
+        the polling feed is cancelled.
+        """
+        self.bus = PriceBus.attach(name)
+        self.reader = BusReader(self.bus)
+        self.interval = interval
+        self.last_prices = {}
+        self.polling = False
+        self.released = asyncio.Event()
+
+    async def feed(self, symbol, hub):
+        while self.polling:
+            await self.released.wait()
+        self.polling = True
+        self.released.clear()
+        try:
+            async for _ in TickScheduler(self.interval):
+                records = self.reader.poll()
+                for index, price, volume in zip(records['symbol'].tolist(), records['price'].tolist(),
+                                                records['volume'].tolist()):
+                    name = self.bus.symbols[index]
+                    previous = self.last_prices.get(name, price)
+                    self.last_prices[name] = price
+                    hub.publish(name, {
+                        "stock_symbol": name,
+                        "real_time_price": price,
+                        "volume": volume,
+                        "price_change": price - previous
+                    })
+        finally:
+            self.polling = False
+            self.released.set()
+
+
+def simulate_shard(bus_name, ring, symbols, base_prices, rate=0.0, random_enabled=True,
+                   rng=None, seed=None, stop=None, max_ticks=None):
+    """
+    Worker process: simulate `symbols` with the HFTSimulator dynamics and publish to `ring`
+
+    All of the shard's symbols are simulated as paths of one vectorized
+    iter_paths run (prices scale linearly with the base price, so each path
+    runs at base 1 and is scaled per symbol).
+
+    rate: ticks per second per symbol, 0 for as fast as possible
+    stop: multiprocessing.Event ending the worker
+    max_ticks: ticks per symbol before returning (None runs until stopped)
+    """
+    if stop is not None:
+        # The parent stops the workers through `stop` on Ctrl+C
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    bus = PriceBus.attach(bus_name, untrack=False)
+    writer = BusWriter(bus, ring)
+    indices = np.array([bus.symbol_index(symbol) for symbol in symbols], dtype=np.uint16)
+    scale = np.asarray(base_prices, dtype=float)
+    n_symbols = len(symbols)
+    # Each worker draws prices from stream `ring` and volumes from its own stream
+    provider = as_provider(rng, seed)
+    volumes = provider.generator(f'volume-{ring}')
+    block = WORKER_BLOCK if rate <= 0 else max(1, min(WORKER_BLOCK, int(rate * 0.05)))
+    records = np.empty(block * n_symbols, dtype=BUS_DTYPE)
+    records['symbol'] = np.tile(indices, block)
+
+    start = time.time()
+    produced = 0
+    try:
+        for chunk in iter_paths(max_ticks or 1 << 62, n_symbols, base_price=1.0,
+                                random_enabled=random_enabled, block_size=block,
+                                rng=provider, stream=ring):
+            if stop is not None and stop.is_set():
+                break
+            count = len(chunk['price'])
+            if rate > 0:
+                # Drift-corrected pacing: block n is due at start + n * block / rate
+                delay = start + produced / rate - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                stamps = start + (produced + np.arange(count)) / rate
+            else:
+                stamps = np.full(count, time.time())
+            out = records[:count * n_symbols]
+            out['timestamp'] = np.repeat(stamps, n_symbols)
+            out['price'] = (chunk['price'] * scale).ravel()
+            out['had_shock'] = chunk['had_shock'].ravel()
+            out['volume'] = volumes.integers(1000, 10000, count * n_symbols, endpoint=True)
+            writer.publish(out)
+            produced += count
+    finally:
+        bus.close()
+    return produced * n_symbols
+
+
+class ShardedSimulation:
+    def __init__(self, symbols, workers=None, rate=0.0, base_prices=None, random_enabled=True,
+                 capacity=DEFAULT_CAPACITY, rng=None, seed=None, name=None):
+        """
+        Shard symbols across worker processes that publish to one PriceBus
+
+        symbols: symbols to simulate (dealt round-robin to workers)
+        workers: worker processes (default: CPU count, at most one per symbol)
+        rate: ticks per second per symbol, 0 for as fast as possible
+        base_prices: symbol -> starting price (default 100)
+        name: shared memory name readers attach to (default: generated)
+        """
+        self.symbols = list(symbols)
+        self.workers = max(1, min(workers or os.cpu_count(), len(self.symbols)))
+        self.rate = rate
+        self.base_prices = base_prices or {}
+        self.random_enabled = random_enabled
+        # Resolve the seed once so every worker uses streams of the same provider
+        self.provider = as_provider(rng, seed)
+        self.bus = PriceBus.create(self.symbols, self.workers, capacity, name)
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+
+    def shards(self):
+        return [self.symbols[ring::self.workers] for ring in range(self.workers)]
+
+    def start(self, max_ticks=None):
+        for ring, shard in enumerate(self.shards()):
+            process = multiprocessing.Process(
+                target=simulate_shard, daemon=True,
+                args=(self.bus.name, ring, shard,
+                      [self.base_prices.get(symbol, 100.0) for symbol in shard],
+                      self.rate, self.random_enabled, self.provider, None,
+                      self.stop_event, max_ticks))
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def join(self):
+        for process in self.processes:
+            process.join()
+
+    def stop(self):
+        """Stop the workers and free the bus"""
+        self.stop_event.set()
+        self.join()
+        self.bus.close()
+
+
+def measure(symbols, workers, ticks, capacity=DEFAULT_CAPACITY):
+    """Ticks per second published by `workers` processes running flat out"""
+    simulation = ShardedSimulation(symbols, workers, capacity=capacity)
+    start = time.perf_counter()
+    simulation.start(max_ticks=ticks)
+    simulation.join()
+    elapsed = time.perf_counter() - start
+    total = int(sum(simulation.bus.counters[ring * 8] for ring in range(simulation.workers)))
+    simulation.bus.close()
+    return total / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Simulate many symbols across processes into a shared-memory price bus.')
+    parser.add_argument('--symbols', type=str, default='AAPL,MSFT,GOOG,AMZN',
+                        help='Comma-separated symbols (default: AAPL,MSFT,GOOG,AMZN)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--rate', type=float, default=50.0,
+                        help='Ticks per second per symbol, 0 for as fast as possible (default: 50)')
+    parser.add_argument('--name', type=str, default='quantbus',
+                        help='Shared memory name the server and Dash app attach to (default: quantbus)')
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help=f'Records per worker ring (default: {DEFAULT_CAPACITY})')
+    parser.add_argument('--rng', type=str, default='pcg64', choices=RNG_BACKENDS,
+                        help=f'Random number backend (default: pcg64); {QUANTUM_RNG_NOTE}')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed; worker i uses stream i')
+    parser.add_argument('--benchmark', type=int, default=None, metavar='TICKS',
+                        help='Instead of serving, time TICKS ticks per symbol flat out for 1..workers processes')
+    args = parser.parse_args()
+    symbols = [symbol.strip().upper() for symbol in args.symbols.split(',') if symbol.strip()]
+
+    if args.benchmark:
+        print(f"{'workers':>8} {'ticks/s':>14}")
+        for workers in range(1, args.workers + 1):
+            print(f"{workers:>8} {measure(symbols, workers, args.benchmark, args.capacity):>14.0f}")
+    else:
+        simulation = ShardedSimulation(symbols, args.workers, args.rate, capacity=args.capacity,
+                                       rng=args.rng, seed=args.seed, name=args.name).start()
+        print(f"Simulating {len(symbols)} symbols on {simulation.workers} workers into bus '{args.name}'")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            simulation.stop()
@@ -0,0 +1,136 @@
+import numpy as np
+
+from rng_provider import as_provider
+
+# Price dynamics shared by the live HFTSimulator and the offline generators:
+# volatility clustering, mean reversion and random shocks.
+
+# Number of ticks of random inputs drawn per NumPy call. The live simulator and
+# the batch path generator consume the random stream in blocks of this size, so
+# both produce the same ticks for the same seed.
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class RandomShockGenerator:
+    def __init__(self, base_price, frequency=0.1, magnitude_range=(0.001, 0.01), rng=None):
+        """
+        frequency: probability of shock occurring (0-1)
+        magnitude_range: (min_percent, max_percent) of base price for shock size
+        rng: random generator for generate_shock (see rng_provider)
+        """
+        self.base_price = base_price
+        self.frequency = frequency
+        self.magnitude_range = magnitude_range
+        self.rng = rng if rng is not None else as_provider().generator()
+
+    def generate_shock(self):
+        if self.rng.random() < self.frequency:
+            magnitude = self.rng.uniform(*self.magnitude_range) * self.base_price
+            return (-1 if self.rng.random() < 0.5 else 1) * magnitude
+        return 0
+
+    def generate_shocks(self, rng, size):
+        """Vectorized generate_shock: array of shocks (0 where none occurred)"""
+        hits = rng.random(size) < self.frequency
+        magnitude = rng.uniform(*self.magnitude_range, size=size) * self.base_price
+        sign = np.where(rng.random(size) < 0.5, -1.0, 1.0)
+        return np.where(hits, sign * magnitude, 0.0)
+
+
+def draw_innovations(rng, shock_generator, n_ticks, n_paths):
+    """
+    Draw the random inputs for n_ticks x n_paths ticks in one NumPy pass
+
+    Returns (vol_multipliers, noise, shocks), each of shape (n_ticks, n_paths).
+    """
+    vol_multipliers = rng.normal(1, 0.1, size=(n_ticks, n_paths))
+    noise = rng.standard_normal((n_ticks, n_paths))
+    shocks = shock_generator.generate_shocks(rng, (n_ticks, n_paths))
+    return vol_multipliers, noise, shocks
+
+
+def clustered_volatility(vol_multipliers, base_volatility, log_excess):
+    """
+    Vectorized volatility clustering recursion along axis 0
+
+    Solves vol[t] = max(base, vol[t-1] * mult[t]) in log space, where it is the
+    Lindley recursion w[t] = max(0, w[t-1] + log(mult[t])) for
+    w = log(vol / base). log_excess is w before the first row.
+    Returns (volatility, log_excess after the last row).
+    """
+    # A non-positive multiplier always resets volatility to the floor
+    steps = np.log(np.maximum(vol_multipliers, np.finfo(float).tiny))
+    walk = np.cumsum(steps, axis=0)
+    running_min = np.minimum(np.minimum.accumulate(walk, axis=0), -log_excess)
+    excess = walk - running_min
+    return base_volatility * np.exp(excess), excess[-1]
+
+
+def mean_reverting_scan(innovations, decay, initial):
+    """
+    Vectorized AR(1) recursion x[t] = decay * x[t-1] + innovations[t] along axis 0
+
+    Uses a log-depth doubling scan so no Python loop runs per tick. initial is
+    x before the first row.
+    """
+    x = np.array(innovations, dtype=float)
+    shift, coef = 1, decay
+    while shift < len(x):
+        x[shift:] += coef * x[:-shift]
+        shift *= 2
+        coef *= coef
+    powers = decay ** np.arange(1, len(x) + 1, dtype=float)
+    return x + powers[:, None] * initial
+
+
+def iter_paths(n_ticks, n_paths=1, base_price=100.0, volatility_factor=0.0001,
+               mean_reversion=0.1, random_enabled=False, seed=None,
+               block_size=DEFAULT_BLOCK_SIZE, rng=None, stream=None):
+    """
+    Generate n_ticks x n_paths simulated ticks block by block
+
+    Yields dicts of 'price', 'volatility' and 'had_shock' arrays of shape
+    (block, n_paths). With n_paths=1 the prices match an HFTSimulator with the
+    same seed, rng and stream tick for tick (up to floating point rounding).
+
+    rng: RNGProvider or backend name (default pcg64 seeded with `seed`)
+    stream: stream of the provider to draw from (worker index or symbol)
+    """
+    rng = as_provider(rng, seed).generator(stream)
+    shock_generator = RandomShockGenerator(base_price, rng=rng)
+    base_volatility = base_price * volatility_factor
+    log_excess = np.zeros(n_paths)
+    deviation = np.zeros(n_paths)
+
+    remaining = n_ticks
+    while remaining > 0:
+        vol_multipliers, noise, shocks = draw_innovations(
+            rng, shock_generator, block_size, n_paths)
+        count = min(block_size, remaining)
+        vol_multipliers, noise, shocks = (
+            vol_multipliers[:count], noise[:count], shocks[:count])
+        if not random_enabled:
+            shocks = np.zeros_like(shocks)
+
+        volatility, log_excess = clustered_volatility(
+            vol_multipliers, base_volatility, log_excess)
+        # p[t] - base = (1 - k) * (p[t-1] - base) + noise + shock
+        path = mean_reverting_scan(
+            noise * volatility + shocks, 1 - mean_reversion, deviation)
+        deviation = path[-1]
+
+        yield {
+            'price': base_price + path,
+            'volatility': volatility,
+            'had_shock': shocks != 0
+        }
+        remaining -= count
+
+
+def generate_paths(n_ticks, n_paths=1, **kwargs):
+    """Generate n_ticks x n_paths simulated ticks as whole arrays (see iter_paths)"""
+    blocks = list(iter_paths(n_ticks, n_paths, **kwargs))
+    if not blocks:
+        return {key: np.empty((0, n_paths)) for key in ('price', 'volatility', 'had_shock')}
+    return {key: np.concatenate([block[key] for block in blocks])
+            for key in blocks[0]}
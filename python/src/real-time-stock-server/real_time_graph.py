@@ -1,12 +1,11 @@
 import asyncio
 import websockets
-import json
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from datetime import datetime
 from threading import Thread
-import matplotlib.dates as mdates
-from matplotlib.widgets import Cursor
+
+from stream_aggregator import StreamAggregator
+from wire_format import decode_frame, request_binary, tick_datetimes
+from live_plot import LivePlot
 
 # Parameters for connecting to the WebSocket server
 WEBSOCKET_URI = "ws://localhost:6789"
@@ -17,74 +16,40 @@ prices = []
 volumes = []
 price_changes = []
 
+# Streaming statistics over the received ticks, refreshed on every message
+aggregator = StreamAggregator(window_seconds=300)
+latest_stats = {}
+aggregator.subscribe(latest_stats.update)
+
 # Function to connect to the WebSocket and receive data
 
 
 async def fetch_stock_data():
     async with websockets.connect(WEBSOCKET_URI) as websocket:
+        # Batched binary frames decode straight into arrays; JSON still works
+        await request_binary(websocket)
         while True:
             message = await websocket.recv()
-            data = json.loads(message)
-
-            # Add current time and price to the lists
-            times.append(datetime.now())
-            prices.append(data["real_time_price"])
-            volumes.append(data["volume"])
-            price_changes.append(data["price_change"])
-
-# Function to update the plot in real-time
-
-
-def update_plot(frame):
-    ax.clear()
-    ax.plot(times, prices, label="Real-Time Price", color='b')
-    ax.set_title("Real-Time Stock Price of AAPL")
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Price ($)")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.legend()
+            ticks = decode_frame(message)
 
-    # Formatting the x-axis with time
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+            # Add the tick times and prices to the lists
+            tick_times = tick_datetimes(ticks)
+            times.extend(tick_times)
+            prices.extend(ticks['price'].tolist())
+            volumes.extend(ticks['volume'].tolist())
+            price_changes.extend(ticks['price_change'].tolist())
+            aggregator.update_many(tick_times, ticks['price'], ticks['volume'])
 
-    # Adding a cursor with information on hover
-    cursor = Cursor(ax, useblit=True, color='red', linewidth=1)
 
-    # Annotate details when hovering over a point
-    annot = ax.annotate("", xy=(0, 0), xytext=(20, 20), textcoords="offset points",
-                        bbox=dict(boxstyle="round", fc="w"), arrowprops=dict(arrowstyle="->"))
-    annot.set_visible(False)
-
-    def update_annot(ind):
-        x, y = times[ind[0]], prices[ind[0]]
-        annot.xy = (mdates.date2num(x), y)
-        text = f"Time: {x.strftime('%H:%M:%S')}\nPrice: ${y}\nVolume: {
-            volumes[ind[0]]}\nPrice Change: {price_changes[ind[0]]}"
-        annot.set_text(text)
-        annot.get_bbox_patch().set_alpha(0.4)
-
-    def on_hover(event):
-        vis = annot.get_visible()
-        if event.inaxes == ax:
-            cont, ind = line.contains(event)
-            if cont:
-                update_annot(ind["ind"])
-                annot.set_visible(True)
-                fig.canvas.draw_idle()
-            elif vis:
-                annot.set_visible(False)
-                fig.canvas.draw_idle()
-
-    # Plot line for real-time price
-    line, = ax.plot(times, prices, label="Real-Time Price", color='b')
-    fig.canvas.mpl_connect("motion_notify_event", on_hover)
-
-
-# Set up the figure and axis for the plot
+# Set up the figure and axis; artists are created once and updated incrementally
 fig, ax = plt.subplots()
-ani = animation.FuncAnimation(
-    fig, update_plot, interval=1000, cache_frame_data=False)
+plot = LivePlot(ax, times, prices, volumes, price_changes, "Real-Time Stock Price of AAPL",
+                stats=latest_stats, time_format='%H:%M:%S')
+
+# Append new ticks and blit them every interval
+timer = fig.canvas.new_timer(interval=1000)
+timer.add_callback(plot.update)
+timer.start()
 
 # Start the asyncio event loop in a separate thread to fetch data
 data_thread = Thread(target=lambda: asyncio.run(fetch_stock_data()))
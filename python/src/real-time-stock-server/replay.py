@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import asyncio
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'historical_stock'))
+from columnar_store import SymbolHistory, list_symbols  # noqa: E402
+from tick_log import TickLog, is_tick_log  # noqa: E402
+
+# Records per chunk moving through the replay pipeline
+DEFAULT_CHUNK_ROWS = 4096
+
+# Bytes read from a JSON file at a time
+READ_BLOCK = 1 << 16
+
+JSON_SEPARATORS = ' \t\r\n,[]'
+
+
+def iter_json_records(path, block_size=READ_BLOCK):
+    """Yield the records of a JSON list one at a time without loading the file"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer, pos = f.read(block_size), 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in JSON_SEPARATORS:
+                pos += 1
+            try:
+                if pos == len(buffer):
+                    raise ValueError
+                record, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Incomplete record (or nothing left) at the end of the buffer
+                more = f.read(block_size)
+                if not more:
+                    if pos < len(buffer):
+                        raise
+                    return
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+
+
+def iter_json_records_reversed(path, block_size=READ_BLOCK):
+    """
+    Yield the records of a JSON list last to first, reading the file backwards
+
+    Records must be flat objects (no nested braces), as the generators write.
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        tail = b''
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            tail = f.read(end - start) + tail
+            end = start
+            while True:
+                close = tail.rfind(b'}')
+                begin = tail.rfind(b'{', 0, close) if close >= 0 else -1
+                if begin < 0:
+                    break
+                yield json.loads(tail[begin:close + 1])
+                tail = tail[:begin]
+
+
+def iter_json_chronological(path):
+    """
+    Records of a generator JSON file oldest first
+
+    Daily files are written newest first; those are read backwards so the
+    file is still never loaded whole.
+    """
+    records = iter_json_records(path)
+    head = [record for _, record in zip(range(2), records)]
+    if len(head) == 2 and head[1]['date'] < head[0]['date']:
+        records.close()
+        yield from iter_json_records_reversed(path)
+        return
+    yield from head
+    yield from records
+
+
+def to_seconds(dates):
+    """datetime64 values (any unit) or ISO strings as float seconds since the epoch"""
+    return np.asarray(dates, dtype='datetime64[us]').astype(np.int64) / 1e6
+
+
+def iter_json_chunks(path, symbol, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Chunks of {'timestamp', 'price', 'volume'} arrays for `symbol` from a JSON file"""
+    dates, prices, volumes = [], [], []
+    for record in iter_json_chronological(path):
+        if record.get('symbol', symbol) != symbol:
+            continue
+        dates.append(record['date'])
+        prices.append(record['price'] if 'price' in record else record['close_price'])
+        volumes.append(record.get('volume', 0))
+        if len(dates) == chunk_rows:
+            yield {'timestamp': to_seconds(dates), 'price': np.array(prices, dtype=float),
+                   'volume': np.array(volumes, dtype=np.int64)}
+            dates, prices, volumes = [], [], []
+    if dates:
+        yield {'timestamp': to_seconds(dates), 'price': np.array(prices, dtype=float),
+               'volume': np.array(volumes, dtype=np.int64)}
+
+
+def iter_store_chunks(root, symbol, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Chunks of {'timestamp', 'price', 'volume'} arrays for `symbol` from a columnar store
+
+    The columns are memory-mapped, so only the pages of the current chunk
+    are read. Tick stores replay 'price', bar stores 'close_price'.
+    """
+    if symbol not in list_symbols(root):
+        return
+    columns = SymbolHistory(root, symbol).columns
+    prices = columns['price'] if 'price' in columns else columns['close_price']
+    volumes = columns.get('volume')
+    for start in range(0, len(prices), chunk_rows):
+        end = start + chunk_rows
+        yield {
+            'timestamp': to_seconds(columns['date'][start:end]),
+            'price': np.asarray(prices[start:end], dtype=float),
+            'volume': (np.zeros(len(prices[start:end]), dtype=np.int64) if volumes is None
+                       else np.asarray(volumes[start:end], dtype=np.int64))
+        }
+
+
+def iter_log_chunks(path, symbol, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Chunks of {'timestamp', 'price', 'volume'} arrays for `symbol` from a tick log directory"""
+    for records in TickLog(path).chunks(symbol=symbol, chunk_rows=chunk_rows):
+        yield {'timestamp': np.asarray(records['timestamp'], dtype=float),
+               'price': np.asarray(records['price'], dtype=float),
+               'volume': records['volume'].astype(np.int64)}
+
+
+class ReplaySource:
+    def __init__(self, path, speed=1.0, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Feed factory that streams recorded data instead of a random walk
+
+        Each symbol's feed replays its own records from the start, paced by
+        the recorded timestamps. The data is read chunk by chunk, so memory
+        stays constant at any file size and speed.
+
+        path: JSON file from historical_data_generator.py, a columnar store
+        directory or a tick log directory recorded with --record
+        speed: 1 is real time, N is N times faster, 0 is as fast as possible
+        chunk_rows: records read and published per chunk
+        """
+        self.path = path
+        self.speed = speed
+        self.chunk_rows = chunk_rows
+        self.is_log = is_tick_log(path)
+        self.is_store = os.path.isdir(path) and not self.is_log
+        self.published = 0
+
+    def symbols(self):
+        """Symbols in a columnar store or tick log (None for a JSON file)"""
+        if self.is_log:
+            return TickLog(self.path).symbols()
+        return list_symbols(self.path) if self.is_store else None
+
+    def chunks(self, symbol):
+        if self.is_log:
+            return iter_log_chunks(self.path, symbol, self.chunk_rows)
+        if self.is_store:
+            return iter_store_chunks(self.path, symbol, self.chunk_rows)
+        return iter_json_chunks(self.path, symbol, self.chunk_rows)
+
+    async def feed(self, symbol, hub):
+        """Publish `symbol`'s records to the hub (use as BroadcastHub's feed_factory)"""
+        loop = asyncio.get_running_loop()
+        start = origin = None
+        previous = None
+        for chunk in self.chunks(symbol):
+            timestamps = chunk['timestamp']
+            if origin is None:
+                origin, start = timestamps[0], loop.time()
+            recorded = np.datetime_as_string(
+                (timestamps * 1e6).astype(np.int64).astype('datetime64[us]'), unit='ms').tolist()
+            for timestamp, recorded_at, price, volume in zip(
+                    timestamps.tolist(), recorded, chunk['price'].tolist(), chunk['volume'].tolist()):
+                if self.speed > 0:
+                    delay = start + (timestamp - origin) / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                hub.publish(symbol, {
+                    "stock_symbol": symbol,
+                    "real_time_price": price,
+                    "volume": volume,
+                    "price_change": 0.0 if previous is None else price - previous,
+                    "recorded_at": recorded_at
+                })
+                previous = price
+            self.published += len(timestamps)
+            # Let clients drain between chunks when replaying as fast as possible
+            await asyncio.sleep(0)
@@ -0,0 +1,80 @@
+import os
+import sys
+import zlib
+import numpy as np
+
+# Random number backends every simulator and generator accepts. 'quantum'
+# draws are true random: they take no seed, cannot be reproduced, and every
+# stream is independent fresh entropy rather than a keyed per-symbol/per-chunk
+# stream, so results also vary with how the work is sharded.
+RNG_BACKENDS = ('pcg64', 'philox', 'quantum')
+
+# Appended to every --rng help text
+QUANTUM_RNG_NOTE = 'quantum runs are not reproducible, take no --seed and have no per-symbol streams'
+
+QUANTUM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'quantum')
+
+
+def stream_key(stream):
+    """Integer key for a stream name: ints are used as is, strings (symbols) are hashed"""
+    if isinstance(stream, str):
+        return zlib.crc32(stream.encode())
+    return int(stream)
+
+
+class RNGProvider:
+    def __init__(self, backend='pcg64', seed=None):
+        """
+        Factory for independent random streams, one per worker, symbol or simulator
+
+        Every stream has the np.random.Generator methods the simulators use
+        (random, uniform, normal, standard_normal, integers).
+
+        backend: 'pcg64' (NumPy default), 'philox' (counter-based, each stream
+        is a jump of 2**128 draws) or 'quantum' (QuantumRandomGenerator entropy,
+        not seedable: every stream is fresh entropy)
+        seed: base seed; None draws fresh entropy once, so streams made by the
+        same provider (and its pickled copies in worker processes) still agree
+        """
+        if backend not in RNG_BACKENDS:
+            raise ValueError(f"Unknown RNG backend: {backend}")
+        if backend == 'quantum' and seed is not None:
+            raise ValueError("The quantum RNG backend cannot be seeded; use pcg64 or philox for reproducible runs")
+        self.backend = backend
+        if backend == 'quantum':
+            self.seed = None
+        else:
+            self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+
+    def generator(self, stream=None):
+        """
+        Random generator for `stream` (int or str); None is the base stream
+
+        With the pcg64 backend the base stream equals np.random.default_rng(seed).
+        The quantum backend ignores `stream` and returns a new entropy source.
+        """
+        if self.backend == 'quantum':
+            if QUANTUM_DIR not in sys.path:
+                sys.path.insert(0, QUANTUM_DIR)
+            from true_random_generator import QuantumRandomGenerator
+            return QuantumRandomGenerator(bits=64)
+
+        if self.backend == 'philox':
+            bit_generator = np.random.Philox(self.seed)
+            if stream is not None:
+                bit_generator = bit_generator.jumped(stream_key(stream) + 1)
+            return np.random.Generator(bit_generator)
+
+        if stream is None:
+            return np.random.default_rng(self.seed)
+        return np.random.default_rng(np.random.SeedSequence([self.seed, stream_key(stream)]))
+
+    def __repr__(self):
+        return f"RNGProvider(backend={self.backend!r}, seed={self.seed!r})"
+
+
+def as_provider(rng=None, seed=None):
+    """Accept an RNGProvider, a backend name or None (pcg64 with `seed`)"""
+    if isinstance(rng, RNGProvider):
+        return rng
+    return RNGProvider(rng or 'pcg64', seed)
@@ -0,0 +1,65 @@
+import asyncio
+
+
+class TickScheduler:
+    def __init__(self, interval, max_behind=1):
+        """
+        Fixed-rate tick clock that corrects for drift
+
+        Tick n is due at start + n * interval and each wait sleeps until the
+        next due time, so the time spent handling a tick does not add up the
+        way a fixed asyncio.sleep(interval) does. When the loop stalls for
+        more than `max_behind` intervals the missed ticks are skipped (and
+        counted) instead of being fired in a burst.
+
+        interval: seconds between ticks
+        max_behind: intervals the clock may lag before skipping ticks
+        """
+        self.interval = interval
+        self.max_behind = max_behind
+        self.start = None
+        self.next_due = None
+        self.ticks = 0
+        self.skipped = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    async def wait(self):
+        """Sleep until the next tick is due"""
+        loop = asyncio.get_running_loop()
+        if self.start is None:
+            self.start = self.next_due = loop.time()
+        else:
+            self.next_due += self.interval
+        behind = loop.time() - self.next_due
+        if behind > self.max_behind * self.interval:
+            missed = int(behind // self.interval)
+            self.skipped += missed
+            self.next_due += missed * self.interval
+        delay = self.next_due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lag = loop.time() - self.next_due
+        self.ticks += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self.wait()
+        return self.ticks
+
+    def metrics(self):
+        """Target and achieved tick rate plus scheduling lag in milliseconds"""
+        elapsed = asyncio.get_running_loop().time() - self.start if self.start is not None else 0.0
+        return {
+            'interval': self.interval,
+            'target_rate': 1 / self.interval,
+            'achieved_rate': (self.ticks - 1) / elapsed if elapsed > 0 else 0.0,
+            'ticks': self.ticks,
+            'skipped': self.skipped,
+            'mean_lag_ms': 1000 * self.total_lag / self.ticks if self.ticks else 0.0,
+            'max_lag_ms': 1000 * self.max_lag
+        }
@@ -1,73 +1,263 @@
-import asyncio
-import random
-import websockets
 import json
+import time
+import signal
+import asyncio
 import argparse
-from flask import Flask
-from threading import Thread
-
-# Parse command line arguments
-parser = argparse.ArgumentParser(
-    description='Run a real-time stock simulation server.')
-parser.add_argument('--flask_port', type=int, default=5000,
-                    help='Port for the Flask server (default: 5000)')
-parser.add_argument('--websocket_port', type=int, default=6789,
-                    help='Port for the WebSocket server (default: 6789)')
-parser.add_argument('--host', type=str, default='localhost',
-                    help='Host for the WebSocket server (default: localhost)')
-args = parser.parse_args()
-
-app = Flask(__name__)
-
-# Flask API for basic HTTP requests
-
-
-@app.route('/')
-def home():
-    return "WebSocket Real-Time Stock Simulation Server is running!"
-
-# Function to simulate stock prices
-
-
-async def stock_price_simulator(websocket, path):
-    stock_symbol = "AAPL"
-    current_price = 150.00  # Starting price
-    while True:
-        # Simulate price change
-        price_change = random.uniform(-1, 1)  # Random change between -1 and 1
-        current_price += price_change
-        current_price = round(current_price, 2)
-
-        # Create a stock update message
-        message = {
-            "stock_symbol": stock_symbol,
-            "real_time_price": current_price,
-            "volume": random.randint(1000, 10000),
-            "price_change": price_change,
+from functools import partial
+import websockets
+
+from rng_provider import RNGProvider, RNG_BACKENDS, QUANTUM_RNG_NOTE
+from replay import ReplaySource, DEFAULT_CHUNK_ROWS
+from price_bus import BusFeed
+from scheduler import TickScheduler
+from http_status import serve_http
+from wire_format import valid_symbol, MAX_SYMBOL_BYTES
+from broadcaster import (BroadcastHub, ClientSession, SLOW_CLIENT_POLICIES, DEFAULT_MAX_FEEDS,
+                         parse_control_message)
+from tick_log import TickRecorder, DEFAULT_SEGMENT_BYTES, DEFAULT_SEGMENT_SECONDS
+from metrics import REGISTRY, PROFILER, counter, gauge, histogram, watch_aer
+
+# Starting prices for known symbols; other symbols start at DEFAULT_START_PRICE
+START_PRICES = {"AAPL": 150.00}
+DEFAULT_START_PRICE = 100.00
+
+EVENT_LOOPS = ('asyncio', 'uvloop')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='Run a real-time stock simulation server.')
+    parser.add_argument('--http_port', '--flask_port', dest='http_port', type=int, default=5000,
+                        help='Port for the HTTP status endpoints (default: 5000)')
+    parser.add_argument('--websocket_port', type=int, default=6789,
+                        help='Port for the WebSocket server (default: 6789)')
+    parser.add_argument('--host', type=str, default='localhost',
+                        help='Host for the WebSocket and HTTP servers (default: localhost)')
+    parser.add_argument('--symbols', type=str, default='AAPL',
+                        help='Comma-separated symbols new clients receive, and the only symbols they may '
+                             'subscribe to unless a replay store or bus defines its own (default: AAPL)')
+    parser.add_argument('--max_feeds', type=int, default=DEFAULT_MAX_FEEDS,
+                        help=f'Most symbol feeds running at once (default: {DEFAULT_MAX_FEEDS})')
+    parser.add_argument('--tick_interval', type=float, default=0.1,
+                        help='Seconds between simulated ticks per symbol (default: 0.1)')
+    parser.add_argument('--client_queue', type=int, default=256,
+                        help='Frames queued per client before the slow client policy applies (default: 256)')
+    parser.add_argument('--slow_client_policy', type=str, default='conflate', choices=SLOW_CLIENT_POLICIES,
+                        help='What to do when a client falls behind (default: conflate)')
+    parser.add_argument('--batch_interval', type=float, default=0.1,
+                        help='Seconds between binary batch frames (default: 0.1)')
+    parser.add_argument('--rng', type=str, default='pcg64', choices=RNG_BACKENDS,
+                        help=f'Random number backend for the price feeds (default: pcg64); {QUANTUM_RNG_NOTE}')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed; each symbol gets its own stream')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Stream a historical JSON file or columnar store instead of the random walk')
+    parser.add_argument('--replay_speed', type=float, default=1.0,
+                        help='Replay speed-up: 1 is real time, N is N times faster, 0 is as fast as possible')
+    parser.add_argument('--replay_chunk', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f'Records read per replay chunk (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--bus', type=str, default=None,
+                        help='Stream ticks from a price_bus.py shared-memory bus with this name')
+    parser.add_argument('--record', type=str, default=None,
+                        help='Append every published tick to a segmented tick log in this directory')
+    parser.add_argument('--record_segment_mb', type=float, default=DEFAULT_SEGMENT_BYTES / 2**20,
+                        help=f'Tick log segment size in MB (default: {DEFAULT_SEGMENT_BYTES >> 20})')
+    parser.add_argument('--record_segment_minutes', type=float, default=DEFAULT_SEGMENT_SECONDS / 60,
+                        help=f'Tick log segment duration in minutes (default: {DEFAULT_SEGMENT_SECONDS / 60:g})')
+    parser.add_argument('--loop', type=str, default='asyncio', choices=EVENT_LOOPS,
+                        help='Event loop implementation (uvloop must be installed)')
+    return parser
+
+# Function to simulate stock prices: one task per symbol, shared by all clients
+
+
+async def stock_price_simulator(stock_symbol, hub, provider, interval, schedulers):
+    rng = provider.generator(stock_symbol)
+    current_price = START_PRICES.get(stock_symbol, DEFAULT_START_PRICE)
+    # Ticks stay on a fixed grid however long publishing takes
+    scheduler = schedulers[stock_symbol] = TickScheduler(interval)
+    ticks = counter('ticks_generated_total', 'Simulated ticks published', symbol=stock_symbol)
+    publish_seconds = histogram('tick_publish_seconds', 'Time to serialize and queue one tick for all clients')
+    try:
+        async for _ in scheduler:
+            # Simulate price change
+            price_change = float(rng.uniform(-1, 1))  # Random change between -1 and 1
+            current_price += price_change
+            current_price = round(current_price, 2)
+
+            # Create a stock update message
+            message = {
+                "stock_symbol": stock_symbol,
+                "real_time_price": current_price,
+                "volume": int(rng.integers(1000, 10000, endpoint=True)),
+                "price_change": price_change,
+            }
+
+            # Serialize once and queue for every subscribed client
+            start = time.perf_counter()
+            hub.publish(stock_symbol, message)
+            publish_seconds.observe(time.perf_counter() - start)
+            ticks.inc()
+    finally:
+        # The hub cancels a feed when its last subscriber leaves
+        if schedulers.get(stock_symbol) is scheduler:
+            del schedulers[stock_symbol]
+
+# Handle one WebSocket client: subscribe to the default symbols, then follow
+# {"action": "subscribe" | "unsubscribe", "symbols": [...]} and
+# {"action": "format", "format": "json" | "binary"} messages. Refused
+# subscriptions are answered with
+# {"action": "subscribe", "error": ..., "refused": {symbol: reason}}
+
+
+def refusal_message(hub, refused):
+    """Control frame telling a client which symbols it could not subscribe to, and why"""
+    reasons = {symbol: 'unknown symbol' if hub.allowed_symbols is not None and symbol not in hub.allowed_symbols
+               else f'feed limit of {hub.max_feeds} reached' for symbol in refused}
+    return json.dumps({'action': 'subscribe', 'error': 'Symbols refused', 'refused': reasons})
+
+
+async def handle_client(websocket, hub, args, default_symbols):
+    session = ClientSession(websocket, policy=args.slow_client_policy,
+                            max_queue=args.client_queue)
+    hub.subscribe(session, default_symbols)
+    try:
+        async for message in websocket:
+            request = parse_control_message(message)
+            if request is None:
+                continue
+            action, argument = request
+            if action == 'format':
+                session.format = argument
+            elif action == 'subscribe':
+                refused = hub.subscribe(session, argument)
+                if refused:
+                    await websocket.send(refusal_message(hub, refused))
+            else:
+                hub.unsubscribe(session, argument)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        hub.unsubscribe(session)
+        session.closed = True
+        session.writer.cancel()
+
+
+def status_routes(hub, schedulers, started, replay_source=None):
+    """HTTP GET endpoints: liveness, per-client queues, per-feed tick rates, metrics and profile"""
+    # Gauges are read from the hub when /metrics is scraped
+    gauge('clients_connected', 'Connected WebSocket clients',
+          function=lambda: len(hub.sessions()))
+    gauge('client_queue_depth_max', 'Deepest outbound client queue',
+          function=lambda: max((session.depth for session in hub.sessions()), default=0))
+    gauge('client_queue_depth_total', 'Frames waiting in all outbound client queues',
+          function=lambda: sum(session.depth for session in hub.sessions()))
+    gauge('client_frames_dropped', 'Frames dropped by the slow client policy for connected clients',
+          function=lambda: sum(session.dropped for session in hub.sessions()))
+
+    def stats():
+        return {
+            'uptime': time.time() - started,
+            'published': hub.published,
+            'clients': len(hub.sessions()),
+            'feeds': {symbol: scheduler.metrics() for symbol, scheduler in schedulers.items()},
+            'replayed': replay_source.published if replay_source is not None else None
         }
 
-        # Send message to the client
-        await websocket.send(json.dumps(message))
+    return {
+        '/': lambda: "WebSocket Real-Time Stock Simulation Server is running!",
+        '/health': lambda: {'status': 'ok', 'uptime': time.time() - started},
+        '/clients': hub.client_metrics,
+        '/stats': stats,
+        '/metrics': REGISTRY.render,
+        **PROFILER.routes()
+    }
+
 
-        # Wait for a short interval before sending the next update
-        await asyncio.sleep(0.1)  # 1-second interval for real-time updates
+async def serve(args):
+    """Run the WebSocket streams and HTTP endpoints on one event loop until SIGINT/SIGTERM"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except NotImplementedError:  # Windows event loops
+            pass
+    # kill -USR1 <pid> switches the sampling profiler on and off (see /profile)
+    if hasattr(signal, 'SIGUSR1'):
+        loop.add_signal_handler(signal.SIGUSR1, PROFILER.toggle)
 
-# Start Flask in a separate thread
+    default_symbols = [symbol.strip().upper()
+                       for symbol in args.symbols.split(',') if symbol.strip()]
+    invalid = [symbol for symbol in default_symbols if not valid_symbol(symbol)]
+    if invalid:
+        raise SystemExit(f"--symbols must be ASCII and at most {MAX_SYMBOL_BYTES} characters: "
+                         f"{', '.join(invalid)}")
+    schedulers = {}
+    replay_source = None
+    # Audit log of everything published; writes happen on the recorder's own thread
+    recorder = None
+    if args.record:
+        recorder = TickRecorder(args.record, segment_bytes=int(args.record_segment_mb * 2**20),
+                                segment_seconds=60 * args.record_segment_minutes)
+    # Clients may only subscribe to symbols that have data (--symbols for the
+    # random walk and JSON replays), and to at most --max_feeds of them at once
+    hub_options = dict(recorder=recorder, max_feeds=args.max_feeds)
+    if args.replay:
+        replay_source = ReplaySource(args.replay, args.replay_speed, args.replay_chunk)
+        hub = BroadcastHub(feed_factory=replay_source.feed,
+                           allowed_symbols=replay_source.symbols() or default_symbols, **hub_options)
+    elif args.bus:
+        bus_feed = BusFeed(args.bus)
+        hub = BroadcastHub(feed_factory=bus_feed.feed, allowed_symbols=bus_feed.bus.symbols, **hub_options)
+    else:
+        # Independent random stream per symbol from the selected backend
+        provider = RNGProvider(args.rng, args.seed)
+        if args.rng == 'quantum':
+            watch_aer()
+        hub = BroadcastHub(feed_factory=partial(
+            stock_price_simulator, provider=provider, interval=args.tick_interval,
+            schedulers=schedulers), allowed_symbols=default_symbols, **hub_options)
 
+    http_server = await serve_http(status_routes(hub, schedulers, time.time(), replay_source),
+                                   args.host, args.http_port, post_routes=PROFILER.control_routes())
+    ws_server = await websockets.serve(
+        partial(handle_client, hub=hub, args=args, default_symbols=default_symbols),
+        args.host, args.websocket_port)
+    # A replay starts with its first subscriber rather than with the server;
+    # other default feeds keep running while no one is subscribed
+    if not args.replay:
+        for symbol in default_symbols:
+            hub.ensure_feed(symbol, pinned=True)
+    batcher = asyncio.create_task(hub.run_batcher(args.batch_interval))
+    print(f"Streaming on ws://{args.host}:{args.websocket_port}, "
+          f"status on http://{args.host}:{args.http_port}")
 
-def start_flask():
-    app.run(port=args.flask_port)
+    await stop.wait()
 
-# Start the WebSocket server
+    # Graceful shutdown: stop accepting, close clients with 1001, stop the feeds
+    print("Shutting down")
+    http_server.close()
+    ws_server.close()
+    batcher.cancel()
+    await hub.stop()
+    await asyncio.gather(batcher, ws_server.wait_closed(), http_server.wait_closed(),
+                         return_exceptions=True)
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.recorded} ticks to {args.record}")
 
 
-async def start_websocket():
-    async with websockets.serve(stock_price_simulator, args.host, args.websocket_port):
-        await asyncio.Future()  # Run forever
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.loop == 'uvloop':
+        try:
+            import uvloop
+        except ImportError:
+            raise SystemExit("--loop uvloop needs the uvloop package (pip install uvloop)")
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(serve(args))
 
-# Run Flask in a separate thread so that it can run alongside the WebSocket server
-flask_thread = Thread(target=start_flask)
-flask_thread.start()
 
-# Run WebSocket server using asyncio
-asyncio.run(start_websocket())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+from collections import deque
+import numpy as np
+
+from tick_store import OHLCBars, TIME_DTYPE, US_PER_SECOND
+
+# Bar resolutions kept by default: 1 second, 1 minute, 1 hour
+DEFAULT_RESOLUTIONS = (1, 60, 3600)
+
+
+class RollingMinMax:
+    def __init__(self):
+        """
+        Rolling minimum and maximum over a time window
+
+        Each tick is pushed and popped at most once per deque, so updates are
+        amortized O(1) regardless of how many ticks the window holds.
+        """
+        self._min = deque()  # (time, price) with increasing prices
+        self._max = deque()  # (time, price) with decreasing prices
+
+    def push(self, time_us, price):
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((time_us, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((time_us, price))
+
+    def expire(self, cutoff_us):
+        """Drop every tick at or before cutoff_us"""
+        while self._min and self._min[0][0] <= cutoff_us:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff_us:
+            self._max.popleft()
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+
+class StreamAggregator:
+    def __init__(self, window_seconds=300, resolutions=DEFAULT_RESOLUTIONS, bar_history=600):
+        """
+        Incremental statistics over a live tick stream
+
+        Every tick updates the rolling window (min, max, trade and shock counts),
+        the session VWAP, a Welford running mean/variance and one OHLC bar table
+        per resolution in O(1) amortized time, so reading the statistics never
+        touches the full history.
+
+        window_seconds: length of the rolling window
+        resolutions: bar widths in seconds
+        bar_history: number of most recent bars kept per resolution
+        """
+        self.window_us = int(window_seconds * US_PER_SECOND)
+        self.minmax = RollingMinMax()
+        self.bars = {resolution: OHLCBars(resolution, bar_history)
+                     for resolution in resolutions}
+        self._window_times = deque()
+        self._shock_times = deque()
+        self._subscribers = []
+
+        self.last_price = None
+        self.last_time_us = None
+        self.total_count = 0
+        self.total_volume = 0.0
+        self._price_volume = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def subscribe(self, callback):
+        """
+        Call `callback(snapshot)` after every update
+
+        Returns a function that removes the subscription.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def update(self, timestamp, price, volume=0, had_shock=False):
+        """Add a single tick"""
+        self.update_many([timestamp], [price], [volume], [had_shock])
+
+    def update_many(self, timestamps, prices, volumes=None, had_shock=None):
+        """Add a batch of ticks with non-decreasing timestamps"""
+        prices = np.asarray(prices, dtype=float)
+        count = len(prices)
+        if count == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=TIME_DTYPE)
+        volumes = np.zeros(count) if volumes is None else np.asarray(volumes, dtype=float)
+        had_shock = np.zeros(count, dtype=bool) if had_shock is None else np.asarray(had_shock, dtype=bool)
+        times_us = timestamps.astype(np.int64)
+
+        # Rolling window deques
+        for time_us, price, shock in zip(times_us.tolist(), prices.tolist(), had_shock.tolist()):
+            self.minmax.push(time_us, price)
+            self._window_times.append(time_us)
+            if shock:
+                self._shock_times.append(time_us)
+
+        # Welford mean/variance, merged with the batch using Chan's update
+        batch_mean = float(prices.mean())
+        batch_m2 = float(((prices - batch_mean) ** 2).sum())
+        total = self.total_count + count
+        delta = batch_mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += batch_m2 + delta ** 2 * self.total_count * count / total
+        self.total_count = total
+
+        # Session VWAP
+        self._price_volume += float(prices @ volumes)
+        self.total_volume += float(volumes.sum())
+
+        for bars in self.bars.values():
+            bars.update(timestamps, prices, volumes)
+
+        self.last_price = float(prices[-1])
+        self.last_time_us = int(times_us[-1])
+        self.expire(self.last_time_us)
+
+        if self._subscribers:
+            snapshot = self.snapshot()
+            for callback in list(self._subscribers):
+                callback(snapshot)
+
+    def expire(self, now):
+        """Drop ticks that have left the rolling window ending at `now`"""
+        if not isinstance(now, (int, np.integer)):
+            now = np.datetime64(now, 'us').astype(np.int64)
+        cutoff_us = int(now) - self.window_us
+        self.minmax.expire(cutoff_us)
+        while self._window_times and self._window_times[0] <= cutoff_us:
+            self._window_times.popleft()
+        while self._shock_times and self._shock_times[0] <= cutoff_us:
+            self._shock_times.popleft()
+
+    @property
+    def count(self):
+        """Number of ticks in the rolling window"""
+        return len(self._window_times)
+
+    @property
+    def shock_count(self):
+        """Number of shocked ticks in the rolling window"""
+        return len(self._shock_times)
+
+    @property
+    def vwap(self):
+        if self.total_volume == 0:
+            return None
+        return self._price_volume / self.total_volume
+
+    @property
+    def mean(self):
+        return self._mean if self.total_count else None
+
+    @property
+    def variance(self):
+        if self.total_count < 2:
+            return None
+        return self._m2 / (self.total_count - 1)
+
+    def snapshot(self):
+        """Current statistics as a plain dict"""
+        low, high = self.minmax.min, self.minmax.max
+        variance = self.variance
+        return {
+            'last': self.last_price,
+            'min': low,
+            'max': high,
+            'range': None if low is None else high - low,
+            'count': self.count,
+            'shocks': self.shock_count,
+            'vwap': self.vwap,
+            'mean': self.mean,
+            'std': None if variance is None else variance ** 0.5,
+            'total': self.total_count
+        }
+
+
+def format_stats_title(title, stats):
+    """Append a line of snapshot statistics to a plot title"""
+    if not stats.get('count'):
+        return title
+    vwap = stats['vwap'] if stats['vwap'] is not None else stats['last']
+    return (f"{title}\nLast ${stats['last']:.2f}  VWAP ${vwap:.2f}  "
+            f"Low ${stats['min']:.2f}  High ${stats['max']:.2f}  Ticks {stats['total']}")
@@ -0,0 +1,484 @@
+import os
+import time
+import struct
+import argparse
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+
+from wire_format import valid_symbol
+from metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+# Append-only tick log: a directory of numbered segments
+# ticks-<sequence>.log holding a HEADER and fixed-size LOG_DTYPE records in
+# arrival order, each with a sparse index ticks-<sequence>.idx of
+# (timestamp, record) pairs for every INDEX_STRIDE-th record. Segments are
+# never rewritten, so readers can memory-map them while the recorder appends;
+# a torn record at the end of a segment (crash mid-write) is ignored.
+HEADER = struct.Struct('<4sHHd')  # magic, version, record size, created (epoch seconds)
+HEADER_SIZE = 64
+MAGIC = b'QLOG'
+VERSION = 1
+LOG_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # Seconds since the epoch
+    ('price', '<f8'),
+    ('price_change', '<f8'),
+    ('volume', '<u4'),
+    ('symbol', 'S8'),
+    ('had_shock', '?')
+])
+INDEX_DTYPE = np.dtype([('timestamp', '<f8'), ('record', '<i8')])
+INDEX_STRIDE = 1024
+
+SEGMENT_PREFIX = 'ticks-'
+SEGMENT_SUFFIX = '.log'
+INDEX_SUFFIX = '.idx'
+
+# A segment is closed and a new one started at whichever limit comes first
+DEFAULT_SEGMENT_BYTES = 64 << 20
+DEFAULT_SEGMENT_SECONDS = 3600.0
+
+# Seconds between batched writes by the background writer
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+# Most ticks (or record arrays) waiting for the writer; further ticks are dropped and counted
+DEFAULT_MAX_PENDING = 1 << 20
+
+
+def segment_path(directory, sequence):
+    return os.path.join(directory, f'{SEGMENT_PREFIX}{sequence:06d}{SEGMENT_SUFFIX}')
+
+
+def list_segments(directory):
+    """(sequence, path) of every segment in the log directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted((int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]), os.path.join(directory, name))
+                  for name in os.listdir(directory)
+                  if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+
+def is_tick_log(path):
+    return bool(list_segments(path))
+
+
+def to_seconds(value):
+    """
+    datetime, datetime64, ISO string or epoch seconds as float epoch seconds (None stays None)
+
+    Naive datetimes and ISO strings are local time, like the datetimes the
+    simulators stamp; datetime64 values are UTC.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return np.datetime64(value, 'us').astype(np.int64) / 1e6
+
+
+class TickRecorder:
+    def __init__(self, directory, segment_bytes=DEFAULT_SEGMENT_BYTES,
+                 segment_seconds=DEFAULT_SEGMENT_SECONDS, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_pending=DEFAULT_MAX_PENDING):
+        """
+        Capture every tick to an append-only segmented log without blocking the tick loop
+
+        append() only puts a tuple on a deque; a background thread drains it
+        every `flush_interval` seconds, packs the batch into LOG_DTYPE records
+        and writes it with one call. A new segment starts when the current one
+        reaches `segment_bytes` of records or is `segment_seconds` old, and
+        every recorder run starts a new segment after the existing ones.
+        Timestamps should be non-decreasing for TickLog's range lookups.
+
+        The tick loop is never blocked or failed by the recorder: ticks whose
+        symbol does not fit LOG_DTYPE are rejected, ticks beyond `max_pending`
+        queued items are dropped (both counted), and a batch that cannot be
+        written is logged and skipped, with the next batch starting a new
+        segment.
+
+        directory: log directory, created if missing
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        existing = list_segments(directory)
+        self.sequence = existing[-1][0] if existing else 0
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.failed = 0
+        self.error = None  # last write error, if any
+        self._pending = deque()
+        self._symbols = set()  # symbols already checked to fit LOG_DTYPE
+        self._file = self._index = None
+        self._stop = threading.Event()
+
+        self._recorded = counter('ticks_recorded_total', 'Ticks written to the tick log')
+        self._write_seconds = histogram('tick_log_write_seconds', 'Time to pack and write one batch of ticks')
+        self._rejected = counter('tick_log_rejected_total', 'Ticks refused for a symbol that does not fit the log')
+        self._dropped = counter('tick_log_dropped_total', 'Ticks dropped because the writer queue was full')
+        self._failed = counter('tick_log_failed_batches_total', 'Batches skipped after a packing or write error')
+        gauge('tick_log_pending', 'Ticks waiting for the tick log writer', function=lambda: len(self._pending))
+
+        self._writer = threading.Thread(target=self._write_loop, name='tick-log-writer', daemon=True)
+        self._writer.start()
+
+    def append(self, timestamp, symbol, price, price_change=0.0, volume=0, had_shock=False):
+        """Queue one tick (timestamp in epoch seconds); safe to call from any thread"""
+        # Fields in LOG_DTYPE order, so the writer packs the tuples directly
+        tick = (timestamp, price, price_change, volume, symbol, had_shock)
+        if symbol in self._symbols and len(self._pending) < self.max_pending:
+            self._pending.append(tick)
+        else:
+            self._append_checked(symbol, tick)
+
+    def append_message(self, symbol, message, timestamp=None):
+        """Queue a server tick message (stock_symbol, real_time_price, volume, price_change)"""
+        tick = (time.time() if timestamp is None else timestamp,
+                message['real_time_price'], message.get('price_change', 0.0),
+                message.get('volume', 0), symbol, message.get('had_shock', False))
+        if symbol in self._symbols and len(self._pending) < self.max_pending:
+            self._pending.append(tick)
+        else:
+            self._append_checked(symbol, tick)
+
+    def _append_checked(self, symbol, tick):
+        """Slow path of append: validate a new symbol, or count a tick the full queue drops"""
+        if symbol not in self._symbols:
+            if not valid_symbol(symbol):
+                self.rejected += 1
+                self._rejected.inc()
+                return
+            self._symbols.add(symbol)
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            self._dropped.inc()
+            return
+        self._pending.append(tick)
+
+    def append_records(self, records):
+        """Queue a record array with LOG_DTYPE fields (others default to zero) in one go"""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += len(records)
+            self._dropped.inc(len(records))
+            return
+        self._pending.append(records)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def _open_segment(self):
+        self._close_segment()
+        self.sequence += 1
+        path = segment_path(self.directory, self.sequence)
+        self._file = open(path, 'xb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, LOG_DTYPE.itemsize, time.time()).ljust(HEADER_SIZE, b'\0'))
+        self._index = open(path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX, 'xb')
+        self._segment_records = 0
+        self._segment_opened = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        try:
+            for f in (self._file, self._index):
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            self._abandon_segment()
+
+    def _abandon_segment(self):
+        """Close the segment files without syncing; a torn last record is ignored by readers"""
+        for f in (self._file, self._index):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._file = self._index = None
+
+    def _segment_full(self):
+        return (self._file is None
+                or self._segment_records * LOG_DTYPE.itemsize >= self.segment_bytes
+                or time.monotonic() - self._segment_opened >= self.segment_seconds)
+
+    def _pack(self, batch):
+        """LOG_DTYPE array from queued tuples and record arrays, in arrival order"""
+        parts, rows = [], []
+        for item in batch:
+            if isinstance(item, tuple):
+                rows.append(item)
+                continue
+            if rows:
+                parts.append(np.array(rows, dtype=LOG_DTYPE))
+                rows = []
+            records = np.zeros(len(item), dtype=LOG_DTYPE)
+            for name in LOG_DTYPE.names:
+                if name in item.dtype.names:
+                    records[name] = item[name]
+            parts.append(records)
+        if rows:
+            parts.append(np.array(rows, dtype=LOG_DTYPE))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _write(self, records):
+        start = time.perf_counter()
+        while len(records):
+            if self._segment_full():
+                self._open_segment()
+            room = max(1, (self.segment_bytes - self._segment_records * LOG_DTYPE.itemsize)
+                       // LOG_DTYPE.itemsize)
+            part, records = records[:room], records[room:]
+            # Index the records whose position in the segment is a multiple of INDEX_STRIDE
+            positions = np.arange(self._segment_records, self._segment_records + len(part))
+            marked = positions % INDEX_STRIDE == 0
+            if marked.any():
+                index = np.empty(int(marked.sum()), dtype=INDEX_DTYPE)
+                index['timestamp'] = part['timestamp'][marked]
+                index['record'] = positions[marked]
+                self._index.write(index.tobytes())
+            self._file.write(part.tobytes())
+            self._segment_records += len(part)
+        # Data before index, so a reader never finds an index entry past the data
+        self._file.flush()
+        self._index.flush()
+        self._write_seconds.observe(time.perf_counter() - start)
+
+    def _drain(self):
+        pending = self._pending
+        batch = [pending.popleft() for _ in range(len(pending))]
+        if not batch:
+            return
+        try:
+            records = self._pack(batch)
+            self._write(records)
+        except Exception as error:
+            # Skip the batch and keep recording; a partly written segment is
+            # left behind so the next batch starts a clean one
+            self.error = error
+            self.failed += 1
+            self._failed.inc()
+            logger.exception("Tick log dropped a batch of %d items", len(batch))
+            self._abandon_segment()
+            return
+        self.recorded += len(records)
+        self._recorded.inc(len(records))
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+        try:
+            self._close_segment()
+        except OSError as error:
+            self.error = error
+            logger.exception("Tick log could not sync its last segment")
+
+    def close(self):
+        """Write everything queued, sync and close the segment"""
+        self._stop.set()
+        self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Segment:
+    def __init__(self, path):
+        """Memory-mapped records and sparse index of one segment (whole records only)"""
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, record_size, self.created = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != LOG_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a version {VERSION} tick log segment")
+        self.size = os.path.getsize(path)
+        count = (self.size - HEADER_SIZE) // LOG_DTYPE.itemsize
+        self.records = (np.memmap(path, dtype=LOG_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+                        if count else np.empty(0, dtype=LOG_DTYPE))
+        index_path = path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+        index = (np.fromfile(index_path, dtype=INDEX_DTYPE) if os.path.exists(index_path)
+                 else np.empty(0, dtype=INDEX_DTYPE))
+        self.index = index[index['record'] < count]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def first(self):
+        return float(self.records[0]['timestamp']) if len(self) else None
+
+    @property
+    def last(self):
+        return float(self.records[-1]['timestamp']) if len(self) else None
+
+    def locate(self, timestamp, side='left'):
+        """
+        Position of `timestamp` in the records, like np.searchsorted
+
+        The sparse index narrows the search to one INDEX_STRIDE block, so only
+        a few pages of the timestamp column are touched.
+        """
+        positions = self.index['record']
+        block = np.searchsorted(self.index['timestamp'], timestamp, side=side)
+        lo = int(positions[block - 1]) if block > 0 else 0
+        hi = int(positions[block]) if block < len(positions) else len(self.records)
+        return lo + int(np.searchsorted(self.records['timestamp'][lo:hi], timestamp, side=side))
+
+
+class TickLog:
+    def __init__(self, directory):
+        """
+        Reader for a TickRecorder log directory
+
+        Segments are memory-mapped on first use and re-mapped when a live
+        recorder has grown them, so a running capture can be read as it is
+        written.
+        """
+        self.directory = directory
+        self._segments = {}  # path -> Segment
+
+    def segments(self):
+        """Every segment, oldest first, mapped at its current size"""
+        segments = []
+        for _, path in list_segments(self.directory):
+            segment = self._segments.get(path)
+            if segment is None or segment.size != os.path.getsize(path):
+                segment = self._segments[path] = Segment(path)
+            segments.append(segment)
+        return segments
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments())
+
+    def slices(self, start=None, end=None):
+        """
+        Zero-copy record slices with start <= timestamp <= end, one per segment
+
+        start, end: datetime, datetime64, ISO string or epoch seconds; either may be None
+        """
+        start, end = to_seconds(start), to_seconds(end)
+        slices = []
+        for segment in self.segments():
+            if not len(segment):
+                continue
+            if (start is not None and segment.last < start) or (end is not None and segment.first > end):
+                continue
+            lo = 0 if start is None else segment.locate(start, 'left')
+            hi = len(segment) if end is None else segment.locate(end, 'right')
+            if hi > lo:
+                slices.append(segment.records[lo:hi])
+        return slices
+
+    def range(self, start=None, end=None, symbol=None):
+        """
+        Records with start <= timestamp <= end as one array, optionally for one symbol
+
+        A range inside one segment without a symbol filter is a zero-copy view.
+        """
+        slices = self.slices(start, end)
+        if symbol is not None:
+            slices = [part[part['symbol'] == symbol.encode()] for part in slices]
+        if len(slices) == 1:
+            return slices[0]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=LOG_DTYPE)
+
+    def chunks(self, start=None, end=None, symbol=None, chunk_rows=4096):
+        """Record arrays of at most `chunk_rows` rows in time order, reading one chunk at a time"""
+        for part in self.slices(start, end):
+            for offset in range(0, len(part), chunk_rows):
+                chunk = part[offset:offset + chunk_rows]
+                if symbol is not None:
+                    chunk = chunk[chunk['symbol'] == symbol.encode()]
+                if len(chunk):
+                    yield chunk
+
+    def symbols(self):
+        found = set()
+        for segment in self.segments():
+            found.update(np.unique(segment.records['symbol']).tolist())
+        return sorted(symbol.decode() for symbol in found)
+
+
+def measure(directory, ticks, batch=1):
+    """Hot-path cost (ns per tick) and end-to-end write rate (ticks/s) of a recorder"""
+    recorder = TickRecorder(directory)
+    timestamps = time.time() + np.arange(ticks) * 1e-5
+    start = time.perf_counter()
+    if batch > 1:
+        for offset in range(0, ticks, batch):
+            records = np.zeros(min(batch, ticks - offset), dtype=LOG_DTYPE)
+            records['timestamp'] = timestamps[offset:offset + batch]
+            records['price'] = 100.0
+            records['symbol'] = b'AAPL'
+            recorder.append_records(records)
+    else:
+        for timestamp in timestamps.tolist():
+            recorder.append(timestamp, 'AAPL', 100.0, 0.01, 100)
+    queued = time.perf_counter() - start
+    recorder.close()
+    total = time.perf_counter() - start
+    return 1e9 * queued / ticks, ticks / total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect or export a segmented tick log.')
+    parser.add_argument('--log', type=str, required=True,
+                        help='Tick log directory written by --record')
+    parser.add_argument('--start', type=str, default=None,
+                        help='First timestamp to include (ISO format or epoch seconds)')
+    parser.add_argument('--end', type=str, default=None,
+                        help='Last timestamp to include (ISO format or epoch seconds)')
+    parser.add_argument('--symbol', type=str, default=None,
+                        help='Only include this symbol')
+    parser.add_argument('--csv', type=str, default=None,
+                        help='Write the selected ticks to this CSV file')
+    parser.add_argument('--measure', type=int, default=0,
+                        help='Instead, record this many synthetic ticks into --log and report the rate')
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        for batch in (1, 1024):
+            cost_ns, rate = measure(args.log, args.measure, batch)
+            print(f"batch {batch:>5}: {cost_ns:8.0f} ns/tick on the hot path, {rate:12,.0f} ticks/s written")
+        return
+
+    def bound(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
+    log = TickLog(args.log)
+    for segment in log.segments():
+        span = (f"{datetime.fromtimestamp(segment.first)} .. {datetime.fromtimestamp(segment.last)}"
+                if len(segment) else 'empty')
+        print(f"{os.path.basename(segment.path)}: {len(segment):>10,} ticks  {span}")
+    ticks = log.range(bound(args.start), bound(args.end), args.symbol and args.symbol.upper())
+    print(f"{len(ticks):,} ticks selected")
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            f.write(','.join(LOG_DTYPE.names) + '\n')
+            for chunk in log.chunks(bound(args.start), bound(args.end), args.symbol and args.symbol.upper()):
+                columns = [chunk[name] for name in LOG_DTYPE.names]
+                columns[LOG_DTYPE.names.index('symbol')] = chunk['symbol'].astype(str)
+                for row in zip(*(column.tolist() for column in columns)):
+                    f.write(','.join(map(str, row)) + '\n')
+        print(f"Wrote {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import queue
+import numpy as np
+
+# Timestamps are kept as naive datetime64[us] so they round-trip datetime.now()
+TIME_DTYPE = 'datetime64[us]'
+US_PER_SECOND = 1_000_000
+
+
+class TickRingBuffer:
+    def __init__(self, capacity=65536):
+        """
+        Fixed-capacity, array-backed store for the most recent ticks
+
+        capacity: maximum number of ticks kept; the oldest are overwritten
+        """
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=TIME_DTYPE)
+        self.prices = np.zeros(capacity)
+        self.had_shock = np.zeros(capacity, dtype=bool)
+        self.head = 0  # Index of the next write
+        self.size = 0
+        self.total = 0  # Ticks ever written
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, timestamps, prices, had_shock):
+        """Append a batch of ticks (timestamps must be non-decreasing)"""
+        timestamps = np.asarray(timestamps, dtype=TIME_DTYPE)
+        prices = np.asarray(prices, dtype=float)
+        had_shock = np.asarray(had_shock, dtype=bool)
+        count = len(prices)
+        if count == 0:
+            return
+        self.total += count
+
+        # Only the last `capacity` ticks of an oversized batch survive
+        if count > self.capacity:
+            timestamps, prices, had_shock = (
+                timestamps[-self.capacity:], prices[-self.capacity:], had_shock[-self.capacity:])
+            count = self.capacity
+
+        first = min(count, self.capacity - self.head)
+        for store, values in ((self.timestamps, timestamps), (self.prices, prices),
+                              (self.had_shock, had_shock)):
+            store[self.head:self.head + first] = values[:first]
+            store[:count - first] = values[first:]
+        self.head = (self.head + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def drain_queue(self, source, max_items=None):
+        """
+        Move every tick currently waiting in `source` into the buffer in one batch
+
+        Returns the drained ticks as (timestamps, prices, had_shock) arrays.
+        """
+        ticks = []
+        while max_items is None or len(ticks) < max_items:
+            try:
+                ticks.append(source.get_nowait())
+            except queue.Empty:
+                break
+
+        timestamps = np.array([tick['timestamp'] for tick in ticks], dtype=TIME_DTYPE)
+        prices = np.array([tick['price'] for tick in ticks], dtype=float)
+        had_shock = np.array([tick['had_shock'] for tick in ticks], dtype=bool)
+        self.extend(timestamps, prices, had_shock)
+        return timestamps, prices, had_shock
+
+    def _ordered(self, values):
+        start = (self.head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return values[start:start + self.size]
+        return np.concatenate([values[start:], values[:self.head]])
+
+    def arrays(self):
+        """Return (timestamps, prices, had_shock) oldest first (views when not wrapped)"""
+        return (self._ordered(self.timestamps), self._ordered(self.prices),
+                self._ordered(self.had_shock))
+
+    def since(self, cutoff):
+        """Return the ticks strictly newer than `cutoff`, oldest first"""
+        timestamps, prices, had_shock = self.arrays()
+        start = np.searchsorted(timestamps, np.datetime64(cutoff, 'us'), side='right')
+        return timestamps[start:], prices[start:], had_shock[start:]
+
+    def latest_price(self):
+        if self.size == 0:
+            return None
+        return float(self.prices[self.head - 1])
+
+
+class OHLCBars:
+    def __init__(self, interval_seconds=1, capacity=300):
+        """
+        Incrementally maintained OHLC bar table
+
+        Each update only aggregates the new ticks and merges them into the
+        currently open bar; closed bars are never recomputed.
+
+        interval_seconds: bar width
+        capacity: number of most recent bars kept
+        """
+        self.interval_us = int(interval_seconds * US_PER_SECOND)
+        self.capacity = capacity
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.open = np.zeros(0)
+        self.high = np.zeros(0)
+        self.low = np.zeros(0)
+        self.close = np.zeros(0)
+        self.volume = np.zeros(0)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def update(self, timestamps, prices, volumes=None):
+        """Fold a batch of new ticks (non-decreasing timestamps) into the bars"""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) == 0:
+            return
+        if volumes is None:
+            volumes = np.zeros(len(prices))
+        buckets = (np.asarray(timestamps, dtype=TIME_DTYPE).astype(np.int64)
+                   // self.interval_us) * self.interval_us
+
+        # Aggregate the new ticks per bar with reduceat over bucket boundaries
+        boundaries = np.flatnonzero(np.diff(buckets)) + 1
+        first = np.concatenate([[0], boundaries])
+        last = np.concatenate([boundaries - 1, [len(prices) - 1]])
+        starts = buckets[first]
+        opens = prices[first]
+        highs = np.maximum.reduceat(prices, first)
+        lows = np.minimum.reduceat(prices, first)
+        closes = prices[last]
+        bar_volumes = np.add.reduceat(np.asarray(volumes, dtype=float), first)
+
+        # Merge the first new bar into the open bar if it is the same interval
+        if len(self.starts) and starts[0] == self.starts[-1]:
+            self.high[-1] = max(self.high[-1], highs[0])
+            self.low[-1] = min(self.low[-1], lows[0])
+            self.close[-1] = closes[0]
+            self.volume[-1] += bar_volumes[0]
+            starts, opens, highs, lows, closes, bar_volumes = (
+                starts[1:], opens[1:], highs[1:], lows[1:], closes[1:], bar_volumes[1:])
+
+        if len(starts):
+            self.starts = np.concatenate([self.starts, starts])[-self.capacity:]
+            self.open = np.concatenate([self.open, opens])[-self.capacity:]
+            self.high = np.concatenate([self.high, highs])[-self.capacity:]
+            self.low = np.concatenate([self.low, lows])[-self.capacity:]
+            self.close = np.concatenate([self.close, closes])[-self.capacity:]
+            self.volume = np.concatenate([self.volume, bar_volumes])[-self.capacity:]
+
+    def since(self, cutoff):
+        """Return (starts, open, high, low, close) for bars starting after `cutoff`"""
+        cutoff_us = np.datetime64(cutoff, 'us').astype(np.int64)
+        start = np.searchsorted(self.starts, cutoff_us, side='right')
+        return (self.starts[start:].astype(TIME_DTYPE), self.open[start:],
+                self.high[start:], self.low[start:], self.close[start:])
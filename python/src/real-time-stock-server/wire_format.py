@@ -0,0 +1,80 @@
+import json
+import struct
+import time
+from datetime import datetime
+import numpy as np
+
+# Frame formats a client can ask for with {"action": "format", "format": ...}
+WIRE_FORMATS = ('json', 'binary')
+
+# Binary frame: header followed by `count` packed little-endian tick records
+HEADER = struct.Struct('<4sHI')  # magic, version, record count
+MAGIC = b'QTCK'
+VERSION = 1
+TICK_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # Server time, seconds since the epoch
+    ('price', '<f8'),
+    ('price_change', '<f8'),
+    ('volume', '<u4'),
+    ('symbol', 'S8')
+])
+
+
+# Longest symbol a tick record holds
+MAX_SYMBOL_BYTES = TICK_DTYPE['symbol'].itemsize
+
+
+def valid_symbol(symbol):
+    """True for a non-empty ASCII symbol that fits a tick record's symbol field"""
+    return isinstance(symbol, str) and symbol.isascii() and 0 < len(symbol) <= MAX_SYMBOL_BYTES
+
+
+def pack_ticks(messages, timestamps=None):
+    """
+    Pack JSON-style tick messages into a TICK_DTYPE record array
+
+    messages: dicts with stock_symbol, real_time_price, volume and price_change
+    timestamps: server times per message (defaults to now)
+    """
+    records = np.empty(len(messages), dtype=TICK_DTYPE)
+    records['timestamp'] = time.time() if timestamps is None else timestamps
+    records['price'] = [message['real_time_price'] for message in messages]
+    records['price_change'] = [message['price_change'] for message in messages]
+    records['volume'] = [message['volume'] for message in messages]
+    records['symbol'] = [message['stock_symbol'] for message in messages]
+    return records
+
+
+def encode_batch(records):
+    """Serialize a TICK_DTYPE record array into one binary frame"""
+    records = np.ascontiguousarray(records, dtype=TICK_DTYPE)
+    return HEADER.pack(MAGIC, VERSION, len(records)) + records.tobytes()
+
+
+def decode_batch(frame):
+    """
+    Decode a binary frame into a TICK_DTYPE record array
+
+    The array is a read-only view on the frame's buffer; nothing is copied.
+    """
+    magic, version, count = HEADER.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a tick frame (magic={magic!r}, version={version})")
+    return np.frombuffer(frame, dtype=TICK_DTYPE, count=count, offset=HEADER.size)
+
+
+def decode_frame(frame):
+    """Decode either frame format into a TICK_DTYPE record array"""
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        return decode_batch(frame)
+    return pack_ticks([json.loads(frame)])
+
+
+def tick_datetimes(records):
+    """Server timestamps of decoded records as local naive datetimes"""
+    return [datetime.fromtimestamp(timestamp) for timestamp in records['timestamp'].tolist()]
+
+
+async def request_binary(websocket):
+    """Ask the server for binary batched frames (servers without support ignore it)"""
+    await websocket.send(json.dumps({"action": "format", "format": "binary"}))
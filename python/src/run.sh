@@ -7,12 +7,53 @@ pip3.10 install --upgrade pip setuptools
 pip3.10 install -r python/requirements.txt
 
 
-python3.10 python/src/real-time-stock-server/server.py --flask_port 8000 --websocket_port 9000 --host 0.0.0.0
+python3.10 python/src/real-time-stock-server/server.py --http_port 8000 --websocket_port 9000 --host 0.0.0.0
 
+python3.10 python/src/real-time-stock-server/server.py --websocket_port 9000 --replay python/src/data/ticks --replay_speed 0 --slow_client_policy drop-oldest --client_queue 100000
 
-python3.10 python/src/historical_stock/historical_data_generator.py --symbol AAPL --timeframe 1year --output python/src/data/aapl_1yrs.json
+python3.10 python/src/real-time-stock-server/price_bus.py --symbols AAPL,MSFT,GOOG,AMZN --workers 4 --rate 1000 --name quantbus
+
+python3.10 python/src/real-time-stock-server/server.py --websocket_port 9000 --bus quantbus --symbols AAPL,MSFT
+
+python3.10 python/src/real-time-stock-server/hft_behaviour.py --bus quantbus --symbol AAPL
+
+
+python3.10 python/src/historical_stock/historical_data_generator.py --symbol AAPL --timeframe 1year --output python/src/data/aapl_1yrs.json --store python/src/data/store
+
+python3.10 python/src/historical_stock/historical_data_generator.py --symbol AAPL --timeframe 1month --interval tick --no_json --store python/src/data/ticks
 
 
 python3.10 python/src/view_graph/updated_realtime_stock_plot.py --view all --websocket_port 9000 --json_file python/src/data/aapl_1yrs.json
 
+python3.10 python/src/view_graph/updated_realtime_stock_plot.py --view 1Y --websocket_port 9000 --store python/src/data/store --symbol AAPL
+
 python3.10 python/src/view_graph/updated_realtime_stock_plot.py --websocket_port 9000 --instant
+
+
+python3.10 python/src/pricing/monte_carlo.py --model gbm --option european --paths 200000 --workers 4 --seed 1
+
+python3.10 python/src/pricing/monte_carlo.py --model hft --option barrier --strike 150 --barrier 156 --steps 1000 --target_stderr 0.005
+
+python3.10 python/src/benchmarks/bench_amplitude_estimation.py --qubits 5 --shots 100
+
+python3.10 python/src/benchmarks/bench_aer_session.py --calls 2000
+
+python3.10 python/src/cli.py serve --websocket_port 9000 --symbols AAPL,MSFT
+
+python3.10 python/src/cli.py generate --symbol AAPL --timeframe 1year --output python/src/data/aapl_1yrs.json
+
+python3.10 python/src/cli.py qrng --bits 8 --count 5
+
+python3.10 python/src/benchmarks/bench_startup.py --runs 5
+
+python3.10 python/src/benchmarks/bench_suite.py --output python/src/data/bench_baseline.json
+
+python3.10 python/src/benchmarks/bench_suite.py --only simulator,server --baseline python/src/data/bench_baseline.json --tolerance 0.1
+
+curl -s localhost:8000/metrics && curl -s -X POST localhost:8000/profile/start && sleep 10 && curl -s localhost:8000/profile
+
+python3.10 python/src/real-time-stock-server/server.py --websocket_port 9000 --symbols AAPL,MSFT --tick_interval 0.001 --record python/src/data/tick_log
+
+python3.10 python/src/real-time-stock-server/tick_log.py --log python/src/data/tick_log --symbol AAPL --start 2024-01-02T09:30:00 --end 2024-01-02T10:00:00 --csv aapl_ticks.csv
+
+python3.10 python/src/real-time-stock-server/server.py --websocket_port 9000 --replay python/src/data/tick_log --replay_speed 10
@@ -1,33 +1,81 @@
 import asyncio
-import websockets
+import os
+import sys
 import json
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from datetime import datetime
+from datetime import datetime, timedelta
 from threading import Thread
 import argparse
-import matplotlib.dates as mdates
-from matplotlib.widgets import Cursor
-import pandas as pd
-
-# Parse command line arguments for historical data view
-parser = argparse.ArgumentParser(
-    description='Run a real-time stock simulation server with historical data visualization.')
-parser.add_argument('--view', type=str, default='1D', choices=[
-                    '1D', '1W', '1M', '6M', '1Y', '5Y', 'all'], help='View mode for historical data (default: 1D)')
-parser.add_argument('--websocket_port', type=int, default=6789,
-                    help='Port for the WebSocket server (default: 6789)')
-parser.add_argument('--json_file', type=str, default='historical_data.json',
-                    help='Path to the historical data JSON file (default: historical_data.json)')
-parser.add_argument('--instant', action='store_true',
-                    help='Show updates instantaneously without delay')
-args = parser.parse_args()
-
-# Parameters for connecting to the WebSocket server
-WEBSOCKET_URI = f"ws://localhost:{args.websocket_port}"
-
-# If not in instant mode, load historical data
-if not args.instant:
+
+# Share the streaming components of the real-time server and the historical store
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'real-time-stock-server'))
+sys.path.insert(0, os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'historical_stock'))
+from stream_aggregator import StreamAggregator  # noqa: E402
+from wire_format import decode_frame, request_binary, tick_datetimes  # noqa: E402
+from columnar_store import SymbolHistory  # noqa: E402
+
+# pandas, matplotlib and websockets are imported when they are first needed
+
+
+def build_parser():
+    # Parse command line arguments for historical data view
+    parser = argparse.ArgumentParser(
+        description='Run a real-time stock simulation server with historical data visualization.')
+    parser.add_argument('--view', type=str, default='1D', choices=[
+                        '1D', '1W', '1M', '6M', '1Y', '5Y', 'all'], help='View mode for historical data (default: 1D)')
+    parser.add_argument('--websocket_port', type=int, default=6789,
+                        help='Port for the WebSocket server (default: 6789)')
+    parser.add_argument('--json_file', type=str, default='historical_data.json',
+                        help='Path to the historical data JSON file (default: historical_data.json)')
+    parser.add_argument('--store', type=str, default=None,
+                        help='Columnar store directory to read instead of the JSON file')
+    parser.add_argument('--symbol', type=str, default='AAPL',
+                        help='Symbol to read from the columnar store (default: AAPL)')
+    parser.add_argument('--instant', action='store_true',
+                        help='Show updates instantaneously without delay')
+    return parser
+
+# Start of the date range for the chosen view (None means all data)
+
+
+def view_start_date(view, end_date):
+    if view == '1D':
+        return end_date - timedelta(days=1)
+    elif view == '1W':
+        return end_date - timedelta(weeks=1)
+    elif view == '1M':
+        return end_date - timedelta(weeks=4)
+    elif view == '6M':
+        return end_date - timedelta(weeks=26)
+    elif view == '1Y':
+        return end_date - timedelta(weeks=52)
+    elif view == '5Y':
+        return end_date - timedelta(weeks=52*5)
+    return None
+
+
+def load_history(args):
+    """Historical (times, prices, volumes, price_changes) lists for the chosen view"""
+    # In instant mode only live ticks are shown
+    if args.instant:
+        return [], [], [], []
+
+    if args.store:
+        # Binary search the memory-mapped date index and slice the columns
+        end_date = datetime.now()
+        window = SymbolHistory(args.store, args.symbol).range(
+            view_start_date(args.view, end_date), end_date)
+
+        # Lists to store real-time data for plotting
+        times = window['date'].astype('datetime64[us]').tolist()
+        prices = window['close_price'].tolist()
+        volumes = window['volume'].tolist()
+        price_changes = [0] * len(prices)  # Initialize with 0 for historical data
+        return times, prices, volumes, price_changes
+
+    import pandas as pd
+
     # Load historical data from JSON file
     with open(args.json_file, 'r') as f:
         historical_data = json.load(f)
@@ -37,112 +85,75 @@ if not args.instant:
     historical_df['date'] = pd.to_datetime(historical_df['date'])
 
     # Determine the date range for the chosen view
-    def filter_historical_data(view):
-        end_date = datetime.now()
-        if view == '1D':
-            start_date = end_date - pd.Timedelta(days=1)
-        elif view == '1W':
-            start_date = end_date - pd.Timedelta(weeks=1)
-        elif view == '1M':
-            start_date = end_date - pd.Timedelta(weeks=4)
-        elif view == '6M':
-            start_date = end_date - pd.Timedelta(weeks=26)
-        elif view == '1Y':
-            start_date = end_date - pd.Timedelta(weeks=52)
-        elif view == '5Y':
-            start_date = end_date - pd.Timedelta(weeks=52*5)
-        else:
-            start_date = historical_df['date'].min()
-        return historical_df[(historical_df['date'] >= start_date) & (historical_df['date'] <= end_date)]
-
-    # Filter the data for the selected view
-    filtered_df = filter_historical_data(args.view)
+    end_date = datetime.now()
+    start_date = view_start_date(args.view, end_date)
+    if start_date is None:
+        start_date = historical_df['date'].min()
+    filtered_df = historical_df[(historical_df['date'] >= start_date) & (historical_df['date'] <= end_date)]
 
     # Lists to store real-time data for plotting
     times = filtered_df['date'].tolist()
     prices = filtered_df['close_price'].tolist()
     volumes = filtered_df['volume'].tolist()
     price_changes = [0] * len(prices)  # Initialize with 0 for historical data
-else:
-    # Initialize empty lists for instant mode
-    times = []
-    prices = []
-    volumes = []
-    price_changes = []
+    return times, prices, volumes, price_changes
 
 # Function to connect to the WebSocket and receive data
 
 
-async def fetch_stock_data():
-    async with websockets.connect(WEBSOCKET_URI) as websocket:
+async def fetch_stock_data(uri, times, prices, volumes, price_changes, aggregator):
+    import websockets
+
+    async with websockets.connect(uri) as websocket:
+        # Batched binary frames decode straight into arrays; JSON still works
+        await request_binary(websocket)
         while True:
             message = await websocket.recv()
-            data = json.loads(message)
-
-            # Add current time and price to the lists
-            times.append(datetime.now())
-            prices.append(data["real_time_price"])
-            volumes.append(data["volume"])
-            price_changes.append(data["price_change"])
-
-# Function to update the plot in real-time
-
-
-def update_plot(frame):
-    ax.clear()
-    ax.plot(times, prices, label="Real-Time Price", color='b')
-    # ax.fill_between(times, prices, color='blue', alpha=0.1)
-    ax.set_title("Real-Time Stock Price of AAPL")
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Price ($)")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.legend()
-
-    # Formatting the x-axis with time
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d %H:%M:%S'))
-
-    # Adding a cursor with information on hover
-    cursor = Cursor(ax, useblit=True, color='red', linewidth=1)
-
-    # Annotate details when hovering over a point
-    annot = ax.annotate("", xy=(0, 0), xytext=(20, 20), textcoords="offset points",
-                        bbox=dict(boxstyle="round", fc="w"), arrowprops=dict(arrowstyle="->"))
-    annot.set_visible(False)
-
-    def update_annot(ind):
-        x, y = times[ind[0]], prices[ind[0]]
-        annot.xy = (mdates.date2num(x), y)
-        text = f"Time: {x.strftime('%Y-%m-%d %H:%M:%S')}\nPrice: ${y}\nVolume: {volumes[ind[0]]}\nPrice Change: {price_changes[ind[0]]}"
-        annot.set_text(text)
-        annot.get_bbox_patch().set_alpha(0.4)
-
-    def on_hover(event):
-        vis = annot.get_visible()
-        if event.inaxes == ax:
-            cont, ind = line.contains(event)
-            if cont:
-                update_annot(ind["ind"])
-                annot.set_visible(True)
-                fig.canvas.draw_idle()
-            elif vis:
-                annot.set_visible(False)
-                fig.canvas.draw_idle()
-
-    # Plot line for real-time price
-    line, = ax.plot(times, prices, label="Real-Time Price", color='b')
-    fig.canvas.mpl_connect("motion_notify_event", on_hover)
-
-
-# Set up the figure and axis for the plot
-fig, ax = plt.subplots()
-interval = 1000  # Keep the default interval for real-time updates
-ani = animation.FuncAnimation(
-    fig, update_plot, interval=interval, cache_frame_data=False)
-
-# Start the asyncio event loop in a separate thread to fetch data
-data_thread = Thread(target=lambda: asyncio.run(fetch_stock_data()))
-data_thread.start()
-
-# Show the real-time plot
-plt.show()
+            ticks = decode_frame(message)
+
+            # Add the tick times and prices to the lists
+            tick_times = tick_datetimes(ticks)
+            times.extend(tick_times)
+            prices.extend(ticks['price'].tolist())
+            volumes.extend(ticks['volume'].tolist())
+            price_changes.extend(ticks['price_change'].tolist())
+            aggregator.update_many(tick_times, ticks['price'], ticks['volume'])
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    times, prices, volumes, price_changes = load_history(args)
+
+    # Parameters for connecting to the WebSocket server
+    websocket_uri = f"ws://localhost:{args.websocket_port}"
+
+    # Streaming statistics over the live ticks, refreshed on every message
+    aggregator = StreamAggregator(window_seconds=300)
+    latest_stats = {}
+    aggregator.subscribe(latest_stats.update)
+
+    import matplotlib.pyplot as plt
+    from live_plot import LivePlot
+
+    # Set up the figure and axis; artists are created once and updated incrementally
+    fig, ax = plt.subplots()
+    plot = LivePlot(ax, times, prices, volumes, price_changes, "Real-Time Stock Price of AAPL",
+                    stats=latest_stats, time_format='%Y-%m-%d %H:%M:%S')
+
+    # Append new ticks and blit them every interval
+    interval = 1000  # Keep the default interval for real-time updates
+    timer = fig.canvas.new_timer(interval=interval)
+    timer.add_callback(plot.update)
+    timer.start()
+
+    # Start the asyncio event loop in a separate thread to fetch data
+    data_thread = Thread(target=lambda: asyncio.run(fetch_stock_data(
+        websocket_uri, times, prices, volumes, price_changes, aggregator)), daemon=True)
+    data_thread.start()
+
+    # Show the real-time plot
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
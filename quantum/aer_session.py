@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+# qiskit and Aer are imported when the first session is created
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+
+logger = logging.getLogger(__name__)
+
+# Seconds the session waits for more circuits after the first one arrives
+DEFAULT_BATCH_WINDOW = 0.0
+
+# Most circuits submitted in one simulator run
+DEFAULT_MAX_BATCH = 256
+
+# Callables observer(seconds, circuits, requests) told about every finished
+# simulator job, e.g. to record job latency into a metrics registry
+JOB_OBSERVERS: List = []
+
+
+class AerSession:
+    def __init__(self, max_parallel_threads: int = 0, precision: str = 'double',
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        One configured AerSimulator shared by every caller, with batched job submission
+
+        Circuits submitted from any thread are collected for up to
+        `batch_window` seconds and run together (see _execute); each caller
+        gets a Future for its own result.
+
+        Parameters:
+        max_parallel_threads (int): Simulator threads (0 uses every core)
+        precision (str): 'double' or 'single' floating point precision
+        batch_window (float): Seconds to collect circuits before running them
+        max_batch (int): Most circuits per simulator run
+        """
+        from qiskit_aer import AerSimulator
+
+        self.simulator = AerSimulator(max_parallel_threads=max_parallel_threads, precision=precision)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.pending = queue.Queue()
+        self.requests = 0
+        self.jobs = 0
+        self.circuits = 0
+        self._closed = False
+        self._lock = threading.Lock()  # orders submit() against close()
+        self._worker = threading.Thread(target=self._run_loop, daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, circuit: QuantumCircuit, shots: int = 1024, memory: bool = False) -> Future:
+        """
+        Queue a transpiled circuit; the Future resolves to its counts dict, or
+        to the per-shot bitstrings when memory is True
+        """
+        future = Future()
+        with self._lock:
+            # Nothing is queued after the close sentinel, so every queued request is served
+            if not self._closed:
+                self.pending.put((circuit, shots, memory, future))
+                return future
+        # Late callers (e.g. during interpreter exit) run unbatched
+        self._execute([(circuit, shots, memory, future)])
+        return future
+
+    def submit_many(self, circuits: Sequence[QuantumCircuit], shots: int = 1024,
+                    memory: bool = False) -> List[Future]:
+        """Queue several circuits at once so they land in the same batch"""
+        return [self.submit(circuit, shots, memory) for circuit in circuits]
+
+    def run(self, circuit: QuantumCircuit, shots: int = 1024,
+            memory: bool = False) -> Union[Dict[str, int], List[str]]:
+        """Submit a circuit and wait for its result"""
+        return self.submit(circuit, shots, memory).result()
+
+    def _collect(self) -> list:
+        """
+        Wait for one request, then take whatever else arrives within the window
+
+        Requests keep queueing while a job runs, so even with no window the
+        batch grows with the load and an idle session adds no latency.
+        """
+        batch = [self.pending.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self.pending.get(timeout=remaining))
+                else:
+                    batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _execute(self, requests: list):
+        """
+        Run a batch of (circuit, shots, memory, future) requests
+
+        Requests for the same circuit object are merged into one experiment
+        with their shots summed, and each caller gets its own slice of the
+        per-shot memory; shots are independent, so this is exact and far
+        cheaper than one experiment per request. The remaining experiments
+        run as one simulator job per distinct (shots, memory) setting.
+        """
+        # Skip requests whose caller cancelled the Future while it was queued
+        experiments = {}
+        for circuit, shots, memory, future in requests:
+            if future.set_running_or_notify_cancel():
+                experiments.setdefault(id(circuit), (circuit, []))[1].append((shots, memory, future))
+
+        jobs = {}
+        for circuit, callers in experiments.values():
+            total = sum(shots for shots, _, _ in callers)
+            memory = len(callers) > 1 or callers[0][1]
+            jobs.setdefault((total, memory), []).append((circuit, callers))
+
+        for (total, memory), batch in jobs.items():
+            start = time.perf_counter()
+            try:
+                result = self.simulator.run([circuit for circuit, _ in batch],
+                                            shots=total, memory=memory).result()
+            except Exception as error:
+                for _, callers in batch:
+                    fail_callers(callers, error)
+                continue
+            self.jobs += 1
+            self.circuits += len(batch)
+            served = sum(len(callers) for _, callers in batch)
+            self.requests += served
+            seconds = time.perf_counter() - start
+            for observer in JOB_OBSERVERS:
+                try:
+                    observer(seconds, len(batch), served)
+                except Exception:
+                    logger.exception("Aer job observer %r failed", observer)
+            for index, (_, callers) in enumerate(batch):
+                # One bad experiment (e.g. a circuit with no measurement) fails only its callers
+                try:
+                    route_result(result, index, callers, memory)
+                except Exception as error:
+                    fail_callers(callers, error)
+
+    def _run_loop(self):
+        while True:
+            batch = self._collect()
+            stopping = any(request is None for request in batch)
+            batch = [request for request in batch if request is not None]
+            try:
+                self._execute(batch)
+            except Exception as error:
+                # Keep serving later batches; fail whatever this one left unresolved
+                logger.exception("Aer batch failed")
+                fail_callers([(None, None, future) for _, _, _, future in batch], error)
+            if stopping:
+                return
+
+    def close(self):
+        """Run what is already queued, then stop the worker thread"""
+        with self._lock:
+            closing = not self._closed
+            self._closed = True
+        if closing and self._worker.is_alive():
+            self.pending.put(None)
+        if self._worker is not threading.current_thread():
+            self._worker.join()
+
+
+def route_result(result, index, callers: list, memory: bool):
+    """Hand experiment `index` of a job result to its (shots, memory, future) callers"""
+    if not memory:
+        callers[0][2].set_result(result.get_counts(index))
+        return
+    shot_memory = result.get_memory(index)
+    offset = 0
+    for shots, wants_memory, future in callers:
+        part = shot_memory[offset:offset + shots]
+        offset += shots
+        future.set_result(part if wants_memory else dict(Counter(part)))
+
+
+def fail_callers(callers: list, error: BaseException):
+    """Set `error` on every (shots, memory, future) caller not resolved yet"""
+    for _, _, future in callers:
+        if not future.done():
+            future.set_exception(error)
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def default_session() -> AerSession:
+    """Session shared by every generator, entropy pool and pricer that is not given one"""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = AerSession()
+        return _default_session
+
+
+def configure_default_session(max_parallel_threads: int = 0, precision: str = 'double',
+                              batch_window: float = DEFAULT_BATCH_WINDOW,
+                              max_batch: int = DEFAULT_MAX_BATCH) -> AerSession:
+    """Replace the shared session, e.g. to pick single precision or fewer threads"""
+    global _default_session
+    with _default_session_lock:
+        previous = _default_session
+        _default_session = AerSession(max_parallel_threads, precision, batch_window, max_batch)
+    if previous is not None:
+        previous.close()
+    return _default_session
+
+
+def session_or_default(session: Optional[AerSession]) -> AerSession:
+    return session if session is not None else default_session()
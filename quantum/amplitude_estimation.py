@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import math
+import time
+from functools import lru_cache
+import numpy as np
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from aer_session import AerSession, session_or_default
+from true_random_generator import transpile_target
+
+# qiskit is imported by the functions that build circuits, so importing this module stays cheap
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+    from qiskit.circuit import ParameterVector
+
+# Grover powers m of the default maximum-likelihood evaluation schedule; the
+# circuit for power m applies Q^m A and measures the payoff ancilla
+DEFAULT_SCHEDULE = (0, 1, 2, 4, 8)
+
+# Resolution of the grid search for the maximum-likelihood angle
+LIKELIHOOD_GRID = 100_000
+
+
+def gray_code(i: int) -> int:
+    return i ^ (i >> 1)
+
+
+def multiplexor_matrix(controls: int) -> np.ndarray:
+    """
+    Matrix M with M[j, i] = (-1)^popcount(j & gray(i))
+
+    The rotation applied for control state j by ucry is sum_i M[j, i] * theta[i].
+    """
+    size = 1 << controls
+    states = np.arange(size)[:, None] & np.array([gray_code(i) for i in range(size)])[None, :]
+    parity = np.array([bin(value).count('1') & 1 for value in states.ravel()]).reshape(size, size)
+    return 1 - 2 * parity
+
+
+def multiplexor_angles(angles: np.ndarray) -> np.ndarray:
+    """Gate angles for ucry that apply RY(angles[j]) when the controls are in state j"""
+    controls = int(np.log2(len(angles)))
+    return multiplexor_matrix(controls).T @ angles / len(angles)
+
+
+def ucry(qc: QuantumCircuit, thetas: Sequence, controls: List[int], target: int):
+    """
+    Uniformly controlled RY with parameterized gate angles
+
+    Gray-code decomposition into 2^k RY and 2^k CNOT gates, so the circuit
+    structure does not depend on the angles. Bind thetas with
+    multiplexor_angles; control qubit controls[b] is bit b of the control state.
+    """
+    if not controls:
+        qc.ry(thetas[0], target)
+        return
+    size = 1 << len(controls)
+    for i in range(size):
+        qc.ry(thetas[i], target)
+        changed = gray_code(i) ^ gray_code((i + 1) % size)
+        qc.cx(controls[changed.bit_length() - 1], target)
+
+
+@lru_cache(maxsize=None)
+def pricing_parameters(qubits: int) -> Tuple[ParameterVector, ParameterVector]:
+    """Shared parameter vectors for the distribution loading and the payoff oracle"""
+    from qiskit.circuit import ParameterVector
+
+    return (ParameterVector(f'load_{qubits}', (1 << qubits) - 1),
+            ParameterVector(f'payoff_{qubits}', 1 << qubits))
+
+
+def state_preparation(qubits: int) -> QuantumCircuit:
+    """
+    Parameterized A operator on `qubits` price qubits plus one payoff ancilla
+
+    Loads the distribution with a Grover-Rudolph tree of uniformly controlled
+    rotations (most significant qubit first), then rotates the ancilla so
+    that P(ancilla = 1) is the expected normalized payoff.
+    """
+    from qiskit import QuantumCircuit
+
+    load, payoff = pricing_parameters(qubits)
+    qc = QuantumCircuit(qubits + 1)
+    offset = 0
+    for level in range(qubits):
+        ucry(qc, load[offset:offset + (1 << level)],
+             list(range(qubits - level, qubits)), qubits - 1 - level)
+        offset += 1 << level
+    ucry(qc, payoff, list(range(qubits)), qubits)
+    return qc
+
+
+def grover_operator(a: QuantumCircuit) -> QuantumCircuit:
+    """Q = A S_0 A^dagger S_chi (up to global phase), with the ancilla as the good state"""
+    from qiskit import QuantumCircuit
+
+    width = a.num_qubits
+    ancilla = width - 1
+    qc = QuantumCircuit(width)
+    qc.z(ancilla)
+    qc.compose(a.inverse(), inplace=True)
+    qc.x(range(width))
+    qc.h(ancilla)
+    qc.mcx(list(range(width - 1)), ancilla)
+    qc.h(ancilla)
+    qc.x(range(width))
+    qc.compose(a, inplace=True)
+    return qc
+
+
+@lru_cache(maxsize=None)
+def estimation_circuit(qubits: int, power: int) -> QuantumCircuit:
+    """
+    Build and transpile Q^power A with an ancilla measurement once per (qubits, power)
+
+    The distribution and the payoff are parameters, so one cached circuit
+    serves every distribution, strike and model; calls only bind new values.
+
+    Parameters:
+    qubits (int): Price qubits (2^qubits grid points)
+    power (int): Number of Grover iterations
+    """
+    from qiskit import QuantumCircuit, transpile
+
+    a = state_preparation(qubits)
+    q = grover_operator(a)
+    qc = QuantumCircuit(qubits + 1, 1)
+    qc.compose(a, inplace=True)
+    for _ in range(power):
+        qc.compose(q, inplace=True)
+    qc.measure(qubits, 0)
+    return transpile(qc, transpile_target())
+
+
+def bind_values(probabilities: np.ndarray, payoffs: np.ndarray) -> Dict[ParameterVector, List[float]]:
+    """
+    Parameter values loading `probabilities` and the normalized `payoffs` (in [0, 1])
+
+    Both arrays have 2^qubits entries, indexed by the price register value.
+    """
+    qubits = int(np.log2(len(probabilities)))
+    load, payoff = pricing_parameters(qubits)
+    load_values = []
+    for level in range(qubits):
+        # Mass of each (prefix, next bit) pair for the prefixes of this level
+        mass = probabilities.reshape(1 << level, 2, -1).sum(axis=2)
+        angles = 2 * np.arctan2(np.sqrt(mass[:, 1]), np.sqrt(mass[:, 0]))
+        load_values.extend(multiplexor_angles(angles))
+    payoff_angles = 2 * np.arcsin(np.sqrt(np.clip(payoffs, 0.0, 1.0)))
+    return {load: load_values, payoff: list(multiplexor_angles(payoff_angles))}
+
+
+def maximum_likelihood(schedule: Sequence[int], hits: Sequence[int], shots: int) -> Tuple[float, float]:
+    """
+    Maximum-likelihood amplitude a and its standard error from the good counts
+
+    P(good | power m) = sin^2((2m + 1) theta) with a = sin^2(theta); the
+    error comes from the Fisher information of theta.
+    """
+    theta = np.linspace(0, np.pi / 2, LIKELIHOOD_GRID)
+    log_likelihood = np.zeros_like(theta)
+    for power, good in zip(schedule, hits):
+        p = np.clip(np.sin((2 * power + 1) * theta) ** 2, 1e-12, 1 - 1e-12)
+        log_likelihood += good * np.log(p) + (shots - good) * np.log(1 - p)
+    best = theta[np.argmax(log_likelihood)]
+    fisher = 4 * shots * sum((2 * power + 1) ** 2 for power in schedule)
+    return math.sin(best) ** 2, abs(math.sin(2 * best)) / math.sqrt(fisher)
+
+
+def lognormal_grid(qubits: int, spot: float, rate: float, volatility: float,
+                   maturity: float, width: float = 3.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Terminal GBM price grid and its probabilities
+
+    The 2^qubits points span +/- `width` standard deviations of the log price;
+    each point gets the probability mass of its cell.
+    """
+    mu = math.log(spot) + (rate - 0.5 * volatility ** 2) * maturity
+    sigma = volatility * math.sqrt(maturity)
+    grid = np.linspace(math.exp(mu - width * sigma), math.exp(mu + width * sigma), 1 << qubits)
+    edges = np.concatenate([[grid[0]], (grid[1:] + grid[:-1]) / 2, [grid[-1]]])
+    z = (np.log(edges) - mu) / (sigma * math.sqrt(2))
+    cdf = 0.5 * (1 + np.array([math.erf(value) for value in z]))
+    cdf[0], cdf[-1] = 0.0, 1.0
+    probabilities = np.diff(cdf)
+    return grid, probabilities / probabilities.sum()
+
+
+class AmplitudeEstimationPricer:
+    def __init__(self, qubits: int = 5, schedule: Sequence[int] = DEFAULT_SCHEDULE, shots: int = 100,
+                 session: Optional[AerSession] = None):
+        """
+        European option pricer using maximum-likelihood amplitude estimation on Aer
+
+        Parameters:
+        qubits (int): Price qubits; the distribution is discretized onto 2^qubits points
+        schedule (tuple): Grover powers, submitted together so they share a simulator job
+        shots (int): Shots per circuit of the schedule
+        session (AerSession): Simulator session (defaults to the shared one)
+        """
+        self.qubits = qubits
+        self.schedule = tuple(schedule)
+        self.shots = shots
+        self.session = session_or_default(session)
+
+    def estimate(self, grid: np.ndarray, probabilities: np.ndarray,
+                 payoffs: np.ndarray, discount: float = 1.0) -> Dict[str, float]:
+        """
+        Discounted expected payoff over any discretized distribution
+
+        Parameters:
+        grid (np.ndarray): 2^qubits price points
+        probabilities (np.ndarray): Probability of each point
+        payoffs (np.ndarray): Payoff at each point
+        discount (float): Discount factor applied to the expectation
+        """
+        start = time.perf_counter()
+        scale = float(payoffs.max()) or 1.0
+        values = bind_values(np.asarray(probabilities, dtype=float), payoffs / scale)
+        circuits = [estimation_circuit(self.qubits, power).assign_parameters(values)
+                    for power in self.schedule]
+        futures = self.session.submit_many(circuits, self.shots)
+        hits = [future.result().get('1', 0) for future in futures]
+        amplitude, stderr = maximum_likelihood(self.schedule, hits, self.shots)
+        return {
+            'price': discount * scale * amplitude,
+            'stderr': discount * scale * stderr,
+            # What the circuit estimates: the exact expectation on the grid
+            'discretized': discount * float(probabilities @ payoffs),
+            'oracle_calls': self.shots * sum(2 * power + 1 for power in self.schedule),
+            'elapsed': time.perf_counter() - start
+        }
+
+    def price(self, spot: float, strike: float, rate: float, volatility: float,
+              maturity: float, kind: str = 'call') -> Dict[str, float]:
+        """
+        European call or put under GBM (see black_scholes in pricing/options.py)
+
+        Parameters:
+        spot (float): Initial price
+        strike (float): Strike price
+        rate (float): Risk-free rate
+        volatility (float): Annualized volatility
+        maturity (float): Time to expiry in years
+        kind (str): 'call' or 'put'
+        """
+        grid, probabilities = lognormal_grid(self.qubits, spot, rate, volatility, maturity)
+        payoffs = np.maximum(grid - strike, 0.0) if kind == 'call' else np.maximum(strike - grid, 0.0)
+        return self.estimate(grid, probabilities, payoffs, math.exp(-rate * maturity))
+
+
+if __name__ == "__main__":
+    pricer = AmplitudeEstimationPricer()
+    estimate = pricer.price(150.0, 150.0, 0.05, 0.2, 1.0)
+    print(f"Amplitude estimation: {estimate['price']:.4f} +/- {estimate['stderr']:.4f} "
+          f"(grid value {estimate['discretized']:.4f}, {estimate['oracle_calls']} oracle calls, "
+          f"{estimate['elapsed']:.3f}s)")
@@ -1,19 +1,245 @@
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
+from __future__ import annotations
+
+import logging
+import argparse
+import threading
+import concurrent.futures.thread  # noqa: F401 - registers its exit hook before any pool does
+from functools import lru_cache
 import numpy as np
-from typing import List, Union
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from aer_session import AerSession, session_or_default
+
+logger = logging.getLogger(__name__)
+
+# qiskit and Aer are imported on first use, so importing this module stays cheap
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+
+# Widest circuit run directly; wider values are built from several shots
+MAX_CIRCUIT_QUBITS = 24
+
+
+@lru_cache(maxsize=None)
+def transpile_target():
+    """AerSimulator the cached circuits are transpiled for; they run through the shared AerSession"""
+    from qiskit_aer import AerSimulator
+
+    return AerSimulator()
+
+
+@lru_cache(maxsize=None)
+def hadamard_circuit(qubits: int) -> QuantumCircuit:
+    """
+    Build and transpile the Hadamard + measure circuit once per width
+
+    Parameters:
+    qubits (int): Number of qubits (bits per shot)
+    """
+    from qiskit import QuantumCircuit, transpile
+
+    qc = QuantumCircuit(qubits)
+
+    # Apply Hadamard gates to create superposition
+    qc.h(range(qubits))
+
+    # Measure all qubits
+    qc.measure_all()
+    return transpile(qc, transpile_target())
+
+
+def run_memory(qubits: int, shots: int, session: Optional[AerSession] = None) -> List[str]:
+    """Run the cached circuit through the session and return every shot's bitstring in shot order"""
+    return session_or_default(session).run(hadamard_circuit(qubits), shots=shots, memory=True)
+
+
+def memory_to_bits(memory: List[str]) -> np.ndarray:
+    """Decode per-shot bitstrings into a (shots, width) uint8 array of 0/1"""
+    bitstream = ''.join(memory).replace(' ', '').encode()
+    bits = np.frombuffer(bitstream, dtype=np.uint8) - ord('0')
+    return bits.reshape(len(memory), -1)
+
+
+def pack_rows(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack each row of 0/1 bits into big-endian bytes, right-aligned
+
+    Returns a (rows, ceil(width / 8)) uint8 array.
+    """
+    width = bits.shape[1]
+    pad = -width % 8
+    if pad:
+        bits = np.concatenate([np.zeros((len(bits), pad), dtype=np.uint8), bits], axis=1)
+    return np.packbits(bits, axis=1)
+
+
+def bytes_to_uint64(raw: np.ndarray, bits: int) -> np.ndarray:
+    """Combine (rows, nbytes <= 8) big-endian bytes into uint64 values masked to `bits`"""
+    count, nbytes = raw.shape
+    padded = np.zeros((count, 8), dtype=np.uint8)
+    padded[:, 8 - nbytes:] = raw
+    values = padded.view('>u8').ravel().astype(np.uint64)
+    return values & np.uint64((1 << bits) - 1)
+
+
+def decode_memory(memory: List[str], bits: int) -> np.ndarray:
+    """
+    Decode per-shot bitstrings with vectorized bit operations
+
+    Returns a uint64 array for widths up to 64 bits, otherwise a
+    (shots, ceil(bits / 8)) uint8 array of big-endian bytes per value.
+    """
+    packed = pack_rows(memory_to_bits(memory))
+    return bytes_to_uint64(packed, bits) if bits <= 64 else packed
+
+
+def sample_bits(qubits: int, shots: int, session: Optional[AerSession] = None) -> bytes:
+    """
+    Run the cached circuit and return the measured bits of every shot,
+    in shot order, packed into bytes
+    """
+    return np.packbits(memory_to_bits(run_memory(qubits, shots, session))).tobytes()
+
+
+class EntropyPool:
+    def __init__(self, qubits: int = 16, batch_shots: int = 65536,
+                 capacity: int = 1 << 20, low_watermark: int = 1 << 18,
+                 background: bool = True, session: Optional[AerSession] = None):
+        """
+        Byte buffer of quantum random bits, refilled from large shot batches
+
+        Parameters:
+        qubits (int): Width of the circuit used to fill the pool
+        batch_shots (int): Shots per simulator run
+        capacity (int): Bytes the background refill tops the pool up to
+        low_watermark (int): Pool size in bytes that triggers a background refill
+        background (bool): Refill on a daemon thread instead of only on demand
+        session (AerSession): Simulator session (defaults to the shared one)
+        """
+        self.qubits = qubits
+        self.batch_shots = batch_shots
+        self.capacity = capacity
+        self.low_watermark = low_watermark
+        self.session = session
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        self.batches = 0
+        self._refill_needed = threading.Event()
+        self._stopped = threading.Event()
+        self._refill_thread = None
+        if background:
+            try:
+                # Stop at interpreter exit before concurrent.futures (used by Aer
+                # jobs) refuses new work: threading exit hooks run newest first,
+                # and plain atexit callbacks only after them
+                threading._register_atexit(self.close)
+            except RuntimeError:
+                # Created while the interpreter exits: serve take() in the foreground
+                background = False
+        if background:
+            self._refill_thread = threading.Thread(target=self._refill_loop, daemon=True)
+            self._refill_thread.start()
+            self._refill_needed.set()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def _fill_batch(self) -> bytes:
+        self.batches += 1
+        return sample_bits(self.qubits, self.batch_shots, self.session)
+
+    def _refill_loop(self):
+        while not self._stopped.is_set():
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            while len(self.buffer) < self.capacity and not self._stopped.is_set():
+                try:
+                    batch = self._fill_batch()
+                except Exception:
+                    if self._stopped.is_set():
+                        return
+                    # Keep the thread; take() still surfaces errors to callers
+                    # that find the pool empty
+                    logger.exception("Entropy pool refill failed; retrying at the next low watermark")
+                    break
+                with self.lock:
+                    self.buffer += batch
+
+    def close(self):
+        """Stop the background refill, waiting for a batch in progress"""
+        self._stopped.set()
+        self._refill_needed.set()
+        if self._refill_thread is not None and self._refill_thread is not threading.current_thread():
+            self._refill_thread.join()
+
+    def take(self, nbytes: int) -> bytes:
+        """Remove and return `nbytes` random bytes, running the simulator only if the pool is short"""
+        with self.lock:
+            while len(self.buffer) < nbytes:
+                self.buffer += self._fill_batch()
+            data = bytes(self.buffer[:nbytes])
+            del self.buffer[:nbytes]
+            if len(self.buffer) < self.low_watermark and self._refill_thread is not None:
+                self._refill_needed.set()
+        return data
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> EntropyPool:
+    """Entropy pool shared by generators that are not given one"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EntropyPool()
+        return _default_pool
 
 
 class QuantumRandomGenerator:
-    def __init__(self, bits: int = 8):
+    def __init__(self, bits: int = 8, pool: Optional[EntropyPool] = None,
+                 session: Optional[AerSession] = None):
         """
         Initialize the quantum random number generator
         
         Parameters:
         bits (int): Number of qubits to use (determines range of random numbers)
+        pool (EntropyPool): Source of random bytes (defaults to a shared pool)
+        session (AerSession): Simulator session for run_circuit (defaults to the shared one)
         """
         self.bits = bits
-        self.simulator = AerSimulator()
+        self.session = session_or_default(session)
+        self.simulator = self.session.simulator
+        self.pool = pool if pool is not None else default_pool()
+
+    def generate_array(self, shots: int) -> np.ndarray:
+        """
+        Generate random numbers as an array drawn from the entropy pool
+
+        Returns uint64 values for widths up to 64 bits, otherwise a
+        (shots, ceil(bits / 8)) uint8 array of big-endian bytes per value.
+        """
+        nbytes = (self.bits + 7) // 8
+        raw = np.frombuffer(self.pool.take(shots * nbytes), dtype=np.uint8).reshape(shots, nbytes)
+        if self.bits <= 64:
+            return bytes_to_uint64(raw, self.bits)
+
+        # Clear the unused high bits of each value's leading byte
+        packed = raw.copy()
+        packed[:, 0] &= np.uint8(0xFF >> (-self.bits % 8))
+        return packed
+
+    def run_circuit(self, shots: int) -> np.ndarray:
+        """Run the simulator directly (bypassing the pool); same return types as generate_array"""
+        if self.bits <= MAX_CIRCUIT_QUBITS:
+            return decode_memory(run_memory(self.bits, shots, self.session), self.bits)
+
+        # Too wide for one circuit: concatenate the shots of a narrower one
+        width = MAX_CIRCUIT_QUBITS
+        bits = memory_to_bits(run_memory(width, -(-shots * self.bits // width), self.session))
+        packed = pack_rows(bits.ravel()[:shots * self.bits].reshape(shots, self.bits))
+        return bytes_to_uint64(packed, self.bits) if self.bits <= 64 else packed
 
     def generate_single(self) -> int:
         """Generate a single random number"""
@@ -21,30 +247,92 @@ class QuantumRandomGenerator:
 
     def generate_multiple(self, shots: int) -> List[int]:
         """Generate multiple random numbers"""
-        # Create quantum circuit
-        qc = QuantumCircuit(self.bits, self.bits)
+        values = self.generate_array(shots)
+        if self.bits <= 64:
+            return values.tolist()
+        return [int.from_bytes(row.tobytes(), 'big') for row in values]
+
+    def _draw_bits(self, count: int, bits: int) -> np.ndarray:
+        """Draw `count` uniform `bits`-bit values (bits <= 64) from the entropy pool"""
+        nbytes = (bits + 7) // 8
+        raw = np.frombuffer(self.pool.take(count * nbytes), dtype=np.uint8).reshape(count, nbytes)
+        return bytes_to_uint64(raw, bits)
+
+    def _below(self, bound: int, count: int) -> np.ndarray:
+        """
+        Unbiased uniform integers in [0, bound) by vectorized rejection sampling
+
+        Draws just enough values of the smallest covering bit width for the
+        expected acceptance rate, then tops up the few that were rejected.
+        """
+        if not 0 < bound <= 1 << 63:
+            raise ValueError("Range size must be between 1 and 2**63")
+        bits = max(1, (bound - 1).bit_length())
+        acceptance = bound / 2**bits
+        out = np.empty(count, dtype=np.uint64)
+        filled = 0
+        while filled < count:
+            need = count - filled
+            draws = self._draw_bits(int(np.ceil(need / acceptance)), bits)
+            accepted = draws[draws < np.uint64(bound)][:need]
+            out[filled:filled + len(accepted)] = accepted
+            filled += len(accepted)
+        return out
+
+    @staticmethod
+    def _count(size: Union[None, int, Tuple[int, ...]]) -> int:
+        return 1 if size is None else int(np.prod(size))
+
+    @staticmethod
+    def _shape(values: np.ndarray, size: Union[None, int, Tuple[int, ...]]):
+        return values[0].item() if size is None else values.reshape(size)
 
-        # Apply Hadamard gates to create superposition
-        for i in range(self.bits):
-            qc.h(i)
+    def integers(self, low: int, high: Optional[int] = None,
+                 size: Union[None, int, Tuple[int, ...]] = None, endpoint: bool = False):
+        """
+        Unbiased random integers from [low, high), like np.random.Generator.integers
+
+        Parameters:
+        low (int): Lowest value (or the exclusive upper bound when high is None)
+        high (int): Upper bound, exclusive unless endpoint is True
+        size (int or tuple): Output shape (None returns a single int)
+        endpoint (bool): Include high in the range
+        """
+        if high is None:
+            low, high = 0, low
+        bound = high - low + (1 if endpoint else 0)
+        if bound <= 0:
+            raise ValueError("high must be greater than low")
+        values = self._below(bound, self._count(size)).astype(np.int64) + low
+        return self._shape(values, size)
 
-        # Measure all qubits
-        qc.measure_all()
+    def random(self, size: Union[None, int, Tuple[int, ...]] = None):
+        """Uniform floats in [0, 1) with 53 random bits each, like np.random.Generator.random"""
+        values = (self._draw_bits(self._count(size), 53) * 2.0**-53)
+        return self._shape(values, size)
 
-        # Run the circuit
-        job = self.simulator.run(qc, shots=shots)
-        result = job.result()
+    def uniform(self, low: float = 0.0, high: float = 1.0,
+                size: Union[None, int, Tuple[int, ...]] = None):
+        """Uniform floats in [low, high), like np.random.Generator.uniform"""
+        values = low + (high - low) * self.random(self._count(size))
+        return self._shape(values, size)
 
-        # Process results
-        measurements = result.get_counts()
-        random_numbers = []
-        for bitstring, count in measurements.items():
-            # Clean the bitstring by removing spaces
-            clean_bitstring = bitstring.replace(' ', '')
-            for _ in range(count):
-                random_numbers.append(int(clean_bitstring, 2))
+    def standard_normal(self, size: Union[None, int, Tuple[int, ...]] = None):
+        """Standard normal floats (Box-Muller), like np.random.Generator.standard_normal"""
+        count = self._count(size)
+        pairs = (count + 1) // 2
+        u1 = 1.0 - self.random(pairs)  # (0, 1] so the log is finite
+        u2 = self.random(pairs)
+        radius = np.sqrt(-2.0 * np.log(u1))
+        values = np.concatenate([radius * np.cos(2 * np.pi * u2),
+                                 radius * np.sin(2 * np.pi * u2)])[:count]
+        return self._shape(values, size)
 
-        return random_numbers
+    def normal(self, loc: float = 0.0, scale: float = 1.0,
+               size: Union[None, int, Tuple[int, ...]] = None):
+        """Normal floats, like np.random.Generator.normal"""
+        values = loc + scale * self.standard_normal(self._count(size))
+        return self._shape(values, size)
 
     def generate_range(self, start: int, end: int, shots: int = 1) -> List[int]:
         """
@@ -65,10 +353,8 @@ class QuantumRandomGenerator:
             raise ValueError(
                 f"Range too large for current bit size. Max range: 0-{2**self.bits - 1}")
 
-        raw_numbers = self.generate_multiple(shots=shots)
-
-        # Map numbers to desired range
-        return [start + (num % range_size) for num in raw_numbers]
+        # Rejection sampling keeps every value in the range equally likely
+        return self.integers(start, end, size=shots, endpoint=True).tolist()
 
     def get_random_float(self, shots: int = 1) -> Union[float, List[float]]:
         """
@@ -77,8 +363,11 @@ class QuantumRandomGenerator:
         Parameters:
         shots (int): Number of random numbers to generate
         """
-        numbers = self.generate_multiple(shots=shots)
-        floats = [num / (2**self.bits - 1) for num in numbers]
+        if self.bits > 64:
+            numbers = np.array(self.generate_multiple(shots=shots), dtype=float)
+        else:
+            numbers = self.generate_array(shots).astype(float)
+        floats = (numbers / (2**self.bits - 1)).tolist()
         return floats[0] if shots == 1 else floats
 
 
@@ -95,32 +384,37 @@ def plot_distribution(numbers, bits):
     plt.show()
 
 
-# Example usage
-if __name__ == "__main__":
-    # Create a quantum random number generator
-    qrng = QuantumRandomGenerator(bits=8)
-
-    # print("\n=== Single Random Number ===")
-    # print("Random number:", qrng.generate_single())
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Draw random numbers from the quantum simulator.')
+    parser.add_argument('--bits', type=int, default=8,
+                        help='Qubits per number, i.e. values in [0, 2**bits) (default: 8)')
+    parser.add_argument('--count', type=int, default=1,
+                        help='How many numbers to draw (default: 1)')
+    parser.add_argument('--low', type=int, default=0,
+                        help='Smallest value, inclusive (default: 0)')
+    parser.add_argument('--high', type=int, default=10,
+                        help='Largest value, inclusive (default: 10)')
+    parser.add_argument('--float', action='store_true',
+                        help='Draw floats in [0, 1] instead of integers')
+    parser.add_argument('--plot', action='store_true',
+                        help='Plot the distribution of the drawn integers')
+    args = parser.parse_args(argv)
 
-    # print("\n=== Multiple Random Numbers ===")
-    # multiple_numbers = qrng.generate_multiple(shots=5)
-    # print("5 random numbers:", multiple_numbers)
+    # Create a quantum random number generator
+    qrng = QuantumRandomGenerator(bits=args.bits)
 
-    print("\n=== Random Numbers in Range ===")
-    range_numbers = qrng.generate_range(0, 10, shots=1)
-    print("5 random numbers between 0 and 10:", range_numbers)
+    if args.float:
+        floats = qrng.get_random_float(shots=args.count)
+        print(f"{args.count} random floats between 0 and 1:",
+              [f"{x:.3f}" for x in np.atleast_1d(floats)])
+        return
 
-    # print("\n=== Random Floats ===")
-    # float_numbers = qrng.get_random_float(shots=5)
-    # print("5 random floats between 0 and 1:",
-    #       [f"{x:.3f}" for x in float_numbers])
+    range_numbers = qrng.generate_range(args.low, args.high, shots=args.count)
+    print(f"{args.count} random numbers between {args.low} and {args.high}:", range_numbers)
+    if args.plot:
+        plot_distribution(range_numbers, qrng.bits)
 
-    # print("\n=== Distribution Analysis ===")
-    # # Generate larger sample for distribution analysis
-    # large_sample = qrng.generate_multiple(shots=1000)
-    # print(f"Mean of 1000 samples: {np.mean(large_sample):.2f}")
-    # print(f"Standard deviation: {np.std(large_sample):.2f}")
 
-    # Plot the distribution
-    # plot_distribution(large_sample, qrng.bits)
+# Example usage
+if __name__ == "__main__":
+    main()